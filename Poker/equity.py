@@ -0,0 +1,145 @@
+# equity.py
+"""
+Cálculo de equidad Monte Carlo para Texas Hold'em.
+
+Dada la mano propia, el board y el número de oponentes vivos, se muestrean
+completaciones del mazo restante en lotes vectorizados (NumPy) y se evalúan
+con hand_evaluator.evaluate_batch. El muestreo se detiene en cuanto el
+intervalo de confianza de la equidad es suficientemente estrecho o se agota
+el presupuesto de tiempo, para poder usarse en cada turno desde la GUI.
+"""
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from hand_evaluator import card_to_int, evaluate_batch
+
+
+def _to_int(card) -> int:
+    return card if isinstance(card, (int, np.integer)) else card_to_int(card)
+
+
+def monte_carlo_equity(hole: Sequence,
+                       board: Sequence = (),
+                       n_opponents: int = 1,
+                       time_budget: float = 0.02,
+                       ci_target: float = 0.01,
+                       batch_size: int = 1000,
+                       max_samples: int = 200000,
+                       rng: Optional[np.random.Generator] = None) -> Dict[str, float]:
+    """
+    Estima la equidad de `hole` contra `n_opponents` manos aleatorias.
+
+    Args:
+        hole: 2 cartas propias, (rank, palo) o índices 0..51
+        board: 0..5 cartas comunitarias en el mismo formato
+        n_opponents: número de oponentes que siguen en la mano
+        time_budget: tiempo máximo en segundos (p.ej. 0.02 = 20 ms)
+        ci_target: semiancho del intervalo de confianza al 95% para parar antes
+        batch_size: completaciones simuladas por lote
+        max_samples: tope de muestras aunque quede tiempo
+        rng: generador NumPy opcional (reproducibilidad)
+
+    Returns:
+        dict con 'win', 'tie', 'lose', 'equity' (win + reparto de empates),
+        'ci' (semiancho al 95%), 'samples' y 'elapsed'
+    """
+    start = time.perf_counter()
+    rng = rng or np.random.default_rng()
+    n_opponents = max(1, int(n_opponents))
+
+    hero = np.array([_to_int(c) for c in hole], dtype=np.uint8)
+    known = np.array([_to_int(c) for c in board], dtype=np.uint8)
+    dead = set(hero.tolist()) | set(known.tolist())
+    deck = np.array([c for c in range(52) if c not in dead], dtype=np.uint8)
+
+    n_board = 5 - len(known)
+    needed = n_board + 2 * n_opponents
+    if needed > len(deck):
+        raise ValueError("No hay cartas suficientes para tantos oponentes")
+
+    wins = ties = 0
+    equity_sum = equity_sq = 0.0
+    samples = 0
+    ci = 1.0
+
+    while samples < max_samples:
+        # Muestreo sin reemplazo: las primeras `needed` posiciones de una permutación por fila
+        picks = deck[np.argsort(rng.random((batch_size, len(deck))), axis=1)[:, :needed]]
+        boards = np.concatenate([np.broadcast_to(known, (batch_size, len(known))), picks[:, :n_board]], axis=1)
+
+        hero_cards = np.concatenate([np.broadcast_to(hero, (batch_size, 2)), boards], axis=1)
+        opp_holes = picks[:, n_board:].reshape(batch_size, n_opponents, 2)
+        opp_cards = np.concatenate(
+            [opp_holes, np.broadcast_to(boards[:, None, :], (batch_size, n_opponents, 5))], axis=2)
+
+        hero_val = evaluate_batch(hero_cards)
+        opp_val = evaluate_batch(opp_cards.reshape(-1, 7)).reshape(batch_size, n_opponents)
+        best_opp = opp_val.max(axis=1)
+
+        win = hero_val > best_opp
+        tie = hero_val == best_opp
+        # En un empate el bote se reparte entre todos los que empatan
+        share = np.where(win, 1.0, np.where(tie, 1.0 / (1 + (opp_val == best_opp[:, None]).sum(axis=1)), 0.0))
+
+        wins += int(win.sum())
+        ties += int(tie.sum())
+        equity_sum += float(share.sum())
+        equity_sq += float((share * share).sum())
+        samples += batch_size
+
+        mean = equity_sum / samples
+        var = max(equity_sq / samples - mean * mean, 0.0)
+        ci = 1.96 * np.sqrt(var / samples)
+        if ci < ci_target or time.perf_counter() - start > time_budget:
+            break
+
+    return {
+        "win": wins / samples,
+        "tie": ties / samples,
+        "lose": 1.0 - (wins + ties) / samples,
+        "equity": equity_sum / samples,
+        "ci": float(ci),
+        "samples": samples,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def equity_from_obs(obs: Dict, n_opponents: Optional[int] = None, **kwargs) -> Dict[str, float]:
+    """Equidad a partir de una observación de HoldemEnv._get_obs"""
+    if n_opponents is None:
+        n_opponents = len(obs.get("opp_bets", ())) or 1
+    return monte_carlo_equity(obs["hole"], obs.get("board", ()), n_opponents, **kwargs)
+
+
+def warmup():
+    """Construye las tablas del evaluador por adelantado (evita el coste en el primer turno)"""
+    evaluate_batch(np.arange(7, dtype=np.uint8)[None, :])
+
+
+def test_equity():
+    """Comprobaciones rápidas contra equidades conocidas"""
+    warmup()
+    rng = np.random.default_rng(0)
+    aa = monte_carlo_equity([(14, "Corazones"), (14, "Copas")], [], 1,
+                            time_budget=1.0, ci_target=0.005, rng=rng)
+    print(f"AA vs 1: {aa['equity']:.3f} ±{aa['ci']:.3f} ({aa['samples']} muestras, {aa['elapsed']*1000:.1f} ms)")
+    assert abs(aa["equity"] - 0.852) < 0.015
+
+    seven_two = monte_carlo_equity([(7, "Corazones"), (2, "Copas")], [], 1,
+                                   time_budget=1.0, ci_target=0.005, rng=rng)
+    print(f"72o vs 1: {seven_two['equity']:.3f} ±{seven_two['ci']:.3f}")
+    assert abs(seven_two["equity"] - 0.346) < 0.015
+
+    nuts = monte_carlo_equity([(14, "Corazones"), (13, "Corazones")],
+                              [(12, "Corazones"), (11, "Corazones"), (10, "Corazones")], 3, rng=rng)
+    assert nuts["win"] == 1.0
+
+    fast = monte_carlo_equity([(10, "Trebol"), (10, "Diamantes")], [(2, "Copas"), (9, "Trebol"), (13, "Corazones")], 3)
+    print(f"TT vs 3 en flop: {fast['equity']:.3f} ±{fast['ci']:.3f} en {fast['elapsed']*1000:.1f} ms")
+    print("✅ Equidad correcta")
+
+
+if __name__ == "__main__":
+    test_equity()
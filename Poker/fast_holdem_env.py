@@ -0,0 +1,331 @@
+# fast_holdem_env.py
+"""
+Versión rápida de HoldemEnv con las mismas reglas.
+
+- Las cartas son enteros 0..51 (ver hand_evaluator: (rank-2)*4 + palo).
+- El mazo es un array('B') preasignado que en cada reset se rellena en el
+  sitio con una permutación; las permutaciones se generan por bloques con NumPy.
+- El showdown de todas las manos de un bloque se evalúa de una vez con
+  evaluate_batch al generar las permutaciones: la mano sólo compara enteros.
+- Cada asiento tiene su observación float32 de 20 posiciones con el mismo
+  layout que NeuralPokerAgent.obs_to_vector_enhanced. Cartas propias y board
+  se escriben al repartir; cada paso sólo actualiza bote y apuestas. Es una
+  vista reutilizable: si se quiere guardar hay que copiarla.
+
+Rendimiento (test_fast_env: un núcleo, heads-up, acciones aleatorias, mejor
+de 10 medidas alternadas): ~65k manos/s, ~2.4x HoldemEnv (~27k) y ~4.5x
+HoldemEnv + obs_to_vector_enhanced (~14.5k), que es lo que paga un bucle de
+entrenamiento. El objetivo inicial de 10x queda fuera de alcance con una
+llamada de Python por decisión (~3.5 µs por mano en total, menos de lo que
+cuestan las ~5 llamadas a step y el bucle del agente). Para más velocidad
+está HoldemVecEnv (muchas mesas por llamada).
+
+Uso:
+    env = FastHoldemEnv(n_players=2, seed=0)
+    obs, _ = env.reset()
+    obs, rewards, done, info = env.step(env.current_player, 1)
+"""
+import time
+from array import array
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from hand_evaluator import evaluate, int_to_card
+from holdem_env import showdown_batch
+
+STAGES = ("preflop", "flop", "turn", "river", "showdown")
+STAGE_VALUES = (0.0, 0.33, 0.66, 1.0, 0.0)
+OBS_SIZE = 20
+
+# Características por carta, apuesta y bote, idénticas a obs_to_vector_enhanced
+CARD_RANK_F = tuple((c >> 2) / 12.0 for c in range(52))
+CARD_SUIT_F = tuple((c & 3) / 3.0 for c in range(52))
+BET_F = tuple(x / 50.0 for x in range(100))     # >= 100 -> 2.0
+POT_F = tuple(x / 500.0 for x in range(1000))   # >= 1000 -> 2.0
+_ZERO_OBS = array("f", bytes(4 * OBS_SIZE))
+
+
+class FastHoldemEnv:
+    """
+    Entorno Texas Hold'em para N jugadores, compatible en reglas con HoldemEnv.
+    """
+    def __init__(self, n_players=2, seed=None, shuffle_block=1024):
+        assert n_players >= 2, "Se necesitan al menos 2 jugadores"
+        assert 2 * n_players + 5 <= 52, "No hay cartas para tantos jugadores"
+        self.n_players = n_players
+        self.rng = np.random.default_rng(seed)
+        self.shuffle_block = shuffle_block
+        self.max_raises_in_round = 2
+
+        # Buffers preasignados
+        self.deck = array("B", range(52))
+        self._deck_view = memoryview(self.deck)
+        self.hands = array("B", bytes(2 * n_players))
+        self.board = array("B", bytes(5))
+        self._board_f = array("f", bytes(4 * 10))
+        # Una observación por asiento, cada una en un array('f') con su vista float32
+        self._bufs = [array("f", bytes(4 * OBS_SIZE)) for _ in range(n_players)]
+        self._views = [np.frombuffer(buf, dtype=np.float32) for buf in self._bufs]
+        # Oponentes de cada asiento en el orden de HoldemEnv (sólo los 3 primeros van al vector)
+        self._opp_slots = [tuple((16 + k, j) for k, j in enumerate([i for i in range(n_players) if i != p][:3]))
+                           for p in range(n_players)]
+        self._perms = b""
+        self._perm_pos = 0
+        self._block_ranks = []
+        self._no_reward = (0,) * n_players
+        self.reset()
+
+    @property
+    def obs(self) -> np.ndarray:
+        """Observación del jugador al que le toca"""
+        return self._views[self.current_player]
+
+    def _next_permutation(self):
+        if self._perm_pos >= len(self._perms):
+            n = self.n_players
+            perms = np.argsort(self.rng.random((self.shuffle_block, 52)), axis=1).astype(np.uint8)
+            # Fuerza de mano de cada asiento en cada mano del bloque, en una sola pasada
+            holes = perms[:, 52 - 2 * n:][:, ::-1].reshape(-1, n, 2)
+            boards = perms[:, 52 - 2 * n - 5:52 - 2 * n][:, ::-1]
+            self._block_ranks = showdown_batch(holes, boards)[0].tolist()
+            self._perms = perms.tobytes()
+            self._perm_pos = 0
+        pos = self._perm_pos
+        self._perm_pos = pos + 52
+        self._ranks = self._block_ranks[pos // 52]
+        return self._perms[pos:pos + 52]
+
+    def reset(self, deck: Optional[Sequence[int]] = None):
+        """
+        Nueva mano. `deck` permite fijar el orden del mazo (52 enteros); las
+        cartas se reparten desde el final, igual que HoldemEnv.deck.pop().
+        """
+        if deck is None:
+            self._deck_view[:] = self._next_permutation()
+        else:
+            self._deck_view[:] = bytes(deck)
+            self._ranks = None  # se evalúa en el showdown
+        n = self.n_players
+        hands = self.hands
+        hands[:] = self.deck[52 - 2 * n:][::-1]
+        for p, buf in enumerate(self._bufs):
+            buf[:] = _ZERO_OBS
+            a = hands[2 * p]
+            b = hands[2 * p + 1]
+            buf[0] = CARD_RANK_F[a]
+            buf[1] = CARD_SUIT_F[a]
+            buf[2] = CARD_RANK_F[b]
+            buf[3] = CARD_SUIT_F[b]
+        top = self._top = 52 - 2 * n
+        # El board ya está decidido: sus características se copian por tramos al repartir
+        board = self.board
+        board[:] = self.deck[top - 5:top][::-1]
+        board_f = self._board_f
+        for k in range(5):
+            c = board[k]
+            board_f[2 * k] = CARD_RANK_F[c]
+            board_f[2 * k + 1] = CARD_SUIT_F[c]
+        self.n_board = 0
+        self.bets = [1] * n
+        self.pot = n
+        self.max_bet = 1
+        self._n_at_max = n
+        self.current_player = 0
+        self.stage = 0
+        self.terminal = False
+        self.last_aggressive = -1
+        self.raises_this_round = 0
+        self._winners = None
+        return self._write_obs(0), {}
+
+    @property
+    def round_stage(self) -> str:
+        return STAGES[self.stage]
+
+    def legal_actions(self):
+        return [0, 1, 2]  # fold, check/call, bet/raise
+
+    def _write_obs(self, player: int) -> np.ndarray:
+        buf = self._bufs[player]
+        pot = self.pot
+        buf[14] = POT_F[pot] if pot < 1000 else 2.0
+        bets = self.bets
+        x = bets[player]
+        buf[15] = BET_F[x] if x < 100 else 2.0
+        for k, j in self._opp_slots[player]:
+            x = bets[j]
+            buf[k] = BET_F[x] if x < 100 else 2.0
+        return self._views[player]
+
+    def _deal_board(self, n: int):
+        k = self.n_board
+        self.n_board = end = k + n
+        self._top -= n
+        features = self._board_f[2 * k:2 * end]
+        for buf in self._bufs:
+            buf[4 + 2 * k:4 + 2 * end] = features
+
+    def step(self, player: int, action: int):
+        if self.terminal:
+            raise RuntimeError("Mano terminada.")
+        if player != self.current_player:
+            raise RuntimeError("No es turno del jugador.")
+        if action not in (0, 1, 2):
+            raise ValueError("Acción inválida.")
+
+        n = self.n_players
+        bets = self.bets
+
+        if action == 0:  # fold: gana el primer jugador distinto del que se retira
+            self.terminal = True
+            winner = 1 if player == 0 else 0
+            reward = [0] * n
+            reward[winner] = self.pot - bets[winner]
+            reward[player] = -reward[winner]
+            return None, tuple(reward), True, {"winner": winner}
+
+        if action == 2 and self.raises_this_round < self.max_raises_in_round:
+            # apuesta fija: +1 sobre la apuesta propia
+            bet = bets[player] + 1
+            bets[player] = bet
+            if bet > self.max_bet:
+                self.max_bet = bet
+                self._n_at_max = 1
+            elif bet == self.max_bet:
+                self._n_at_max += 1
+            self.pot += 1
+            self.raises_this_round += 1
+            self.last_aggressive = player
+            self.current_player = player = (player + 1) % n
+            return self._write_obs(player), self._no_reward, False, {}
+
+        # check/call (un raise por encima del tope cuenta como call)
+        max_bet = self.max_bet
+        if bets[player] != max_bet:
+            self.pot += max_bet - bets[player]
+            bets[player] = max_bet
+            self._n_at_max += 1
+        if self._n_at_max == n:
+            self.raises_this_round = 0
+            self.last_aggressive = -1
+            stage = self.stage
+            if stage == 0:
+                self._deal_board(3)
+            elif stage < 3:
+                self._deal_board(1)
+            elif stage == 3:
+                self.stage = 4
+                self.current_player = (player + 1) % n
+                self.terminal = True
+                winners = self._get_winners()
+                share = self.pot // len(winners)
+                reward = [share if i in winners else -bets[i] for i in range(n)]
+                return None, tuple(reward), True, {"winners": winners}
+            self.stage = stage = stage + 1
+            value = STAGE_VALUES[stage]
+            for buf in self._bufs:
+                buf[19] = value
+        self.current_player = player = (player + 1) % n
+        return self._write_obs(player), self._no_reward, False, {}
+
+    def _get_winners(self):
+        if self._winners is None:
+            ranks = self._ranks
+            if ranks is None:
+                board = list(self.board)
+                h = self.hands
+                ranks = [evaluate([h[2 * i], h[2 * i + 1]] + board) for i in range(self.n_players)]
+            best = max(ranks)
+            self._winners = [i for i, r in enumerate(ranks) if r == best]
+        return self._winners
+
+    def obs_dict(self, player: Optional[int] = None) -> Dict[str, Any]:
+        """Observación en el formato de HoldemEnv._get_obs (para agentes existentes)"""
+        if player is None:
+            player = self.current_player
+        return {
+            "hole": (int_to_card(self.hands[2 * player]), int_to_card(self.hands[2 * player + 1])),
+            "board": tuple(int_to_card(c) for c in self.board[:self.n_board]),
+            "pot": self.pot,
+            "own_bet": self.bets[player],
+            "opp_bets": tuple(self.bets[:player] + self.bets[player + 1:]),
+            "stage": self.round_stage,
+            "to_act": player,
+        }
+
+    def hands_to_cards(self, player: int):
+        return [int_to_card(self.hands[2 * player]), int_to_card(self.hands[2 * player + 1])]
+
+
+def _play(env, actions, n_hands, encode=None):
+    """Juega `n_hands` manos consumiendo acciones de una secuencia fija"""
+    k = 0
+    n_actions = len(actions)
+    for _ in range(n_hands):
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            if encode is not None:
+                encode(obs)
+            obs, _, done, _ = env.step(env.current_player, actions[k % n_actions])
+            k += 1
+
+
+def test_fast_env(n_hands=3000, bench_hands=20000, repeats=10):
+    """Test diferencial contra HoldemEnv en manos con semilla + benchmark"""
+    from holdem_env import HoldemEnv
+    from neural_agent import NeuralPokerAgent
+
+    encoder = NeuralPokerAgent.__new__(NeuralPokerAgent)
+    rng = np.random.default_rng(123)
+    # Acciones sesgadas hacia call/raise para llegar a showdown con frecuencia
+    probs = [0.05, 0.6, 0.35]
+
+    for n_players in (2, 3, 4, 6):
+        fast = FastHoldemEnv(n_players, seed=n_players)
+        slow = HoldemEnv(n_players, seed=0)
+        for _ in range(n_hands // 4):
+            fast_obs, _ = fast.reset()
+            deck = [int_to_card(c) for c in fast.deck]
+            slow.new_deck = lambda: setattr(slow, "deck", list(deck))
+            slow_obs, _ = slow.reset()
+            done = False
+            while True:
+                assert np.array_equal(fast_obs, encoder.obs_to_vector_enhanced(slow_obs))
+                assert fast.obs_dict() == slow_obs
+                if done:
+                    break
+                a = int(rng.choice(3, p=probs))
+                p = slow.current_player
+                slow_obs, r_slow, done, i_slow = slow.step(p, a)
+                fast_obs, r_fast, done_fast, i_fast = fast.step(p, a)
+                assert (r_fast, done_fast, i_fast) == (r_slow, done, i_slow)
+                if done:
+                    assert fast_obs is None and slow_obs is None
+                    break
+    print(f"✅ FastHoldemEnv idéntico a HoldemEnv en {n_hands} manos")
+
+    # Un agente necesita el vector de 20 características: HoldemEnv lo obtiene con
+    # obs_to_vector_enhanced, FastHoldemEnv ya lo entrega como observación
+    actions = rng.choice(3, size=100003, p=probs).tolist()
+    cases = (("HoldemEnv", HoldemEnv(2, seed=0), None, bench_hands // 4),
+             ("HoldemEnv+vector", HoldemEnv(2, seed=0), encoder.obs_to_vector_enhanced, bench_hands // 4),
+             ("FastHoldemEnv", FastHoldemEnv(2, seed=0), None, bench_hands))
+    # La máquina puede estar cargada: medidas alternadas entre entornos, se toma la mejor
+    timings = dict.fromkeys([case[0] for case in cases], 0.0)
+    for name, env, encode, hands in cases:
+        _play(env, actions, hands // 10, encode)  # calentamiento
+    for _ in range(repeats):
+        for name, env, encode, hands in cases:
+            start = time.perf_counter()
+            _play(env, actions, hands, encode)
+            timings[name] = max(timings[name], hands / (time.perf_counter() - start))
+    for name in timings:
+        print(f"   {name:17}: {timings[name]:,.0f} manos/s (mejor de {repeats})")
+    print(f"   Aceleración: {timings['FastHoldemEnv'] / timings['HoldemEnv']:.1f}x (sólo entorno), "
+          f"{timings['FastHoldemEnv'] / timings['HoldemEnv+vector']:.1f}x (entorno + vector)")
+
+
+if __name__ == "__main__":
+    test_fast_env()
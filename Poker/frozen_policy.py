@@ -0,0 +1,171 @@
+# frozen_policy.py
+"""
+Inferencia congelada de PokerDQN.
+
+export_frozen fusiona cada Linear con su BatchNorm (estadísticas acumuladas),
+elimina los Dropout y guarda un TorchScript congelado junto al checkpoint:
+    poker_holdem_dqn_final.pth -> poker_holdem_dqn_final.jit.pt
+
+Para cargarlo sólo hace falta torch: ni neural_agent ni el optimizador.
+El resultado equivale a PokerDQN en modo eval() (BatchNorm aplicada siempre).
+export_numpy guarda las mismas capas en un .npz para numpy_policy (sin torch).
+
+Uso:
+    python frozen_policy.py poker_holdem_dqn_final.pth   # exporta y mide
+    policy = FrozenPolicy("poker_holdem_dqn_final.jit.pt")
+    action = policy.action(obs)
+"""
+import copy
+import os
+import random
+import sys
+import time
+import warnings
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from numpy_policy import DIGEST_KEY, NumpyPolicy, checkpoint_digest, is_current, numpy_path
+
+FROZEN_SUFFIX = ".jit.pt"
+
+# torch >= 2.5 marca la API TorchScript como obsoleta, pero sigue siendo la vía sin dependencias extra
+warnings.filterwarnings("ignore", category=FutureWarning, module=r"torch\.jit")
+
+
+def frozen_path(checkpoint_path: str) -> str:
+    """Ruta del artefacto congelado correspondiente a un checkpoint .pth"""
+    return os.path.splitext(checkpoint_path)[0] + FROZEN_SUFFIX
+
+
+def fuse_linear_bn(linear: nn.Linear, bn: nn.BatchNorm1d) -> nn.Linear:
+    """Linear seguida de BatchNorm (modo eval) como una sola Linear"""
+    scale = bn.weight / torch.sqrt(bn.running_var + bn.eps)
+    fused = nn.Linear(linear.in_features, linear.out_features)
+    fused.weight.copy_(linear.weight * scale[:, None])
+    fused.bias.copy_((linear.bias - bn.running_mean) * scale + bn.bias)
+    return fused
+
+
+def fuse_network(net) -> nn.Sequential:
+    """PokerDQN (Linear, BatchNorm, Dropout)* + salida -> Sequential de Linear/ReLU"""
+    modules = []
+    layers = list(net.layers)
+    with torch.no_grad():
+        for i in range(0, len(layers), 3):
+            modules += [fuse_linear_bn(layers[i], layers[i + 1]), nn.ReLU()]
+        output = nn.Linear(net.output_layer.in_features, net.output_layer.out_features)
+        output.load_state_dict(net.output_layer.state_dict())
+    modules.append(output)
+    return nn.Sequential(*modules).eval()
+
+
+def export_frozen(net, checkpoint_path: str) -> str:
+    """Guarda la red fusionada y congelada junto a `checkpoint_path`; devuelve la ruta"""
+    fused = fuse_network(copy.deepcopy(net).cpu())
+    frozen = torch.jit.optimize_for_inference(torch.jit.script(fused))
+    path = frozen_path(checkpoint_path)
+    frozen.save(path, _extra_files={DIGEST_KEY: checkpoint_digest(checkpoint_path)})
+    return path
+
+
+def export_numpy(net, checkpoint_path: str) -> str:
+    """Guarda las capas fusionadas como .npz (W0, b0, W1, ...) para numpy_policy; devuelve la ruta"""
+    fused = fuse_network(copy.deepcopy(net).cpu())
+    weights = {}
+    for i, linear in enumerate(m for m in fused if isinstance(m, nn.Linear)):
+        weights[f"W{i}"] = linear.weight.detach().numpy().T
+        weights[f"b{i}"] = linear.bias.detach().numpy()
+    weights[DIGEST_KEY] = np.array(checkpoint_digest(checkpoint_path))
+    path = numpy_path(checkpoint_path)
+    np.savez(path, **weights)
+    return path
+
+
+def load_frozen(path: str):
+    """Carga el artefacto congelado (sólo torch)"""
+    return torch.jit.load(path, map_location="cpu").eval()
+
+
+class FrozenPolicy:
+    """Política greedy sobre el artefacto congelado, con la interfaz .action(obs) de los agentes"""
+
+    def __init__(self, path: str, encoder=None, epsilon: float = 0.0):
+        self.model = load_frozen(path)
+        self.epsilon = epsilon
+        self._encoder = encoder
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            from obs_encoder import ObsEncoder
+            self._encoder = ObsEncoder()
+        return self._encoder
+
+    def q_values(self, states: np.ndarray) -> np.ndarray:
+        """Q-values para un batch (N, input_size) float32"""
+        with torch.inference_mode():
+            return self.model(torch.from_numpy(np.atleast_2d(states))).numpy()
+
+    def action_from_vector(self, vector: np.ndarray) -> int:
+        with torch.inference_mode():
+            return int(self.model(torch.from_numpy(vector).unsqueeze(0)).argmax())
+
+    def action(self, state) -> int:
+        if random.random() < self.epsilon:
+            return random.choice([0, 1, 2])
+        return self.action_from_vector(self.encoder(state))
+
+
+def test_frozen_policy(checkpoint="poker_holdem_dqn_final.pth", n=5000):
+    """Exporta el checkpoint, comprueba que coincide con PokerDQN en eval() y mide la latencia"""
+    from inference_server import network_from_checkpoint
+
+    checkpoint = os.path.join(os.path.dirname(os.path.abspath(__file__)), checkpoint)
+    net = network_from_checkpoint(checkpoint)
+    path = export_frozen(net, checkpoint)
+    print(f"✅ Artefacto congelado: {path} ({os.path.getsize(path) // 1024} KB)")
+
+    policy = FrozenPolicy(path)
+    states = np.random.default_rng(0).random((256, net.layers[0].in_features), dtype=np.float32)
+    with torch.no_grad():
+        expected = net(torch.from_numpy(states)).numpy()
+    assert np.allclose(policy.q_values(states), expected, atol=1e-4)
+    assert (policy.q_values(states).argmax(1) == expected.argmax(1)).all()
+    assert is_current(path, checkpoint)
+
+    vector = states[0]
+    for _ in range(200):
+        policy.action_from_vector(vector)
+    start = time.perf_counter()
+    for _ in range(n):
+        policy.action_from_vector(vector)
+    frozen_us = (time.perf_counter() - start) / n * 1e6
+
+    x = torch.from_numpy(vector)
+    start = time.perf_counter()
+    with torch.no_grad():
+        for _ in range(n):
+            net(x).argmax().item()
+    module_us = (time.perf_counter() - start) / n * 1e6
+    print(f"   Decisión: {frozen_us:.0f} µs congelado vs {module_us:.0f} µs PokerDQN")
+
+    # Misma red evaluada sólo con NumPy
+    numpy_policy = NumpyPolicy(export_numpy(net, checkpoint))
+    assert is_current(numpy_path(checkpoint), checkpoint)
+    assert np.allclose(numpy_policy.q_values(states), expected, atol=1e-4)
+    start = time.perf_counter()
+    for _ in range(n):
+        numpy_policy.action_from_vector(vector)
+    print(f"   NumPy: {(time.perf_counter() - start) / n * 1e6:.0f} µs por decisión, sin importar torch")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from inference_server import network_from_checkpoint
+        for ckpt in sys.argv[1:]:
+            net = network_from_checkpoint(ckpt)
+            print(f"✅ {export_frozen(net, ckpt)} | {export_numpy(net, ckpt)}")
+    else:
+        test_frozen_policy()
@@ -0,0 +1,363 @@
+# hand_evaluator.py
+"""
+Evaluador de manos de poker basado en tablas precalculadas.
+
+Las cartas se codifican como enteros pequeños 0..51:
+    carta = (rank - 2) * 4 + indice_palo
+con rank 2..14 (11=J, 12=Q, 13=K, 14=A) y el palo según SUITS.
+
+Cualquier mano de 5, 6 o 7 cartas se reduce a un único entero comparable
+(1..7462, mayor = mejor) mediante dos tablas:
+  - Sin color: la mano depende sólo del multiconjunto de ranks, que se
+    codifica como suma de 5**rank (clave perfecta, sin colisiones).
+  - Con color: con 5+ cartas de un mismo palo no puede haber póker ni full,
+    así que basta con la máscara de bits de los ranks de ese palo.
+"""
+import threading
+from typing import Iterable, List, Sequence, Tuple
+import numpy as np
+
+RANKS = [2,3,4,5,6,7,8,9,10,11,12,13,14]  # 11=J,12=Q,13=K,14=A
+SUITS = ["Corazones","Diamantes","Trebol","Copas"]
+SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+
+# Categorías (mismo orden que el valor empaquetado)
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+CATEGORY_NAMES = [
+    "Carta alta", "Pareja", "Doble pareja", "Trío", "Escalera",
+    "Color", "Full", "Póker", "Escalera de color"
+]
+
+# Claves por carta: base 5 para ranks (hasta 4 copias) y base 8 para palos (hasta 7 cartas)
+CARD_RANK_KEY = tuple(5 ** (c >> 2) for c in range(52))
+CARD_SUIT_KEY = tuple(1 << (3 * (c & 3)) for c in range(52))
+CARD_RANK_BIT = tuple(1 << (c >> 2) for c in range(52))
+
+
+def card_to_int(card: Tuple[int, str]) -> int:
+    """Convierte una carta (rank, palo) del entorno a su índice 0..51"""
+    r, s = card
+    return (r - 2) * 4 + SUIT_INDEX[s]
+
+
+def int_to_card(c: int) -> Tuple[int, str]:
+    """Convierte un índice 0..51 a carta (rank, palo)"""
+    return (RANKS[c >> 2], SUITS[c & 3])
+
+
+def cards_to_ints(cards: Iterable[Tuple[int, str]]) -> List[int]:
+    return [card_to_int(c) for c in cards]
+
+
+# ---------- Construcción de tablas ----------
+def _straight_high(mask: int):
+    """Índice de rank más alto de una escalera dentro de la máscara, o None"""
+    for high in range(12, 3, -1):
+        window = 0b11111 << (high - 4)
+        if mask & window == window:
+            return high
+    # Rueda: A-2-3-4-5
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return None
+
+
+_STRAIGHT_HIGH = [_straight_high(m) for m in range(1 << 13)]
+_STRAIGHT_HIGH = [-1 if h is None else h for h in _STRAIGHT_HIGH]
+
+
+def _pack(category: int, ranks: Sequence[int]) -> int:
+    value = category
+    for i in range(5):
+        value = (value << 4) | (ranks[i] if i < len(ranks) else 0)
+    return value
+
+
+def _score_counts(counts: Sequence[int]) -> int:
+    """Mejor mano de 5 cartas (sin color) para un vector de conteos por rank"""
+    present = []
+    quads = []
+    trips = []
+    pairs = []
+    mask = 0
+    for r in range(12, -1, -1):
+        c = counts[r]
+        if c:
+            present.append(r)
+            mask |= 1 << r
+            if c == 2:
+                pairs.append(r)
+            elif c == 3:
+                trips.append(r)
+            elif c == 4:
+                quads.append(r)
+
+    if quads:
+        q = quads[0]
+        return _pack(QUADS, [q, present[1] if present[0] == q else present[0]])
+    if trips and (len(trips) >= 2 or pairs):
+        t = trips[0]
+        p = max(trips[1:] + pairs)
+        return _pack(FULL_HOUSE, [t, p])
+    high = _STRAIGHT_HIGH[mask]
+    if high >= 0:
+        return _pack(STRAIGHT, [high])
+    if trips:
+        t = trips[0]
+        return _pack(TRIPS, [t] + [r for r in present if r != t][:2])
+    if len(pairs) >= 2:
+        p1, p2 = pairs[0], pairs[1]
+        return _pack(TWO_PAIR, [p1, p2, next(r for r in present if r != p1 and r != p2)])
+    if pairs:
+        p = pairs[0]
+        return _pack(PAIR, [p] + [r for r in present if r != p][:3])
+    return _pack(HIGH_CARD, present[:5])
+
+
+def _score_flush(mask: int) -> int:
+    high = _STRAIGHT_HIGH[mask]
+    if high >= 0:
+        return _pack(STRAIGHT_FLUSH, [high])
+    return _pack(FLUSH, [r for r in range(12, -1, -1) if mask >> r & 1][:5])
+
+
+def _rank_count_vectors(n_min=5, n_max=7):
+    """
+    Genera (clave, conteos) para todos los vectores de conteo por rank
+    (13 ranks, máx. 4 por rank) con n_min..n_max cartas
+    """
+    counts = [0] * 13
+
+    def rec(r, total, key):
+        if r == 13:
+            if total >= n_min:
+                yield key, counts
+            return
+        weight = 5 ** r
+        for c in range(min(4, n_max - total) + 1):
+            counts[r] = c
+            yield from rec(r + 1, total + c, key + c * weight)
+        counts[r] = 0
+
+    yield from rec(0, 0, 0)
+
+
+def _build_tables():
+    packed_rank = {}
+    for key, counts in _rank_count_vectors():
+        packed_rank[key] = _score_counts(counts)
+
+    packed_flush = {}
+    for mask in range(1 << 13):
+        if bin(mask).count("1") >= 5:
+            packed_flush[mask] = _score_flush(mask)
+
+    # Compactar a ranking denso 1..7462 (mayor = mejor)
+    ordered = sorted(set(packed_rank.values()) | set(packed_flush.values()))
+    dense = {v: i + 1 for i, v in enumerate(ordered)}
+
+    rank_table = {k: dense[v] for k, v in packed_rank.items()}
+    flush_table = [0] * (1 << 13)
+    for mask, v in packed_flush.items():
+        flush_table[mask] = dense[v]
+
+    # Primer valor denso de cada categoría, para decodificar
+    category_floor = [0] * 9
+    for v in reversed(ordered):
+        category_floor[v >> 20] = dense[v]
+
+    # Palo con color (>=5 cartas) para cada suma de claves de palo
+    flush_suit = [-1] * (1 << 12)
+    for key in range(1 << 12):
+        for s in range(4):
+            if (key >> (3 * s)) & 7 >= 5:
+                flush_suit[key] = s
+    return rank_table, flush_table, category_floor, flush_suit
+
+
+N_HAND_VALUES = 7462  # clases de manos distintas
+
+# Las tablas se construyen en el primer uso (~0.5 s) para no retrasar el arranque
+RANK_TABLE = FLUSH_TABLE = CATEGORY_FLOOR = FLUSH_SUIT = None
+_NP_TABLES = None
+_TABLES_LOCK = threading.RLock()  # varios hilos (bots, GUI) pueden pedir las tablas a la vez
+
+
+def load_tables():
+    """Construye las tablas de evaluación si aún no existen"""
+    global RANK_TABLE, FLUSH_TABLE, CATEGORY_FLOOR, FLUSH_SUIT
+    with _TABLES_LOCK:
+        if RANK_TABLE is None:
+            RANK_TABLE, FLUSH_TABLE, CATEGORY_FLOOR, FLUSH_SUIT = _build_tables()
+
+
+# ---------- API ----------
+def evaluate(cards: Sequence[int]) -> int:
+    """
+    Evalúa 5, 6 o 7 cartas codificadas como enteros 0..51.
+    Retorna un entero 1..7462, mayor = mejor; manos equivalentes dan el mismo valor.
+    """
+    if RANK_TABLE is None:
+        load_tables()
+    suit_key = 0
+    rank_key = 0
+    for c in cards:
+        suit_key += CARD_SUIT_KEY[c]
+        rank_key += CARD_RANK_KEY[c]
+    s = FLUSH_SUIT[suit_key]
+    if s >= 0:
+        mask = 0
+        for c in cards:
+            if c & 3 == s:
+                mask |= CARD_RANK_BIT[c]
+        return FLUSH_TABLE[mask]
+    return RANK_TABLE[rank_key]
+
+
+def evaluate_cards(cards: Iterable[Tuple[int, str]]) -> int:
+    """Evalúa cartas en el formato del entorno: [(rank, palo), ...]"""
+    return evaluate([card_to_int(c) for c in cards])
+
+
+def hand_category(value: int) -> int:
+    """Categoría (HIGH_CARD..STRAIGHT_FLUSH) de un valor devuelto por evaluate"""
+    load_tables()
+    for cat in range(8, -1, -1):
+        if value >= CATEGORY_FLOOR[cat]:
+            return cat
+    return HIGH_CARD
+
+
+def hand_name(value: int) -> str:
+    return CATEGORY_NAMES[hand_category(value)]
+
+
+# Claves aditivas por rank con sumas únicas para cualquier multiconjunto de 7 cartas
+# (constantes del evaluador "SpecialK"); la suma máxima cabe en una tabla directa.
+SEVEN_RANK_KEYS = (0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181)
+
+
+def _load_np_tables():
+    """Versiones NumPy de las tablas para el modo batch (se construyen en el primer uso)"""
+    global _NP_TABLES
+    if _NP_TABLES is not None:
+        return _NP_TABLES
+    with _TABLES_LOCK:
+        if _NP_TABLES is None:
+            load_tables()
+            keys = np.fromiter(RANK_TABLE.keys(), dtype=np.int64, count=len(RANK_TABLE))
+            vals = np.fromiter(RANK_TABLE.values(), dtype=np.int32, count=len(RANK_TABLE))
+            order = np.argsort(keys)
+
+            # Tabla directa para 7 cartas (~15 MB int16): clave aditiva -> valor
+            seven = np.zeros(4 * SEVEN_RANK_KEYS[12] + 3 * SEVEN_RANK_KEYS[11] + 1, dtype=np.int16)
+            for key, counts in _rank_count_vectors(7, 7):
+                seven[sum(c * k for c, k in zip(counts, SEVEN_RANK_KEYS))] = RANK_TABLE[key]
+
+            _NP_TABLES = {
+                "rank_keys": keys[order],
+                "rank_vals": vals[order],
+                "seven": seven,
+                "flush": np.asarray(FLUSH_TABLE, dtype=np.int32),
+                "flush_suit": np.asarray(FLUSH_SUIT, dtype=np.int8),
+                "card_rank5": np.asarray(CARD_RANK_KEY, dtype=np.int64),
+                "card_rank7": np.asarray([SEVEN_RANK_KEYS[c >> 2] for c in range(52)], dtype=np.int32),
+                "card_suit": np.asarray(CARD_SUIT_KEY, dtype=np.int16),
+            }
+    return _NP_TABLES
+
+
+def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+    """
+    Evalúa muchas manos a la vez.
+
+    Los histogramas de ranks y palos se acumulan columna a columna como dígitos
+    empaquetados (base 5 / claves aditivas para ranks, campos de 3 bits para
+    palos); las filas con color se resuelven con la máscara de bits del palo
+    dominante, que también detecta la escalera de color.
+
+    Args:
+        cards: array (N, K) de índices 0..51 con K en 5..7 (típicamente uint8, K=7)
+
+    Returns:
+        np.ndarray (N,) int32 con el mismo valor que evaluate() para cada fila
+    """
+    t = _load_np_tables()
+    cards = np.asarray(cards)
+    n, k = cards.shape
+    cols = np.ascontiguousarray(cards.T)
+
+    # Histograma de palos -> palo con color (o -1)
+    suit_key = t["card_suit"][cols[0]].copy()
+    for j in range(1, k):
+        suit_key += t["card_suit"][cols[j]]
+    flush_suit = t["flush_suit"][suit_key]
+
+    # Histograma de ranks -> valor sin color
+    if k == 7:
+        rank_key = t["card_rank7"][cols[0]].copy()
+        for j in range(1, k):
+            rank_key += t["card_rank7"][cols[j]]
+        result = t["seven"][rank_key].astype(np.int32)
+    else:
+        rank_key = t["card_rank5"][cols[0]].copy()
+        for j in range(1, k):
+            rank_key += t["card_rank5"][cols[j]]
+        result = t["rank_vals"][np.searchsorted(t["rank_keys"], rank_key)]
+
+    # Filas con color: máscara de ranks del palo -> tabla de 8192 entradas
+    flush_rows = np.nonzero(flush_suit >= 0)[0]
+    if flush_rows.size:
+        sub = cards[flush_rows].astype(np.int32)
+        in_suit = (sub & 3) == flush_suit[flush_rows][:, None]
+        masks = np.where(in_suit, 1 << (sub >> 2), 0).sum(axis=1)
+        result[flush_rows] = t["flush"][masks]
+    return result
+
+
+def test_evaluator():
+    """Comprobaciones rápidas del evaluador"""
+    import random
+    import time
+
+    def ev(txt):
+        cards = []
+        for tok in txt.split():
+            r = {"A": 14, "K": 13, "Q": 12, "J": 11, "T": 10}.get(tok[0]) or int(tok[0])
+            s = {"h": "Corazones", "d": "Diamantes", "c": "Trebol", "s": "Copas"}[tok[1]]
+            cards.append((r, s))
+        return evaluate_cards(cards)
+
+    load_tables()
+    assert max(FLUSH_TABLE) == N_HAND_VALUES
+    assert len(set(RANK_TABLE.values()) | set(FLUSH_TABLE)) - 1 == N_HAND_VALUES
+    assert hand_name(ev("Ah Kh Qh Jh Th 2c 3d")) == "Escalera de color"
+    assert hand_name(ev("Ah 2d 3c 4s 5h 9c 9d")) == "Escalera"
+    assert ev("Ah 2d 3c 4s 5h") < ev("2h 3d 4c 5s 6h")
+    assert hand_name(ev("9h 9d 9c 4s 4h 2c 3d")) == "Full"
+    assert hand_name(ev("2h 7h 9h Jh Kh Kc Kd")) == "Color"
+    assert ev("Ah Ad Kc Ks 2h 2c 7d") == ev("Ah Ad Kc Ks 7d 3c 4s")
+    assert ev("Ah Ad 9c 9s 8h") > ev("Kh Kd Qc Qs Ah")
+    print("✅ Evaluador correcto")
+
+    rng = random.Random(0)
+    hands = [rng.sample(range(52), 7) for _ in range(100000)]
+    t0 = time.perf_counter()
+    for h in hands:
+        evaluate(h)
+    dt = time.perf_counter() - t0
+    print(f"⚡ {len(hands)/dt:,.0f} evaluaciones/s (escalar, 7 cartas)")
+
+    batch = np.array(hands, dtype=np.uint8)
+    assert np.array_equal(evaluate_batch(batch), [evaluate(h) for h in hands])
+    big = np.argsort(np.random.default_rng(0).random((1000000, 52)), axis=1)[:, :7].astype(np.uint8)
+    assert np.array_equal(evaluate_batch(big[:5000, :6]), [evaluate(h) for h in big[:5000, :6].tolist()])
+    evaluate_batch(big[:1000])
+    t0 = time.perf_counter()
+    evaluate_batch(big)
+    dt = time.perf_counter() - t0
+    print(f"⚡ {len(big)/dt:,.0f} evaluaciones/s (batch NumPy, 7 cartas)")
+
+
+if __name__ == "__main__":
+    test_evaluator()
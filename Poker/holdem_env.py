@@ -1,5 +1,7 @@
 import random
 from typing import Tuple, Dict, Any, List
+import numpy as np
+from hand_evaluator import evaluate_cards, evaluate_batch
 
 RANKS = [2,3,4,5,6,7,8,9,10,11,12,13,14]  # 11=J,12=Q,13=K,14=A
 SUITS = ["Corazones","Diamantes","Trebol","Copas"]
@@ -39,6 +41,7 @@ class HoldemEnv:
         self.last_aggressive = -1
         self.max_raises_in_round = 2
         self.raises_this_round = 0
+        self._winners = None
 
         # Ante simple: todos ponen 1 ficha
         self.bets = [1]*self.n_players
@@ -138,25 +141,11 @@ class HoldemEnv:
         self._advance_turn()
 
     def _hand_rank(self, cards):
-        ranks = sorted([c[0] for c in cards], reverse=True)
-        counts = {r:ranks.count(r) for r in set(ranks)}
-        cnts = sorted(counts.items(), key=lambda x:(x[1],x[0]), reverse=True)
-        if cnts[0][1] == 3:
-            return (4, cnts[0][0])
-        if len(cnts) >= 2 and cnts[0][1]==2 and cnts[1][1]==2:
-            return (3, cnts[0][0], cnts[1][0])
-        if cnts[0][1] == 2:
-            kickers = [r for r in ranks if r != cnts[0][0]]
-            return (2, cnts[0][0], kickers)
-        return (1, ranks)
+        # Valor entero comparable (mayor = mejor), ver hand_evaluator
+        return evaluate_cards(cards)
 
     def _showdown_rewards(self):
-        hands_ranks = []
-        for i in range(self.n_players):
-            cards = self.hands[i] + self.board
-            hands_ranks.append(self._hand_rank(cards))
-        winner_rank = max(hands_ranks)
-        winners = [i for i,rnk in enumerate(hands_ranks) if rnk == winner_rank]
+        winners = self._get_winners()
         reward = [0]*self.n_players
         share = self.pot // len(winners)
         for w in winners:
@@ -167,13 +156,35 @@ class HoldemEnv:
         return tuple(reward)
 
     def _get_winners(self):
-        hands_ranks = []
-        for i in range(self.n_players):
-            cards = self.hands[i] + self.board
-            hands_ranks.append(self._hand_rank(cards))
-        winner_rank = max(hands_ranks)
-        winners = [i for i,rnk in enumerate(hands_ranks) if rnk == winner_rank]
-        return winners
+        # Se evalúa una sola vez por showdown y se reutiliza
+        if self._winners is None:
+            hands_ranks = [self._hand_rank(self.hands[i] + self.board) for i in range(self.n_players)]
+            winner_rank = max(hands_ranks)
+            self._winners = [i for i,rnk in enumerate(hands_ranks) if rnk == winner_rank]
+        return self._winners
 
     def hands_to_cards(self, player:int):
         return list(self.hands[player])
+
+
+def showdown_batch(holes, boards, active=None):
+    """
+    Resuelve muchos showdowns (mesas en paralelo) con una sola llamada.
+
+    Args:
+        holes: array (N, P, 2) uint8 con las cartas ocultas (índices 0..51) de cada jugador
+        boards: array (N, 5) uint8 con el board de cada mesa
+        active: máscara opcional (N, P) bool; los jugadores inactivos no pueden ganar
+
+    Returns:
+        (strength, winners): fuerza de mano (N, P) int32 y máscara de ganadores (N, P) bool
+    """
+    holes = np.asarray(holes, dtype=np.uint8)
+    boards = np.asarray(boards, dtype=np.uint8)
+    n, p, _ = holes.shape
+    cards = np.concatenate([holes, np.broadcast_to(boards[:, None, :], (n, p, 5))], axis=2)
+    strength = evaluate_batch(cards.reshape(n * p, 7)).reshape(n, p)
+    if active is not None:
+        strength = np.where(active, strength, 0)
+    winners = strength == strength.max(axis=1, keepdims=True)
+    return strength, winners
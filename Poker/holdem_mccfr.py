@@ -0,0 +1,432 @@
+# holdem_mccfr.py
+"""
+MCCFR con muestreo externo para el Hold'em limitado de HoldemEnv (heads-up).
+
+- Árbol de apuestas: los estados públicos (fase, apuestas, raises de la ronda,
+  jugador) que generan las reglas de HoldemEnv: ante 1, apuesta fija de 1,
+  max_raises_in_round = 2. Son sólo 48 nodos.
+- Abstracción de cartas: en cada fase la mano de cada jugador se reduce a un
+  bucket de equidad contra una mano aleatoria (tabla preflop_equity en el
+  preflop, rollouts vectorizados con evaluate_batch en flop/turn/river).
+- Infoset = nodo * n_buckets + bucket: regrets y estrategia acumulada son dos
+  arrays float32 (n_infosets, 3) indexados por ese entero.
+- train_parallel reparte las iteraciones entre procesos y suma sus regrets
+  cada `merge_every` iteraciones; save/load guardan el checkpoint en .npz.
+- MCCFRPolicy juega la estrategia media con la interfaz .action(obs) de los
+  agentes de poker_agent.
+
+Uso:
+    python holdem_mccfr.py 20000 4        # iteraciones, procesos
+    policy = MCCFRPolicy("holdem_mccfr.npz")
+    action = policy.action(obs)
+"""
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from hand_evaluator import card_to_int, evaluate_batch
+from preflop_equity import load_table
+
+STAGES = ("preflop", "flop", "turn", "river")
+BOARD_SIZE = (0, 3, 4, 5)
+N_ACTIONS = 3  # fold, check/call, bet/raise
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "holdem_mccfr.npz")
+
+
+class BettingTree:
+    """
+    Estados públicos de una mano heads-up de HoldemEnv.
+
+    Atributos (M nodos de decisión):
+        states: (fase, apuestas, raises_this_round, jugador) de cada nodo
+        player, stage: (M,) jugador en turno y fase
+        legal: (M, 3) acciones legales (raise sólo si quedan raises)
+        child: (M, 3) nodo siguiente, -1 si la acción termina la mano
+        payoff: (M, 3, 3, 2) pagos de HoldemEnv al terminar con esa acción, por
+            resultado del showdown (gana 0, gana 1, empate) y jugador
+        by_obs: (fase, apuestas, jugador) -> nodos compatibles con una observación
+    """
+
+    def __init__(self, max_raises=2, ante=1):
+        self.max_raises = max_raises
+        self.states = []
+        self.index = {}
+        self._edges = {}
+        self._build((0, (ante, ante), 0, 0))
+
+        m = len(self.states)
+        self.player = np.array([s[3] for s in self.states], dtype=np.int8)
+        self.stage = np.array([s[0] for s in self.states], dtype=np.int8)
+        self.legal = np.zeros((m, N_ACTIONS), dtype=bool)
+        self.child = np.full((m, N_ACTIONS), -1, dtype=np.int32)
+        self.payoff = np.zeros((m, N_ACTIONS, 3, 2), dtype=np.float32)
+        self.by_obs = {}
+        for node, state in enumerate(self.states):
+            stage, bets, _, player = state
+            self.by_obs.setdefault((stage, bets, player), []).append(node)
+            for action, (kind, value) in self._edges[state].items():
+                self.legal[node, action] = True
+                if kind == "node":
+                    self.child[node, action] = self.index[value]
+                else:
+                    self.payoff[node, action] = value
+
+    def _build(self, state):
+        """Recorre los estados alcanzables aplicando las reglas de HoldemEnv.step"""
+        if state in self.index:
+            return
+        self.index[state] = len(self.states)
+        self.states.append(state)
+        stage, bets, raises, player = state
+        edges = self._edges[state] = {}
+
+        # fold: gana el otro jugador y el que se retira pierde su apuesta
+        fold = [0.0, 0.0]
+        fold[1 - player] = bets[player]
+        fold[player] = -bets[player]
+        edges[0] = ("terminal", [fold] * 3)
+
+        # check/call
+        called = list(bets)
+        called[player] = max(bets)
+        called = tuple(called)
+        if called[0] == called[1]:
+            if stage == 3:
+                pot = sum(called)
+                edges[1] = ("terminal", [[pot, -called[1]], [-called[0], pot], [pot // 2, pot // 2]])
+            else:
+                edges[1] = ("node", (stage + 1, called, 0, 1 - player))
+        else:
+            edges[1] = ("node", (stage, called, raises, 1 - player))
+
+        # bet/raise: apuesta fija de 1 sobre la propia (por encima del tope es un call)
+        if raises < self.max_raises:
+            raised = list(bets)
+            raised[player] += 1
+            edges[2] = ("node", (stage, tuple(raised), raises + 1, 1 - player))
+
+        for kind, value in edges.values():
+            if kind == "node":
+                self._build(value)
+
+
+def _hole_classes(holes):
+    """hand_class de preflop_equity para un array (N, 2) de cartas 0..51"""
+    a, b = holes[:, 0].astype(np.int64), holes[:, 1].astype(np.int64)
+    hi, lo = np.maximum(a >> 2, b >> 2), np.minimum(a >> 2, b >> 2)
+    return np.where((a & 3) == (b & 3), hi * 13 + lo, lo * 13 + hi)
+
+
+def hand_strength(holes, boards, rollouts, rng):
+    """
+    Equidad de cada mano (N, 2) con su board parcial (N, k) contra una mano
+    aleatoria, estimada con `rollouts` completaciones por fila.
+    """
+    n, k = boards.shape
+    known = np.concatenate([holes, boards], axis=1).astype(np.int64)
+    keys = rng.random((n, rollouts, 52))
+    np.put_along_axis(keys, np.broadcast_to(known[:, None, :], (n, rollouts, k + 2)), 2.0, axis=2)
+    picks = np.argsort(keys, axis=2)[:, :, :7 - k].astype(np.uint8)
+    full_board = np.concatenate([np.broadcast_to(boards[:, None, :], (n, rollouts, k)), picks[:, :, 2:]], axis=2)
+    hero = np.concatenate([np.broadcast_to(holes[:, None, :], (n, rollouts, 2)), full_board], axis=2)
+    opp = np.concatenate([picks[:, :, :2], full_board], axis=2)
+    hero_val = evaluate_batch(hero.reshape(-1, 7)).reshape(n, rollouts)
+    opp_val = evaluate_batch(opp.reshape(-1, 7)).reshape(n, rollouts)
+    return ((hero_val > opp_val) + 0.5 * (hero_val == opp_val)).mean(axis=1)
+
+
+def to_bucket(equity, n_buckets):
+    return np.minimum((np.asarray(equity) * n_buckets).astype(np.int64), n_buckets - 1).astype(np.uint8)
+
+
+def deal_buckets(deals, n_buckets, rollouts, rng):
+    """
+    Buckets de equidad por jugador y fase para repartos (K, 9): hole0, hole1, board.
+    Returns: (K, 2, 4) uint8
+    """
+    deals = np.asarray(deals, dtype=np.uint8)
+    table = load_table()[:, 0]
+    buckets = np.empty((len(deals), 2, 4), dtype=np.uint8)
+    for p in (0, 1):
+        holes = deals[:, 2 * p:2 * p + 2]
+        buckets[:, p, 0] = to_bucket(table[_hole_classes(holes)], n_buckets)
+        for stage in (1, 2, 3):
+            boards = deals[:, 4:4 + BOARD_SIZE[stage]]
+            buckets[:, p, stage] = to_bucket(hand_strength(holes, boards, rollouts, rng), n_buckets)
+    return buckets
+
+
+def showdown_outcomes(deals):
+    """0 si gana el jugador 0, 1 si gana el jugador 1, 2 si empatan"""
+    deals = np.asarray(deals, dtype=np.uint8)
+    v0 = evaluate_batch(np.concatenate([deals[:, 0:2], deals[:, 4:9]], axis=1))
+    v1 = evaluate_batch(np.concatenate([deals[:, 2:4], deals[:, 4:9]], axis=1))
+    return np.where(v0 > v1, 0, np.where(v1 > v0, 1, 2))
+
+
+class HoldemMCCFR:
+    """
+    Solver MCCFR de muestreo externo sobre BettingTree + buckets de equidad.
+    """
+
+    def __init__(self, n_buckets=10, rollouts=64, seed=None, tree=None):
+        self.tree = tree or BettingTree()
+        self.n_buckets = n_buckets
+        self.rollouts = rollouts
+        self.n_infosets = len(self.tree.states) * n_buckets
+        self.regret = np.zeros((self.n_infosets, N_ACTIONS), dtype=np.float32)
+        self.strategy_sum = np.zeros((self.n_infosets, N_ACTIONS), dtype=np.float32)
+        self.iterations = 0
+        self.rng = np.random.default_rng(seed)
+        self.random = random.Random(seed)
+
+        # Árbol como listas de Python para el recorrido
+        tree = self.tree
+        self._player = tree.player.tolist()
+        self._stage = tree.stage.tolist()
+        self._child = tree.child.tolist()
+        self._payoff = tree.payoff.tolist()
+        self._actions = [tuple(np.flatnonzero(row).tolist()) for row in tree.legal]
+
+    def infoset(self, node, bucket):
+        return node * self.n_buckets + bucket
+
+    def sample_deals(self, k):
+        """k repartos aleatorios con sus buckets (K, 2, 4) y resultados de showdown (K,)"""
+        deals = np.argsort(self.rng.random((k, 52)), axis=1)[:, :9].astype(np.uint8)
+        return deals, deal_buckets(deals, self.n_buckets, self.rollouts, self.rng), showdown_outcomes(deals)
+
+    def _strategy(self, base, actions):
+        regret = self._regret
+        positive = [max(regret[base + a], 0.0) for a in actions]
+        total = sum(positive)
+        if total > 0:
+            return [x / total for x in positive]
+        return [1.0 / len(actions)] * len(actions)
+
+    def _traverse(self, node, traverser, buckets, outcome):
+        """Utilidad de `traverser` en `node`; actualiza regrets y estrategia media"""
+        p = self._player[node]
+        actions = self._actions[node]
+        base = N_ACTIONS * (node * self.n_buckets + buckets[p][self._stage[node]])
+        sigma = self._strategy(base, actions)
+        children = self._child[node]
+
+        if p == traverser:
+            utils = []
+            for a in actions:
+                c = children[a]
+                utils.append(self._traverse(c, traverser, buckets, outcome) if c >= 0
+                             else self._payoff[node][a][outcome][traverser])
+            value = sum(s * u for s, u in zip(sigma, utils))
+            regret = self._regret
+            for a, u in zip(actions, utils):
+                regret[base + a] += u - value
+            return value
+
+        # Nodo del rival: se muestrea una acción y se acumula su estrategia
+        strategy_sum = self._strategy_sum
+        for a, s in zip(actions, sigma):
+            strategy_sum[base + a] += s
+        a = self.random.choices(actions, weights=sigma)[0]
+        c = children[a]
+        if c >= 0:
+            return self._traverse(c, traverser, buckets, outcome)
+        return self._payoff[node][a][outcome][traverser]
+
+    def run(self, n_iterations, block=256):
+        """`n_iterations` iteraciones (un reparto y un recorrido por jugador cada una)"""
+        self._regret = memoryview(self.regret.reshape(-1))
+        self._strategy_sum = memoryview(self.strategy_sum.reshape(-1))
+        done = 0
+        while done < n_iterations:
+            k = min(block, n_iterations - done)
+            _, buckets, outcomes = self.sample_deals(k)
+            buckets = buckets.tolist()
+            outcomes = outcomes.tolist()
+            for i in range(k):
+                for traverser in (0, 1):
+                    self._traverse(0, traverser, buckets[i], outcomes[i])
+            done += k
+        self.iterations += n_iterations
+        return self
+
+    def average_strategy(self):
+        legal = np.repeat(self.tree.legal, self.n_buckets, axis=0)
+        total = self.strategy_sum.sum(axis=1, keepdims=True)
+        uniform = legal / legal.sum(axis=1, keepdims=True)
+        return np.where(total > 0, self.strategy_sum / np.where(total > 0, total, 1.0), uniform)
+
+    def save(self, path=CHECKPOINT_PATH):
+        np.savez(path, regret=self.regret, strategy_sum=self.strategy_sum, iterations=self.iterations,
+                 n_buckets=self.n_buckets, rollouts=self.rollouts)
+        return path
+
+    @classmethod
+    def load(cls, path=CHECKPOINT_PATH, seed=None):
+        data = np.load(path)
+        solver = cls(int(data["n_buckets"]), int(data["rollouts"]), seed)
+        solver.regret[:] = data["regret"]
+        solver.strategy_sum[:] = data["strategy_sum"]
+        solver.iterations = int(data["iterations"])
+        return solver
+
+
+def _worker_run(args):
+    """Proceso trabajador: parte de las tablas fusionadas y devuelve sus incrementos"""
+    regret, strategy_sum, n_buckets, rollouts, n_iterations, seed = args
+    solver = HoldemMCCFR(n_buckets, rollouts, seed)
+    solver.regret[:] = regret
+    solver.strategy_sum[:] = strategy_sum
+    solver.run(n_iterations)
+    return solver.regret - regret, solver.strategy_sum - strategy_sum
+
+
+def train_parallel(solver, n_iterations, n_workers=None, merge_every=2000, checkpoint=CHECKPOINT_PATH,
+                   print_freq=1):
+    """
+    Entrena `solver` con `n_workers` procesos. Cada ronda, cada proceso hace
+    `merge_every` iteraciones desde las tablas actuales; sus incrementos de
+    regret y estrategia se suman y se guarda el checkpoint.
+    """
+    n_workers = n_workers or mp.cpu_count()
+    per_round = merge_every * n_workers
+    n_rounds = max(1, -(-n_iterations // per_round))
+    ctx = mp.get_context("spawn")
+    start = time.time()
+    with ctx.Pool(n_workers) as pool:
+        for r in range(n_rounds):
+            seed = solver.iterations + r
+            jobs = [(solver.regret, solver.strategy_sum, solver.n_buckets, solver.rollouts,
+                     merge_every, seed * n_workers + w) for w in range(n_workers)]
+            for d_regret, d_strategy in pool.map(_worker_run, jobs):
+                solver.regret += d_regret
+                solver.strategy_sum += d_strategy
+            solver.iterations += per_round
+            if checkpoint:
+                solver.save(checkpoint)
+            if (r + 1) % print_freq == 0:
+                elapsed = time.time() - start
+                print(f"📈 Ronda {r + 1}/{n_rounds} | Iteraciones: {solver.iterations} | "
+                      f"{(r + 1) * per_round / elapsed:.0f} it/s")
+    print(f"✅ MCCFR: {n_rounds * per_round} iteraciones en {time.time() - start:.1f}s con {n_workers} procesos")
+    return solver
+
+
+class MCCFRPolicy:
+    """
+    Agente que juega la estrategia media de HoldemMCCFR, con la interfaz
+    .action(obs) de poker_agent. Sólo para mesas de 2 jugadores.
+
+    La observación no incluye raises_this_round; si varios nodos encajan con
+    (fase, apuestas, jugador) se usa el más visitado durante el entrenamiento.
+    """
+
+    def __init__(self, source=CHECKPOINT_PATH, rollouts=None, seed=None):
+        solver = HoldemMCCFR.load(source) if isinstance(source, str) else source
+        self.tree = solver.tree
+        self.n_buckets = solver.n_buckets
+        self.rollouts = rollouts or solver.rollouts
+        self.strategy = solver.average_strategy()
+        self.visits = solver.strategy_sum.sum(axis=1)
+        self.rng = np.random.default_rng(seed)
+        self.random = random.Random(seed)
+
+    def bucket(self, hole, board, stage):
+        holes = np.array([[card_to_int(c) for c in hole]], dtype=np.uint8)
+        if stage == 0:
+            return int(to_bucket(load_table()[_hole_classes(holes), 0], self.n_buckets)[0])
+        boards = np.array([[card_to_int(c) for c in board]], dtype=np.uint8)
+        return int(to_bucket(hand_strength(holes, boards, self.rollouts, self.rng), self.n_buckets)[0])
+
+    def action(self, obs):
+        try:
+            stage = STAGES.index(obs["stage"])
+            player = obs["to_act"]
+            bets = [obs["own_bet"], obs["opp_bets"][0]] if player == 0 else [obs["opp_bets"][0], obs["own_bet"]]
+            nodes = self.tree.by_obs.get((stage, tuple(bets), player))
+            if not nodes:
+                return 1  # fuera del árbol: call
+            bucket = self.bucket(obs["hole"], obs["board"], stage)
+            infosets = [node * self.n_buckets + bucket for node in nodes]
+            infoset = max(infosets, key=lambda i: self.visits[i])
+            return self.random.choices(range(N_ACTIONS), weights=self.strategy[infoset].tolist())[0]
+        except Exception as e:
+            print(f"⚠️ Error en MCCFRPolicy.action: {e}")
+            return 1
+
+
+def test_holdem_mccfr(n_iterations=4000, n_hands=2000):
+    """Árbol idéntico a las reglas de FastHoldemEnv, entrenamiento corto y partida contra RandomAgent"""
+    import tempfile
+    from fast_holdem_env import FastHoldemEnv
+    from holdem_env import HoldemEnv
+    from poker_agent import RandomAgent
+
+    # 1) El árbol reproduce HoldemEnv: mismos estados y mismos pagos
+    tree = BettingTree()
+    env = FastHoldemEnv(2, seed=0)
+    rng = random.Random(0)
+    for _ in range(3000):
+        env.reset()
+        deal = np.array([list(env.hands) + list(env.deck[:env._top][::-1][:5])], dtype=np.uint8)
+        outcome = int(showdown_outcomes(deal)[0])
+        node, done = 0, False
+        while not done:
+            stage, bets, raises, player = tree.states[node]
+            assert (stage, tuple(env.bets), raises, player) == \
+                   (env.stage, tuple(env.bets), env.raises_this_round, env.current_player)
+            action = rng.choice(np.flatnonzero(tree.legal[node]).tolist())
+            _, rewards, done, _ = env.step(player, action)
+            if done:
+                assert tuple(tree.payoff[node, action, outcome]) == rewards
+            else:
+                node = tree.child[node, action]
+    print(f"✅ Árbol de apuestas idéntico a HoldemEnv ({len(tree.states)} nodos)")
+
+    # 2) Entrenamiento en un proceso y checkpoint
+    solver = HoldemMCCFR(n_buckets=8, seed=0)
+    start = time.perf_counter()
+    solver.run(n_iterations)
+    elapsed = time.perf_counter() - start
+    print(f"   {n_iterations} iteraciones en {elapsed:.1f}s ({n_iterations / elapsed:.0f} it/s), "
+          f"{solver.n_infosets} infosets")
+    path = os.path.join(tempfile.mkdtemp(), "mccfr.npz")
+    solver.save(path)
+    loaded = HoldemMCCFR.load(path)
+    assert np.array_equal(loaded.regret, solver.regret) and loaded.iterations == solver.iterations
+
+    # 3) Dos procesos fusionando tablas
+    train_parallel(loaded, 2 * 500, n_workers=2, merge_every=500, checkpoint=path)
+    assert loaded.iterations == n_iterations + 1000
+
+    # 4) La política media gana a un rival aleatorio
+    policy = MCCFRPolicy(loaded, rollouts=32, seed=0)
+    rival = RandomAgent()
+    env = HoldemEnv(2, seed=1)
+    total = 0
+    for hand in range(n_hands):
+        seat = hand % 2  # alternar posiciones
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            p = env.current_player
+            action = policy.action(obs) if p == seat else rival.action(obs)
+            obs, rewards, done, _ = env.step(p, action)
+        total += rewards[seat]
+    print(f"✅ MCCFRPolicy vs RandomAgent: {total / n_hands:+.3f} fichas/mano en {n_hands} manos")
+    assert total > 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        n_iter = int(sys.argv[1])
+        workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        mccfr = HoldemMCCFR.load() if os.path.exists(CHECKPOINT_PATH) else HoldemMCCFR()
+        train_parallel(mccfr, n_iter, workers)
+    else:
+        test_holdem_mccfr()
@@ -1,6 +1,7 @@
 # holdem_env.py
 import random
 from typing import List, Tuple, Dict, Any
+from hand_evaluator import evaluate_cards
 
 RANKS = [2,3,4,5,6,7,8,9,10,11,12,13,14]  # 11=J,12=Q,13=K,14=A
 SUITS = ["Corazones","Diamantes","Trebol","Copas"]
@@ -156,56 +157,10 @@ class HoldemEnv:
             return False
         return False
 
-    # --- Hand evaluation (simple but sufficient) ---
+    # --- Hand evaluation ---
     def _rank_hand(self, cards: List[Tuple[int,str]]):
-        # returns tuple that compares lexicographically higher = better
-        ranks = sorted([c[0] for c in cards], reverse=True)
-        suits = [c[1] for c in cards]
-        # straight detection
-        uniq = sorted(set(ranks), reverse=True)
-        straight_high = None
-        for i in range(len(uniq)-4+1):
-            window = uniq[i:i+5]
-            if len(window) >=5 and window[0] - window[-1] == 4:
-                straight_high = window[0]
-                break
-        # flush detection
-        for s in SUITS:
-            if suits.count(s) >=5:
-                # collect top 5 ranks of that suit
-                suit_ranks = sorted([c[0] for c in cards if c[1]==s], reverse=True)[:5]
-                return (8, suit_ranks)  # treat as flush rank 8
-        # counts
-        from collections import Counter
-        cnt = Counter(ranks)
-        common = cnt.most_common()
-        # check four of a kind
-        if common[0][1] == 4:
-            four = common[0][0]
-            kicker = max(r for r in ranks if r != four)
-            return (7, four, kicker)
-        # full house
-        if common[0][1] == 3 and len(common) > 1 and common[1][1] >= 2:
-            three = common[0][0]
-            pair = common[1][0]
-            return (6, three, pair)
-        if common[0][1] == 3:
-            three = common[0][0]
-            kickers = sorted([r for r in ranks if r != three], reverse=True)[:2]
-            return (3, three, kickers)
-        if len(common) >=2 and common[0][1] == 2 and common[1][1] == 2:
-            pair1, pair2 = common[0][0], common[1][0]
-            kick = max(r for r in ranks if r != pair1 and r != pair2)
-            return (2, max(pair1,pair2), min(pair1,pair2), kick)
-        if common[0][1] == 2:
-            pair = common[0][0]
-            kickers = sorted([r for r in ranks if r != pair], reverse=True)[:3]
-            return (1, pair, kickers)
-        # straight (if found)
-        if straight_high is not None:
-            return (4, straight_high)
-        # high card
-        return (0, ranks[:5])
+        # returns int that compares higher = better (see hand_evaluator)
+        return evaluate_cards(cards)
 
     def _resolve_showdown(self):
         # return list of winners (indices)
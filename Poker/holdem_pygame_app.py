@@ -6,8 +6,14 @@ import os
 import threading
 import math
 import random
+import numpy as np
 from holdem_env import HoldemEnv
-from poker_agent import PolicyAgent, HeuristicAgent, RandomAgent
+from hand_evaluator import evaluate_cards, hand_name
+from equity import monte_carlo_equity, warmup as equity_warmup
+from poker_agent import PolicyAgent, HeuristicAgent, RandomAgent, N_INFOSETS, infoset_key
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_atlas import load_atlas
 
 # ---------- Configuración Premium para 4 Jugadores ----------
 RUTA_CARTAS = r"E:\Sistemas\CardBlack\CardBlack\cards"
@@ -83,8 +89,9 @@ FONTS = {
     'button': pygame.font.SysFont("Arial", int(18 * FONT_SCALE), bold=True)
 }
 
-# Cache de imágenes mejorado
-image_cache = {}
+# Cache de imágenes mejorado: todas las cartas salen del atlas ya escalado
+# (ver card_atlas.py), así load_card_image_premium no toca el disco
+image_cache = load_atlas(CARD_W, CARD_H, RUTA_CARTAS)
 
 # ---------- Efectos Visuales Premium ----------
 class PokerVisualEffects:
@@ -513,9 +520,17 @@ class PremiumHoldemUI:
         self.ai_advisor = PolicyAgent()
         self.show_advice = False
         self.current_advice = ""
+        self.equity_budget = 0.02  # segundos por cálculo de equidad (no bloquea los 60 FPS)
+        threading.Thread(target=equity_warmup, daemon=True).start()
         
-        # Agentes IA
+        # Agentes IA (con --neural deciden con la red entrenada). La red se carga en
+        # segundo plano: la mesa se dibuja ya y juegan bots de política mientras tanto
+        self.inference_server = None
+        self.neural_loading = False
         self.agents = [PolicyAgent() for _ in range(self.n)]
+        if "--neural" in sys.argv:
+            self.neural_loading = True
+            threading.Thread(target=self.load_neural_bots, daemon=True).start()
         
         # CONFIGURAR POSICIONES CARDINALES PARA 4 JUGADORES
         self.setup_cardinal_positions()
@@ -541,6 +556,36 @@ class PremiumHoldemUI:
         print("💀 Sistema de eliminación activado")
         print("🎯 Modo ajuste activado - Usa TAB para ajustar posiciones de cartas")
     
+    def load_neural_bots(self, model_name="poker_holdem_dqn_final.pth"):
+        """
+        Bots con PokerDQN. Con los pesos exportados (.npz) se evalúa con NumPy sin
+        importar torch; si no, todas sus decisiones se agrupan en un único forward por tick
+        """
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), model_name)
+        try:
+            from numpy_policy import NumpyPolicy, is_current, numpy_path
+            # Los artefactos exportados sólo valen si salieron de este mismo checkpoint
+            # (save_model no los exporta siempre, p. ej. con equity_feature)
+            if is_current(numpy_path(path), path):
+                from obs_encoder import encode_obs
+                policy = NumpyPolicy(numpy_path(path), encoder=encode_obs)  # encode_obs: sin buffer compartido entre hilos
+                self.agents = [policy for _ in range(self.n)]
+                print(f"🧠 Bots neurales cargados desde {os.path.basename(numpy_path(path))} (NumPy)")
+                return
+            from frozen_policy import frozen_path
+            from inference_server import InferenceServer, ServedAgent
+            # Preferir el artefacto congelado exportado junto al checkpoint
+            if is_current(frozen_path(path), path):
+                path = frozen_path(path)
+                model_name = os.path.basename(path)
+            self.inference_server = InferenceServer.from_checkpoint(path).start()
+            self.agents = [ServedAgent(self.inference_server) for _ in range(self.n)]
+            print(f"🧠 Bots neurales cargados desde {model_name}")
+        except Exception as e:
+            print(f"⚠️ No se pudieron cargar los bots neurales: {e}")
+        finally:
+            self.neural_loading = False
+    
     def setup_cardinal_positions(self):
         """
         CONFIGURACIÓN DE POSICIONES CARDINALES PARA 4 JUGADORES
@@ -819,6 +864,16 @@ class PremiumHoldemUI:
             
             advice = action_advice.get(suggested_action, "❓ Acción desconocida")
             
+            # Equidad Monte Carlo contra los oponentes activos
+            n_opponents = max(1, len(self.active_players) - 1)
+            eq = monte_carlo_equity(hand, board, n_opponents, time_budget=self.equity_budget)
+            advice += (f"\n📈 Equidad: {eq['equity']*100:.0f}% ±{eq['ci']*100:.0f} "
+                       f"(gana {eq['win']*100:.0f}% / empata {eq['tie']*100:.0f}% / pierde {eq['lose']*100:.0f}%)")
+            
+            # Jugada actual (mano + board) según el evaluador
+            if len(hand) + len(board) >= 5:
+                advice += f"\n🃏 Tu jugada: {hand_name(evaluate_cards(list(hand) + list(board)))}"
+            
             # Información adicional
             advice += f"\n\n📊 SITUACIÓN ACTUAL:"
             advice += f"\n💰 Pot: ${self.env.pot}"
@@ -1018,6 +1073,11 @@ class PremiumHoldemUI:
                         self.game_stats['total_winnings'] += pot_share
                 
                 self.winner_msg = f"🏆 Ganador(es): {', '.join(winner_names)} - ${pot_share} cada uno"
+                
+                # Jugada ganadora
+                if len(self.env.board) == 5:
+                    best = evaluate_cards(self.env.hands[active_winners[0]] + self.env.board)
+                    self.winner_msg += f" ({hand_name(best)})"
             
         elif "winner" in info:
             winner = info["winner"]
@@ -1470,6 +1530,9 @@ class PremiumHoldemUI:
             
         self.ui.draw_text(mode_text, 20, info_y + 50, 'base', mode_color)
 
+        if self.neural_loading:
+            self.ui.draw_text("⏳ Cargando bots neurales...", 20, info_y + 75, 'base', COLORS['text_silver'])
+
     def draw_winner_message(self):
         """Dibujar mensaje de ganador"""
         if not self.winner_msg:
@@ -1998,6 +2061,7 @@ def main_loop():
     
     running = True
     last_time = time.time()
+    first_frame_done = False
     
     while running:
         current_time = time.time()
@@ -2134,6 +2198,15 @@ def main_loop():
         # Actualizar pantalla
         pygame.display.flip()
         clock.tick(60)  # 60 FPS para suavidad
+
+        # startup_benchmark.py: avisa del primer frame y de la IA lista, y termina
+        if "--benchmark-startup" in sys.argv:
+            if not first_frame_done:
+                print("BENCH primer_frame", flush=True)
+                first_frame_done = True
+            if not ui.neural_loading:
+                print("BENCH ia_lista", flush=True)
+                break
     
     # Limpieza al salir
     ui.stop_ai_vs_ai()
@@ -2144,21 +2217,21 @@ def main_loop():
 class PolicyAgent:
     """Agente de política mejorado"""
     def __init__(self):
-        self.policy = {}
+        self.policy = np.full(N_INFOSETS, -1, dtype=np.int8)  # -1 = infoset sin visitar
         self.learning_rate = 0.1
         
     def action(self, state):
         """Seleccionar acción basada en el estado"""
-        key = str(state)
-        if key not in self.policy:
+        key = infoset_key(state)
+        if self.policy[key] < 0:
             # Política inicial más inteligente
             self.policy[key] = random.choices([0, 1, 2], weights=[0.2, 0.5, 0.3])[0]
-        return self.policy[key]
+        return int(self.policy[key])
     
     def update(self, state, action, reward=0):
         """Actualizar política basada en experiencia"""
-        key = str(state)
-        if key in self.policy:
+        key = infoset_key(state)
+        if self.policy[key] >= 0:
             # Ajuste simple basado en recompensa
             if reward > 0:
                 self.policy[key] = action
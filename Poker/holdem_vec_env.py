@@ -0,0 +1,220 @@
+# holdem_vec_env.py
+"""
+N mesas de Texas Hold'em con las reglas de HoldemEnv avanzando en paralelo.
+
+Todo el estado vive en arrays NumPy (mazo, manos, apuestas, bote, fase,
+jugador actual...) y cada step recibe una acción por mesa para el asiento
+que tiene el turno en esa mesa. Las mesas terminadas se reinician solas, de
+modo que el entrenador siempre recibe un batch (N, 20) de observaciones
+para una única pasada de la red.
+
+Uso:
+    env = HoldemVecEnv(n_envs=256, n_players=4, seed=0)
+    obs = env.reset()                     # (N, 20) float32
+    seats = env.current_player.copy()     # quién actúa en cada mesa
+    obs, rewards, dones, info = env.step(actions)
+"""
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from holdem_env import showdown_batch
+
+STAGE_VALUES = np.array([0.0, 0.33, 0.66, 1.0, 0.0])
+BOARD_SIZE = np.array([0, 3, 4, 5, 5])  # cartas visibles del board por fase
+OBS_SIZE = 20
+
+# Características por carta, idénticas a obs_to_vector_enhanced
+CARD_RANK_F = np.arange(52) // 4 / 12.0
+CARD_SUIT_F = np.arange(52) % 4 / 3.0
+
+
+class HoldemVecEnv:
+    """
+    Entorno vectorizado: n_envs mesas independientes de n_players jugadores.
+    """
+    def __init__(self, n_envs=64, n_players=2, seed=None):
+        assert n_players >= 2, "Se necesitan al menos 2 jugadores"
+        assert 2 * n_players + 5 <= 52, "No hay cartas para tantos jugadores"
+        self.n_envs = n_envs
+        self.n_players = n_players
+        self.max_raises_in_round = 2
+        self.rng = np.random.default_rng(seed)
+
+        n, p = n_envs, n_players
+        self.deck = np.zeros((n, 52), dtype=np.uint8)
+        self.hands = np.zeros((n, p, 2), dtype=np.uint8)
+        self.board = np.zeros((n, 5), dtype=np.uint8)
+        self.bets = np.zeros((n, p), dtype=np.int32)
+        self.pot = np.zeros(n, dtype=np.int32)
+        self.current_player = np.zeros(n, dtype=np.int64)
+        self.stage = np.zeros(n, dtype=np.int8)
+        self.raises_this_round = np.zeros(n, dtype=np.int8)
+        self.terminal = np.zeros(n, dtype=bool)
+        self.obs = np.zeros((n, OBS_SIZE), dtype=np.float32)
+
+        # Oponentes de cada asiento en el orden de HoldemEnv; índice p = columna de ceros
+        opp = np.full((p, 3), p, dtype=np.int64)
+        for seat in range(p):
+            others = [i for i in range(p) if i != seat][:3]
+            opp[seat, :len(others)] = others
+        self._opp_idx = opp
+        self._rows = np.arange(n)
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        """Reinicia todas las mesas y devuelve las observaciones (N, 20)"""
+        self._reset_tables(self._rows)
+        return self._write_obs()
+
+    def _reset_tables(self, rows: np.ndarray):
+        """Nueva mano en las mesas `rows` (mismo reparto que HoldemEnv.deck.pop())"""
+        k = len(rows)
+        if k == 0:
+            return
+        p = self.n_players
+        deck = np.argsort(self.rng.random((k, 52)), axis=1).astype(np.uint8)
+        self.deck[rows] = deck
+        # El jugador i recibe deck[51-2i] y deck[50-2i]; el board sale de las siguientes
+        self.hands[rows] = deck[:, 52 - 2 * p:][:, ::-1].reshape(k, p, 2)
+        self.board[rows] = deck[:, 51 - 2 * p - np.arange(5)]
+        self.bets[rows] = 1
+        self.pot[rows] = p
+        self.current_player[rows] = 0
+        self.stage[rows] = 0
+        self.raises_this_round[rows] = 0
+        self.terminal[rows] = False
+
+    def _write_obs(self) -> np.ndarray:
+        """Escribe en self.obs el vector de 20 características del jugador en turno"""
+        obs = self.obs
+        rows = self._rows
+        seat = self.current_player
+        hole = self.hands[rows, seat]
+        obs[:, 0] = CARD_RANK_F[hole[:, 0]]
+        obs[:, 1] = CARD_SUIT_F[hole[:, 0]]
+        obs[:, 2] = CARD_RANK_F[hole[:, 1]]
+        obs[:, 3] = CARD_SUIT_F[hole[:, 1]]
+
+        visible = np.arange(5) < BOARD_SIZE[self.stage][:, None]
+        obs[:, 4:14:2] = np.where(visible, CARD_RANK_F[self.board], 0.0)
+        obs[:, 5:14:2] = np.where(visible, CARD_SUIT_F[self.board], 0.0)
+
+        obs[:, 14] = np.minimum(self.pot / 500.0, 2.0)
+        obs[:, 15] = np.minimum(self.bets[rows, seat] / 50.0, 2.0)
+        padded = np.concatenate([self.bets, np.zeros((self.n_envs, 1), dtype=self.bets.dtype)], axis=1)
+        opp_bets = padded[rows[:, None], self._opp_idx[seat]]
+        obs[:, 16:19] = np.minimum(opp_bets / 50.0, 2.0)
+        obs[:, 19] = STAGE_VALUES[self.stage]
+        return obs
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """
+        Aplica una acción por mesa (0 fold, 1 check/call, 2 bet/raise) para el
+        jugador en turno de cada mesa.
+
+        Returns:
+            obs: (N, 20) del siguiente jugador en turno (mano nueva si la mesa terminó)
+            rewards: (N, P) int32, distinto de cero sólo en las mesas terminadas
+            dones: (N,) bool, mesas cuya mano terminó en este paso
+            info: 'winners' (N, P) bool con los ganadores de cada mano terminada
+        """
+        actions = np.asarray(actions)
+        rows = self._rows
+        seat = self.current_player
+        bets = self.bets
+        n, p = self.n_envs, self.n_players
+
+        fold = actions == 0
+        raise_ = (actions == 2) & (self.raises_this_round < self.max_raises_in_round)
+        call = ~fold & ~raise_
+
+        # bet/raise: apuesta fija de 1 ficha
+        r = rows[raise_]
+        bets[r, seat[r]] += 1
+        self.pot[r] += 1
+        self.raises_this_round[r] += 1
+
+        # check/call (también el raise por encima del tope)
+        c = rows[call]
+        max_bet = bets[c].max(axis=1)
+        self.pot[c] += max_bet - bets[c, seat[c]]
+        bets[c, seat[c]] = max_bet
+        advance = np.zeros(n, dtype=bool)
+        advance[c] = bets[c].min(axis=1) == max_bet
+        self.raises_this_round[advance] = 0
+        self.stage[advance] += 1
+
+        self.current_player = (seat + 1) % p
+
+        rewards = np.zeros((n, p), dtype=np.int32)
+        winners = np.zeros((n, p), dtype=bool)
+
+        # Fold: gana el primer jugador distinto del que se retira
+        f = rows[fold]
+        if len(f):
+            w = (seat[f] == 0).astype(np.int64)
+            won = self.pot[f] - bets[f, w]
+            rewards[f, w] = won
+            rewards[f, seat[f]] = -won
+            winners[f, w] = True
+
+        # Showdown
+        s = rows[call & (self.stage == 4)]
+        if len(s):
+            _, win_mask = showdown_batch(self.hands[s], self.board[s])
+            share = self.pot[s] // win_mask.sum(axis=1)
+            rewards[s] = np.where(win_mask, share[:, None], -bets[s])
+            winners[s] = win_mask
+
+        dones = fold | (self.stage == 4)
+        self.terminal = dones.copy()
+        self._reset_tables(rows[dones])
+        return self._write_obs(), rewards, dones, {"winners": winners}
+
+
+def test_vec_env(n_envs=64, n_steps=3000, bench_steps=2000):
+    """Test diferencial contra FastHoldemEnv (verificado contra HoldemEnv) + benchmark"""
+    from fast_holdem_env import FastHoldemEnv
+
+    rng = np.random.default_rng(7)
+    probs = [0.05, 0.6, 0.35]
+    for n_players in (2, 4, 6):
+        vec = HoldemVecEnv(n_envs, n_players, seed=n_players)
+        mirrors = [FastHoldemEnv(n_players) for _ in range(n_envs)]
+        expected = np.stack([m.reset(deck=vec.deck[i])[0].copy() for i, m in enumerate(mirrors)])
+        obs = vec.obs
+        hands = 0
+        for _ in range(n_steps // 3):
+            assert np.array_equal(obs, expected)
+            actions = rng.choice(3, size=n_envs, p=probs)
+            seats = vec.current_player.copy()
+            obs, rewards, dones, info = vec.step(actions)
+            for i, m in enumerate(mirrors):
+                assert m.current_player == seats[i]
+                m_obs, m_rew, m_done, m_info = m.step(int(seats[i]), int(actions[i]))
+                assert m_done == dones[i]
+                if m_done:
+                    assert tuple(rewards[i].tolist()) == m_rew
+                    m_obs, _ = m.reset(deck=vec.deck[i])
+                    hands += 1
+                else:
+                    assert not rewards[i].any()
+                expected[i] = m_obs
+    print(f"✅ HoldemVecEnv idéntico a HoldemEnv ({hands} manos en la última configuración)")
+
+    for n in (1, 16, 256, 1024):
+        vec = HoldemVecEnv(n, 4, seed=0)
+        actions = rng.choice(3, size=(64, n), p=probs)
+        hands = 0
+        start = time.perf_counter()
+        for t in range(bench_steps):
+            _, _, dones, _ = vec.step(actions[t % 64])
+            hands += int(dones.sum())
+        elapsed = time.perf_counter() - start
+        print(f"   {n:5d} mesas: {bench_steps * n / elapsed:12,.0f} pasos/s | {hands / elapsed:10,.0f} manos/s")
+
+
+if __name__ == "__main__":
+    test_vec_env()
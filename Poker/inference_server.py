@@ -0,0 +1,201 @@
+# inference_server.py
+"""
+Servicio de inferencia por lotes para los bots neurales.
+
+Cada bot (de cualquier asiento o mesa del proceso) envía su observación con
+submit() y recibe un Future. Un único hilo agrupa las peticiones que llegan
+durante un tick, hace una sola pasada de PokerDQN para todo el lote y
+resuelve los futures con la acción elegida.
+
+Uso:
+    server = InferenceServer.from_checkpoint("poker_holdem_dqn_final.jit.pt").start()
+    bots = [ServedAgent(server) for _ in range(3)]
+    action = bots[0].action(obs)    # bloquea hasta el siguiente tick
+    server.stop()
+"""
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+
+from frozen_policy import FROZEN_SUFFIX, load_frozen
+from obs_encoder import encode_obs
+
+
+def network_from_checkpoint(path, device="cpu"):
+    """
+    Red de un checkpoint: el artefacto congelado (.jit.pt) se carga tal cual; de un
+    .pth se reconstruye la PokerDQN deduciendo los tamaños de sus pesos
+    """
+    if path.endswith(FROZEN_SUFFIX):
+        return load_frozen(path).to(device)
+    from neural_agent import PokerDQN
+    checkpoint = torch.load(path, map_location=device, weights_only=False)
+    state = checkpoint.get("q_network_state_dict", checkpoint)
+    linear = sorted((int(k.split(".")[1]), v.shape) for k, v in state.items()
+                    if k.startswith("layers.") and k.endswith(".weight") and v.dim() == 2)
+    input_size = linear[0][1][1]
+    hidden_sizes = [shape[0] for _, shape in linear]
+    net = PokerDQN(input_size, hidden_sizes, state["output_layer.weight"].shape[0])
+    net.load_state_dict(state)
+    return net.to(device).eval()
+
+
+class InferenceServer:
+    """
+    Lista de peticiones pendientes + hilo que ejecuta una pasada de la red por tick.
+    """
+
+    def __init__(self, model, encoder=None, tick=0.002, max_batch=1024, device="cpu"):
+        self.model = model.to(device).eval()
+        self.encoder = encoder or encode_obs
+        self.tick = tick
+        self.max_batch = max_batch
+        self.device = device
+        self._pending = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        # Estadísticas
+        self.batches = 0
+        self.decisions = 0
+
+    @classmethod
+    def from_checkpoint(cls, path, **kwargs):
+        return cls(network_from_checkpoint(path, kwargs.get("device", "cpu")), **kwargs)
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def submit(self, obs) -> Future:
+        """Encola una observación; el Future se resuelve con (acción, q_values)"""
+        future = Future()
+        state = self.encoder(obs)
+        with self._cond:
+            self._pending.append((state, future))
+            if len(self._pending) == 1:
+                self._cond.notify()
+        return future
+
+    def _collect(self):
+        """Espera la primera petición, deja pasar un tick y se lleva todo lo acumulado"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._pending, timeout=0.1):
+                return []
+        time.sleep(self.tick)
+        with self._cond:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+        return batch
+
+    def _loop(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                states = torch.from_numpy(np.stack([state for state, _ in batch])).to(self.device)
+                with torch.no_grad():
+                    q_values = self.model(states).cpu().numpy()
+                actions = q_values.argmax(axis=1)
+                for i, (_, future) in enumerate(batch):
+                    future.set_result((int(actions[i]), q_values[i]))
+                self.batches += 1
+                self.decisions += len(batch)
+            except Exception as e:
+                print(f"⚠️ Error en InferenceServer: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self):
+        return {"batches": self.batches, "decisions": self.decisions,
+                "avg_batch": self.decisions / max(self.batches, 1)}
+
+
+class ServedAgent:
+    """Bot con la interfaz .action(obs) que delega la decisión en un InferenceServer"""
+
+    def __init__(self, server, epsilon=0.0, timeout=2.0):
+        self.server = server
+        self.epsilon = epsilon
+        self.timeout = timeout
+
+    def action(self, state):
+        if random.random() < self.epsilon:
+            return random.choice([0, 1, 2])
+        try:
+            action, _ = self.server.submit(state).result(timeout=self.timeout)
+            return action
+        except Exception as e:
+            print(f"⚠️ Error en ServedAgent.action: {e}")
+            return 1  # Call por defecto
+
+
+def test_inference_server(path="poker_holdem_dqn_final.pth", n_tables=64, n_players=4, hands=20, think=0.02):
+    """
+    Muchas mesas con bots en hilos contra un solo servidor. Cada bot "piensa"
+    hasta `think` segundos antes de decidir, como bot_action en la GUI.
+    """
+    import os
+    from holdem_env import HoldemEnv
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    server = InferenceServer.from_checkpoint(path).start()
+    bot = ServedAgent(server)
+
+    # Mismas decisiones que una pasada individual en modo evaluación
+    env = HoldemEnv(n_players, seed=0)
+    obs, _ = env.reset()
+    with torch.no_grad():
+        direct = server.model(torch.from_numpy(server.encoder(obs))).argmax().item()
+    assert bot.action(obs) == direct
+
+    latencies = []
+    lock = threading.Lock()
+
+    def play_table(seed):
+        table = HoldemEnv(n_players, seed=seed)
+        for _ in range(hands):
+            obs, _ = table.reset()
+            done = False
+            while not done:
+                time.sleep(random.uniform(0, think))
+                start = time.perf_counter()
+                action = bot.action(obs)
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+                obs, _, done, _ = table.step(table.current_player, action)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=play_table, args=(seed,)) for seed in range(n_tables)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    server.stop()
+
+    lat = np.array(latencies) * 1000
+    stats = server.stats()
+    print(f"✅ {n_tables} mesas, {len(lat)} decisiones en {elapsed:.2f}s ({len(lat) / elapsed:.0f}/s)")
+    print(f"   Lote medio: {stats['avg_batch']:.1f} | Latencia p50 {np.percentile(lat, 50):.2f} ms, "
+          f"p99 {np.percentile(lat, 99):.2f} ms")
+
+
+if __name__ == "__main__":
+    test_inference_server()
@@ -0,0 +1,286 @@
+# kuhn_cfr.py
+"""
+Solución exacta de Kuhn Poker con CFR+.
+
+- El árbol del juego se construye recorriendo KuhnEnv: las 6 repartos posibles
+  y todas las historias, con los pagos que dan sus reglas de terminación.
+- Regrets y estrategia acumulada son arrays NumPy (infoset x acción); cada
+  nodo del árbol se procesa para los 6 repartos a la vez.
+- exploitability() calcula la explotabilidad exacta (mejor respuesta de cada
+  jugador, sin Monte Carlo) de cualquier política tabular, incluido un
+  NeuralPokerAgent cargado de poker_kuhn_dqn.pth.
+
+Uso:
+    solver = KuhnCFR().solve(1000)
+    print(exploitability(solver.average_strategy()))        # ~0
+    print(exploitability(agent_policy_table(agente)))       # calidad del DQN
+"""
+import itertools
+import time
+
+import numpy as np
+
+from kuhn_env import KuhnEnv
+
+CARD_NAMES = {1: 'J', 2: 'Q', 3: 'K'}
+DEALS = list(itertools.permutations((1, 2, 3), 2))  # (carta jugador 0, carta jugador 1)
+CHANCE = 1.0 / len(DEALS)
+GAME_VALUE = -1.0 / 18.0  # valor del juego para el jugador 0 en equilibrio
+
+
+class KuhnTree:
+    """
+    Árbol de Kuhn obtenido de KuhnEnv.
+
+    Atributos:
+        histories: historias de decisión en orden de recorrido (tuplas de acciones)
+        player: historia -> jugador que actúa
+        children: (historia, acción) -> historia siguiente o array (6,) de pagos del jugador 0
+        infoset: historia -> array (6,) con el índice de infoset del jugador que actúa en cada reparto
+        labels: nombre de cada infoset, p.ej. "K:01"
+    """
+
+    def __init__(self):
+        env = KuhnEnv()
+        self.histories = []
+        self.player = {}
+        self.children = {}
+        self._expand(env, ())
+
+        cards = np.array(DEALS)
+        self.infoset = {}
+        self.labels = []
+        for i, h in enumerate(self.histories):
+            self.infoset[h] = 3 * i + cards[:, self.player[h]] - 1
+            hist = "".join(map(str, h)) or "-"
+            self.labels += [f"{CARD_NAMES[c]}:{hist}" for c in (1, 2, 3)]
+        self.n_infosets = 3 * len(self.histories)
+
+    def _expand(self, env, history):
+        player = len(history) % 2
+        self.histories.append(history)
+        self.player[history] = player
+        for action in (0, 1):
+            done_flags, payoffs = [], []
+            for deal in DEALS:
+                env.player_cards = list(deal)
+                env.history = list(history)
+                env.current_player = player
+                env.terminal = False
+                _, reward, done, _ = env.step(action)
+                done_flags.append(done)
+                payoffs.append(reward[0])
+            assert len(set(done_flags)) == 1, "La terminación no puede depender de las cartas"
+            child = history + (action,)
+            if done_flags[0]:
+                self.children[(history, action)] = np.array(payoffs)
+            else:
+                self.children[(history, action)] = child
+                self._expand(env, child)
+
+    def infoset_index(self, card, history):
+        return 3 * self.histories.index(tuple(history)) + card - 1
+
+
+class KuhnCFR:
+    """
+    CFR+ tabular: regret matching+, actualizaciones alternas y media
+    ponderada linealmente de las estrategias.
+    """
+
+    def __init__(self, tree=None):
+        self.tree = tree or KuhnTree()
+        self.regrets = np.zeros((self.tree.n_infosets, 2))
+        self.strategy_sum = np.zeros((self.tree.n_infosets, 2))
+        self.iterations = 0
+
+    def current_strategy(self):
+        positive = np.maximum(self.regrets, 0.0)
+        total = positive.sum(axis=1, keepdims=True)
+        return np.where(total > 0, positive / np.where(total > 0, total, 1.0), 0.5)
+
+    def average_strategy(self):
+        total = self.strategy_sum.sum(axis=1, keepdims=True)
+        return np.where(total > 0, self.strategy_sum / np.where(total > 0, total, 1.0), 0.5)
+
+    def _cfr(self, history, reach, sigma, traverser, delta, weight):
+        """Utilidad esperada del jugador 0 en `history` para cada reparto (6,)"""
+        tree = self.tree
+        p = tree.player[history]
+        idx = tree.infoset[history]
+        strategy = sigma[idx]
+        values = np.empty((len(DEALS), 2))
+        for a in (0, 1):
+            child = tree.children[(history, a)]
+            if isinstance(child, tuple):
+                child_reach = reach.copy()
+                child_reach[p] *= strategy[:, a]
+                values[:, a] = self._cfr(child, child_reach, sigma, traverser, delta, weight)
+            else:
+                values[:, a] = child
+        node_value = (strategy * values).sum(axis=1)
+
+        if p == traverser:
+            sign = 1.0 if p == 0 else -1.0
+            cf_reach = reach[1 - p] * CHANCE
+            np.add.at(delta, idx, sign * (values - node_value[:, None]) * cf_reach[:, None])
+            np.add.at(self.strategy_sum, idx, weight * reach[p][:, None] * strategy)
+        return node_value
+
+    def iterate(self):
+        self.iterations += 1
+        for traverser in (0, 1):
+            delta = np.zeros_like(self.regrets)
+            self._cfr((), np.ones((2, len(DEALS))), self.current_strategy(), traverser,
+                      delta, self.iterations)
+            self.regrets = np.maximum(self.regrets + delta, 0.0)
+
+    def solve(self, n_iterations=1000, target=None):
+        """Itera CFR+; si `target`, se detiene al bajar de esa explotabilidad"""
+        for _ in range(n_iterations):
+            self.iterate()
+            if target is not None and self.iterations % 50 == 0:
+                if exploitability(self.average_strategy(), self.tree) < target:
+                    break
+        return self
+
+
+def expected_value(table, tree=None):
+    """Valor esperado exacto para el jugador 0 cuando ambos juegan `table`"""
+    tree = tree or KuhnTree()
+
+    def value(history):
+        strategy = table[tree.infoset[history]]
+        total = np.zeros(len(DEALS))
+        for a in (0, 1):
+            child = tree.children[(history, a)]
+            total += strategy[:, a] * (value(child) if isinstance(child, tuple) else child)
+        return total
+
+    return float(value(()).mean())
+
+
+def best_response_value(table, player, tree=None):
+    """Ganancia esperada de `player` jugando la mejor respuesta contra `table`"""
+    tree = tree or KuhnTree()
+    sign = 1.0 if player == 0 else -1.0
+
+    def value(history, opp_reach):
+        p = tree.player[history]
+        idx = tree.infoset[history]
+        values = np.empty((len(DEALS), 2))
+        for a in (0, 1):
+            child = tree.children[(history, a)]
+            if isinstance(child, tuple):
+                reach = opp_reach * table[idx, a] if p != player else opp_reach
+                values[:, a] = value(child, reach)
+            else:
+                values[:, a] = sign * child
+        if p != player:
+            return (table[idx] * values).sum(axis=1)
+        # Misma acción en todos los repartos de un infoset: la que maximiza el valor
+        # ponderado por la probabilidad de que el rival llegue hasta aquí
+        gains = np.zeros((tree.n_infosets, 2))
+        np.add.at(gains, idx, values * opp_reach[:, None])
+        best = gains.argmax(axis=1)[idx]
+        return values[np.arange(len(DEALS)), best]
+
+    return float(value((), np.ones(len(DEALS))).mean())
+
+
+def exploitability(table, tree=None):
+    """
+    Explotabilidad exacta (fichas/mano) de la estrategia tabular `table` (12, 2):
+    media de lo que gana la mejor respuesta de cada jugador. 0 en equilibrio.
+    """
+    tree = tree or KuhnTree()
+    return (best_response_value(table, 0, tree) + best_response_value(table, 1, tree)) / 2
+
+
+def policy_table(policy, tree=None):
+    """Tabla (12, 2) a partir de policy(carta, historia) -> probabilidades de (pasar, apostar)"""
+    tree = tree or KuhnTree()
+    table = np.zeros((tree.n_infosets, 2))
+    for history in tree.histories:
+        for card in (1, 2, 3):
+            table[tree.infoset_index(card, history)] = policy(card, history)
+    return table
+
+
+def agent_policy_table(agent, tree=None):
+    """
+    Política greedy de un agente con interfaz .action(obs) sobre observaciones
+    de KuhnEnv, como en evaluar_agente (epsilon = 0). Para NeuralPokerAgent se
+    usa la red en modo eval restringida a las acciones legales (0, 1).
+    """
+    network = getattr(agent, 'q_network', None)
+
+    def greedy(card, history):
+        obs = (card, tuple(history))
+        if network is not None:
+            import torch
+            with torch.no_grad():
+                state = torch.from_numpy(agent.encode_state(obs)).to(agent.device)
+                action = int(network(state)[0, :2].argmax())
+        else:
+            action = agent.action(obs)
+        return np.eye(2)[1 if action == 1 else 0]
+
+    epsilon = getattr(agent, 'epsilon', None)
+    was_training = network is not None and network.training
+    try:
+        if epsilon is not None:
+            agent.epsilon = 0.0
+        if network is not None:
+            network.eval()
+        return policy_table(greedy, tree)
+    finally:
+        if epsilon is not None:
+            agent.epsilon = epsilon
+        if was_training:
+            network.train()
+
+
+def print_strategy(table, tree=None):
+    tree = tree or KuhnTree()
+    for label, (p_pass, p_bet) in zip(tree.labels, table):
+        print(f"   {label:5}  pasar {p_pass:5.3f} | apostar {p_bet:5.3f}")
+
+
+def test_kuhn_cfr(n_iterations=1000):
+    """Convergencia al equilibrio de Kuhn y explotabilidad del DQN guardado"""
+    import os
+
+    tree = KuhnTree()
+    assert len(tree.histories) == 4 and tree.n_infosets == 12
+
+    uniform = np.full((tree.n_infosets, 2), 0.5)
+    print(f"🎲 Aleatorio: explotabilidad {exploitability(uniform, tree):.4f}")
+
+    start = time.perf_counter()
+    solver = KuhnCFR(tree).solve(n_iterations)
+    elapsed = (time.perf_counter() - start) * 1000
+    nash = solver.average_strategy()
+    expl = exploitability(nash, tree)
+    value = expected_value(nash, tree)
+    print(f"✅ CFR+ {solver.iterations} iteraciones en {elapsed:.0f} ms | "
+          f"explotabilidad {expl:.2e} | valor jugador 0 {value:.4f} (teórico {GAME_VALUE:.4f})")
+    print_strategy(nash, tree)
+    assert expl < 1e-3
+    assert abs(value - GAME_VALUE) < 1e-3
+    # Equilibrio conocido: el jugador 1 siempre apuesta K tras check y nunca paga con J
+    assert nash[tree.infoset_index(3, (0,)), 1] > 0.99
+    assert nash[tree.infoset_index(1, (1,)), 1] < 0.01
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "poker_kuhn_dqn.pth")
+    if os.path.exists(path):
+        from neural_agent import NeuralPokerAgent
+        agent = NeuralPokerAgent(hidden_sizes=[128, 64, 32])
+        if agent.load_model(path):
+            table = agent_policy_table(agent, tree)
+            print(f"🧠 poker_kuhn_dqn.pth: explotabilidad {exploitability(table, tree):.4f} fichas/mano")
+            print_strategy(table, tree)
+
+
+if __name__ == "__main__":
+    test_kuhn_cfr()
@@ -4,9 +4,11 @@ import torch.optim as optim
 import torch.nn.functional as F
 import numpy as np
 import random
-from collections import deque
 import pickle
 import os
+import time
+
+from obs_encoder import encode_obs
 
 class PokerDQN(nn.Module):
     """
@@ -70,29 +72,175 @@ class PokerDQN(nn.Module):
 
 
 class ExperienceReplay:
-    """Buffer de experiencia para DQN"""
+    """
+    Buffer circular de experiencias para DQN.
+    
+    Toda la memoria se reserva al crearlo: arrays (capacity, state_size) float32
+    para estados y siguientes estados y arrays tipados para acciones,
+    recompensas y dones. Las experiencias nuevas sobrescriben a las más antiguas.
+    """
     
-    def __init__(self, capacity=10000):
-        self.buffer = deque(maxlen=capacity)
+    def __init__(self, capacity=10000, state_size=20):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.pos = 0
+        self.size = 0
     
     def push(self, state, action, reward, next_state, done):
         """Agregar experiencia al buffer"""
-        self.buffer.append((state, action, reward, next_state, done))
+        i = self.pos
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.pos = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        """Agregar k experiencias de una vez (arrays con primera dimensión k)"""
+        k = len(actions)
+        if k == 0:
+            return
+        if k > self.capacity:  # sólo caben las últimas
+            states, actions, rewards = states[-self.capacity:], actions[-self.capacity:], rewards[-self.capacity:]
+            next_states, dones = next_states[-self.capacity:], dones[-self.capacity:]
+            k = self.capacity
+        idx = (self.pos + np.arange(k)) % self.capacity
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+        self.pos = (self.pos + k) % self.capacity
+        self.size = min(self.size + k, self.capacity)
     
     def sample(self, batch_size):
-        """Muestrear batch aleatorio de experiencias"""
-        batch = random.sample(self.buffer, min(batch_size, len(self.buffer)))
+        """Muestrear batch aleatorio de experiencias (índices con reemplazo, O(batch))"""
+        idx = np.random.randint(0, self.size, size=min(batch_size, self.size))
         
-        states = torch.FloatTensor([e[0] for e in batch])
-        actions = torch.LongTensor([e[1] for e in batch])
-        rewards = torch.FloatTensor([e[2] for e in batch])
-        next_states = torch.FloatTensor([e[3] for e in batch])
-        dones = torch.BoolTensor([e[4] for e in batch])
+        states = torch.from_numpy(self.states[idx])
+        actions = torch.from_numpy(self.actions[idx])
+        rewards = torch.from_numpy(self.rewards[idx])
+        next_states = torch.from_numpy(self.next_states[idx])
+        dones = torch.from_numpy(self.dones[idx])
         
         return states, actions, rewards, next_states, dones
     
     def __len__(self):
-        return len(self.buffer)
+        return self.size
+
+
+class SumTree:
+    """
+    Árbol de sumas sobre un array: las hojas están en [capacity, 2*capacity),
+    cada nodo interno guarda la suma de sus dos hijos y la raíz (índice 1) el total.
+    Actualizar y buscar una hoja cuesta O(log N).
+    """
+    
+    def __init__(self, capacity):
+        self.capacity = 1 << max(0, (capacity - 1).bit_length())  # potencia de 2
+        self.depth = self.capacity.bit_length() - 1
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+    
+    def total(self):
+        return self.tree[1]
+    
+    def set(self, i, priority):
+        """Prioridad de una hoja (camino escalar, para push de una en una)"""
+        tree = self.tree
+        node = i + self.capacity
+        tree[node] = priority
+        node >>= 1
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node >>= 1
+    
+    def update(self, idx, priorities):
+        """Prioridades de varias hojas a la vez; recalcula sus ancestros nivel a nivel"""
+        node = np.asarray(idx, dtype=np.int64) + self.capacity
+        self.tree[node] = priorities
+        for _ in range(self.depth):
+            node = node >> 1
+            self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+    
+    def find(self, values):
+        """Hoja en la que cae cada valor acumulado de `values` (descenso vectorizado)"""
+        values = np.array(values, dtype=np.float64)
+        node = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * node
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values = np.where(go_right, values - left_sum, values)
+            node = left + go_right
+        return node - self.capacity
+    
+    def get(self, idx):
+        return self.tree[np.asarray(idx) + self.capacity]
+
+
+class PrioritizedExperienceReplay(ExperienceReplay):
+    """
+    Experience replay priorizado (Schaul et al.): cada transición se muestrea
+    con probabilidad proporcional a |error TD|^alpha y el sesgo se corrige con
+    pesos de importance sampling (N * P(i))^-beta, con beta creciendo hasta 1.
+    """
+    
+    def __init__(self, capacity=10000, state_size=20, alpha=0.6, beta=0.4,
+                 beta_increment=1e-4, epsilon=1e-5):
+        super().__init__(capacity, state_size)
+        self.tree = SumTree(capacity)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.max_priority = 1.0  # las transiciones nuevas se ven al menos una vez
+    
+    def push(self, state, action, reward, next_state, done):
+        i = self.pos
+        super().push(state, action, reward, next_state, done)
+        self.tree.set(i, self.max_priority ** self.alpha)
+    
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        k = min(len(actions), self.capacity)
+        idx = (self.pos + np.arange(k)) % self.capacity
+        super().push_batch(states, actions, rewards, next_states, dones)
+        if k:
+            self.tree.update(idx, np.full(k, self.max_priority ** self.alpha))
+    
+    def sample(self, batch_size):
+        """
+        Muestreo estratificado por prioridad.
+        Retorna además los pesos IS (tensor) y los índices para update_priorities.
+        """
+        n = min(batch_size, self.size)
+        total = self.tree.total()
+        values = (np.arange(n) + np.random.random(n)) * (total / n)
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+        
+        probs = self.tree.get(idx) / total
+        weights = (self.size * probs) ** (-self.beta)
+        weights = (weights / weights.max()).astype(np.float32)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        
+        return (torch.from_numpy(self.states[idx]),
+                torch.from_numpy(self.actions[idx]),
+                torch.from_numpy(self.rewards[idx]),
+                torch.from_numpy(self.next_states[idx]),
+                torch.from_numpy(self.dones[idx]),
+                torch.from_numpy(weights),
+                idx)
+    
+    def update_priorities(self, idx, td_errors):
+        """Nuevas prioridades tras calcular los errores TD del batch"""
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(idx, priorities ** self.alpha)
 
 
 class NeuralPokerAgent:
@@ -116,12 +264,20 @@ class NeuralPokerAgent:
                  gamma=0.95,
                  batch_size=32,
                  target_update_freq=100,
-                 memory_size=10000):
+                 memory_size=10000,
+                 equity_feature=False,
+                 prioritized_replay=False):
         
         # Configuración del dispositivo (GPU si está disponible)
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"🧠 NeuralPokerAgent usando: {self.device}")
         
+        # Característica opcional: equidad preflop tabulada (añade 1 entrada a la red)
+        self.equity_feature = equity_feature
+        if equity_feature:
+            input_size += 1
+        self.input_size = input_size
+        
         # Redes neuronales
         self.q_network = PokerDQN(input_size, hidden_sizes, 3).to(self.device)
         self.target_network = PokerDQN(input_size, hidden_sizes, 3).to(self.device)
@@ -140,8 +296,12 @@ class NeuralPokerAgent:
         self.batch_size = batch_size
         self.target_update_freq = target_update_freq
         
-        # Experience replay
-        self.memory = ExperienceReplay(memory_size)
+        # Experience replay (uniforme o priorizado por error TD)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.memory = PrioritizedExperienceReplay(memory_size, input_size)
+        else:
+            self.memory = ExperienceReplay(memory_size, input_size)
         
         # Contadores
         self.steps = 0
@@ -157,120 +317,26 @@ class NeuralPokerAgent:
     def obs_to_vector_enhanced(self, obs):
         """
         Versión mejorada de obs_to_vector con más características y mejor normalización
+        (codificada con tablas precalculadas, ver obs_encoder)
         """
-        try:
-            if obs is None:
-                return np.zeros(20, dtype=np.float32)
-            
-            vector = []
-            
-            # Si obs es un diccionario (HoldemEnv)
-            if isinstance(obs, dict):
-                # Cartas en mano (hole cards) - 4 elementos
-                if 'hole' in obs and obs['hole']:
-                    for card in obs['hole'][:2]:
-                        if isinstance(card, tuple) and len(card) == 2:
-                            rank, suit = card
-                            # Normalizar rank de manera más efectiva
-                            vector.append((rank - 2) / 12.0)  # 0-1 para ranks 2-14
-                            # Suit como valor normalizado
-                            suit_val = ['Corazones', 'Diamantes', 'Trebol', 'Copas'].index(suit) if suit in ['Corazones', 'Diamantes', 'Trebol', 'Copas'] else 0
-                            vector.append(suit_val / 3.0)
-                        else:
-                            vector.extend([0, 0])
-                else:
-                    vector.extend([0, 0, 0, 0])  # 2 cartas x 2 elementos
-                
-                # Cartas comunitarias (board) - 10 elementos máximo
-                if 'board' in obs and obs['board']:
-                    board_cards = list(obs['board'])[:5]  # Máximo 5 cartas
-                    for card in board_cards:
-                        if isinstance(card, tuple) and len(card) == 2:
-                            rank, suit = card
-                            vector.append((rank - 2) / 12.0)
-                            suit_val = ['Corazones', 'Diamantes', 'Trebol', 'Copas'].index(suit) if suit in ['Corazones', 'Diamantes', 'Trebol', 'Copas'] else 0
-                            vector.append(suit_val / 3.0)
-                        else:
-                            vector.extend([0, 0])
-                    
-                    # Completar hasta 5 cartas
-                    cards_to_add = 5 - len(board_cards)
-                    vector.extend([0, 0] * cards_to_add)
-                else:
-                    vector.extend([0] * 10)  # 5 cartas x 2 elementos
-                
-                # Información del pot - 1 elemento (mejor normalización)
-                pot = obs.get('pot', 0)
-                vector.append(min(pot / 500.0, 2.0))  # Permitir valores hasta 2x
-                
-                # Apuesta propia - 1 elemento
-                own_bet = obs.get('own_bet', 0)
-                vector.append(min(own_bet / 50.0, 2.0))
-                
-                # Apuestas de oponentes - 3 elementos
-                opp_bets = obs.get('opp_bets', [])
-                for i in range(3):
-                    if i < len(opp_bets):
-                        vector.append(min(opp_bets[i] / 50.0, 2.0))
-                    else:
-                        vector.append(0)
-                
-                # Stage del juego - 1 elemento
-                stage = obs.get('stage', 'preflop')
-                stage_map = {'preflop': 0.0, 'flop': 0.33, 'turn': 0.66, 'river': 1.0}
-                vector.append(stage_map.get(stage, 0.0))
-            
-            # Si obs es una tupla (KuhnEnv)
-            elif isinstance(obs, tuple) and len(obs) == 2:
-                card, history = obs
-                # Carta normalizada
-                vector.append((card - 1) / 2.0)  # Kuhn: 1-3 -> 0-1
-                
-                # Historia de acciones (últimas 10)
-                for i in range(10):
-                    if i < len(history):
-                        vector.append(float(history[i]))
-                    else:
-                        vector.append(0.0)
-                
-                # Completar hasta 20
-                while len(vector) < 20:
-                    vector.append(0.0)
-            
-            else:
-                # Fallback: usar obs_to_vector original
-                try:
-                    from poker_agent import obs_to_vector
-                    original_vector = obs_to_vector(obs)
-                    # Asegurar que sea del tamaño correcto
-                    if len(original_vector) >= 20:
-                        return original_vector[:20].astype(np.float32)
-                    else:
-                        padded = np.zeros(20, dtype=np.float32)
-                        padded[:len(original_vector)] = original_vector
-                        return padded
-                except:
-                    return np.zeros(20, dtype=np.float32)
-            
-            # Asegurar tamaño fijo de exactamente 20
-            if len(vector) > 20:
-                vector = vector[:20]
-            elif len(vector) < 20:
-                vector.extend([0.0] * (20 - len(vector)))
-            
-            # Convertir a numpy array con tipo correcto
-            result = np.array(vector, dtype=np.float32)
-            
-            # Verificar que no hay NaN o infinitos
-            if np.any(np.isnan(result)) or np.any(np.isinf(result)):
-                print(f"⚠️ Vector contiene NaN o infinitos, usando vector cero")
-                return np.zeros(20, dtype=np.float32)
-            
-            return result
-        
-        except Exception as e:
-            print(f"⚠️ Error en obs_to_vector_enhanced: {e}")
-            return np.zeros(20, dtype=np.float32)
+        return encode_obs(obs)
+    
+    def encode_state(self, obs):
+        """
+        Vector de entrada de la red: obs_to_vector_enhanced y, si está activada,
+        la equidad preflop de las cartas propias como característica extra
+        """
+        vector = self.obs_to_vector_enhanced(obs)
+        if not self.equity_feature:
+            return vector
+        equity = 0.0
+        if isinstance(obs, dict) and obs.get('hole'):
+            try:
+                from preflop_equity import preflop_equity
+                equity = preflop_equity(obs['hole'], len(obs.get('opp_bets', ())) or 1)
+            except Exception as e:
+                print(f"⚠️ Equidad preflop no disponible: {e}")
+        return np.append(vector, np.float32(equity))
     
     def action(self, state):
         """
@@ -278,7 +344,7 @@ class NeuralPokerAgent:
         """
         try:
             # Convertir estado a vector
-            state_vector = self.obs_to_vector_enhanced(state)
+            state_vector = self.encode_state(state)
             
             # Epsilon-greedy exploration
             if random.random() < self.epsilon:
@@ -302,8 +368,8 @@ class NeuralPokerAgent:
         """
         try:
             # Convertir estados a vectores
-            state_vector = self.obs_to_vector_enhanced(state)
-            next_state_vector = self.obs_to_vector_enhanced(next_state) if next_state else np.zeros(20)
+            state_vector = self.encode_state(state)
+            next_state_vector = self.encode_state(next_state) if next_state else np.zeros(self.input_size, dtype=np.float32)
             
             # Agregar experiencia al buffer
             self.memory.push(state_vector, action, reward, next_state_vector, done)
@@ -333,13 +399,60 @@ class NeuralPokerAgent:
         except Exception as e:
             print(f"⚠️ Error en NeuralPokerAgent.update: {e}")
     
+    def act_batch(self, states):
+        """
+        Acciones epsilon-greedy para un batch (N, input_size) de estados ya
+        vectorizados, con una sola pasada de la red
+        """
+        states = np.asarray(states, dtype=np.float32)
+        with torch.no_grad():
+            was_training = self.q_network.training
+            self.q_network.eval()  # BatchNorm con estadísticas acumuladas, sin Dropout
+            q_values = self.q_network(torch.from_numpy(states).to(self.device))
+            self.q_network.train(was_training)
+        actions = q_values.argmax(dim=1).cpu().numpy()
+        
+        explore = np.random.random(len(actions)) < self.epsilon
+        actions[explore] = np.random.randint(0, 3, size=int(explore.sum()))
+        return actions
+    
+    def update_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Versión por lotes de update: guarda todas las transiciones y hace un
+        único paso de entrenamiento (cuenta como un paso para target/epsilon)
+        """
+        try:
+            self.memory.push_batch(states, actions, rewards, next_states, dones)
+            
+            # Estadísticas: cada transición terminal cierra una mano
+            for reward, done in zip(rewards, dones):
+                if done:
+                    self.episodes += 1
+                    self.rewards_history.append(float(reward))
+                    if reward > 0:
+                        self.wins += 1
+            
+            if len(self.memory) >= self.batch_size:
+                self._train_step()
+            
+            self.steps += 1
+            if self.steps % self.target_update_freq == 0:
+                self.target_network.load_state_dict(self.q_network.state_dict())
+            
+            if self.epsilon > self.epsilon_min:
+                self.epsilon *= self.epsilon_decay
+        
+        except Exception as e:
+            print(f"⚠️ Error en NeuralPokerAgent.update_batch: {e}")
+    
     def _train_step(self):
         """
         Paso de entrenamiento usando experience replay
         """
         try:
             # Muestrear batch de experiencias
-            states, actions, rewards, next_states, dones = self.memory.sample(self.batch_size)
+            batch = self.memory.sample(self.batch_size)
+            states, actions, rewards, next_states, dones = batch[:5]
             
             # Mover a dispositivo
             states = states.to(self.device)
@@ -356,8 +469,14 @@ class NeuralPokerAgent:
                 next_q_values = self.target_network(next_states).max(1)[0]
                 target_q_values = rewards + (self.gamma * next_q_values * ~dones)
             
-            # Calcular pérdida
-            loss = F.mse_loss(current_q_values.squeeze(), target_q_values)
+            # Calcular pérdida (ponderada por importance sampling si el replay es priorizado)
+            if isinstance(self.memory, PrioritizedExperienceReplay):
+                weights = batch[5].to(self.device)
+                td_errors = target_q_values - current_q_values.squeeze(1)
+                loss = (weights * td_errors.pow(2)).mean()
+                self.memory.update_priorities(batch[6], td_errors.detach().cpu().numpy())
+            else:
+                loss = F.mse_loss(current_q_values.squeeze(), target_q_values)
             
             # Backpropagation
             self.optimizer.zero_grad()
@@ -374,9 +493,9 @@ class NeuralPokerAgent:
         except Exception as e:
             print(f"⚠️ Error en _train_step: {e}")
     
-    def save_model(self, filepath="poker_dqn_model.pth"):
+    def save_model(self, filepath="poker_dqn_model.pth", frozen=False):
         """
-        Guardar modelo entrenado
+        Guardar modelo entrenado (y, si frozen, el artefacto de inferencia congelado junto al .pth)
         """
         try:
             checkpoint = {
@@ -393,6 +512,11 @@ class NeuralPokerAgent:
             }
             torch.save(checkpoint, filepath)
             print(f"✅ Modelo guardado en: {filepath}")
+            
+            if frozen and not self.equity_feature:
+                from frozen_policy import export_frozen, export_numpy
+                print(f"🧊 Inferencia congelada en: {export_frozen(self.q_network, filepath)}")
+                print(f"🧊 Pesos NumPy en: {export_numpy(self.q_network, filepath)}")
         
         except Exception as e:
             print(f"⚠️ Error guardando modelo: {e}")
@@ -513,6 +637,70 @@ class PokerNeuralTrainer:
             print(f"⚠️ Error en train_episode: {e}")
             return 0
     
+    def train_vectorized(self, n_steps=1000, print_freq=100):
+        """
+        Self-play por lotes sobre un HoldemVecEnv: en cada paso la red decide
+        para el asiento en turno de todas las mesas con un solo forward (N, 20).
+        
+        Cada asiento guarda su último (estado, acción); la transición se cierra
+        cuando vuelve a actuar (recompensa 0) o cuando termina la mano.
+        """
+        from holdem_vec_env import HoldemVecEnv
+        if not isinstance(self.env, HoldemVecEnv):
+            raise TypeError("train_vectorized necesita un HoldemVecEnv")
+        if self.agent.equity_feature:
+            raise ValueError("HoldemVecEnv genera el vector de 20 características (sin equity_feature)")
+        
+        env = self.env
+        n, p = env.n_envs, env.n_players
+        rows = np.arange(n)
+        pending_state = np.zeros((n, p, self.agent.input_size), dtype=np.float32)
+        pending_action = np.zeros((n, p), dtype=np.int64)
+        has_pending = np.zeros((n, p), dtype=bool)
+        zeros = np.zeros((n * p, self.agent.input_size), dtype=np.float32)
+        
+        print(f"🚀 Self-play vectorizado: {n} mesas x {n_steps} pasos...")
+        obs = env.reset()
+        hands = 0
+        start = time.time()
+        
+        for step in range(n_steps):
+            seats = env.current_player.copy()
+            states = obs.copy()
+            actions = self.agent.act_batch(states)
+            
+            # El asiento que vuelve a actuar cierra su transición anterior
+            again = has_pending[rows, seats]
+            trans = [(pending_state[again, seats[again]], pending_action[again, seats[again]],
+                      np.zeros(int(again.sum()), dtype=np.float32), states[again],
+                      np.zeros(int(again.sum()), dtype=bool))]
+            pending_state[rows, seats] = states
+            pending_action[rows, seats] = actions
+            has_pending[rows, seats] = True
+            
+            obs, rewards, dones, _ = env.step(actions)
+            
+            # Manos terminadas: transición terminal para cada asiento que actuó
+            d_rows, d_seats = np.nonzero(has_pending & dones[:, None])
+            k = len(d_rows)
+            trans.append((pending_state[d_rows, d_seats], pending_action[d_rows, d_seats],
+                          rewards[d_rows, d_seats].astype(np.float32), zeros[:k], np.ones(k, dtype=bool)))
+            has_pending[dones] = False
+            
+            self.agent.update_batch(*[np.concatenate(parts) for parts in zip(*trans)])
+            
+            hands += int(dones.sum())
+            self.training_history.extend(rewards[dones, 0].tolist())
+            
+            if step % print_freq == 0:
+                elapsed = max(time.time() - start, 1e-9)
+                avg_reward = np.mean(self.training_history[-500:]) if self.training_history else 0
+                print(f"📈 Paso {step:5d} | Manos: {hands} ({hands / elapsed:.0f}/s) | "
+                      f"Recompensa avg: {avg_reward:6.2f} | Epsilon: {self.agent.epsilon:.3f}")
+        
+        print(f"✅ Self-play completado: {hands} manos en {time.time() - start:.1f}s")
+        return self.training_history
+    
     def train(self, n_episodes=1000, save_freq=100, print_freq=50):
         """
         Entrenar el agente por múltiples episodios
@@ -578,5 +766,67 @@ def test_neural_agent():
         traceback.print_exc()
 
 
+def benchmark_replay(n_hands=3000, window=300, threshold=1.0, seed=0):
+    """
+    Compara el replay uniforme con el priorizado:
+    - muestras/s de sample(64) (+ update_priorities) con 50k transiciones
+    - manos hasta que la recompensa media (ventana `window`) supera `threshold`
+      entrenando heads-up contra RandomAgent con las mismas semillas
+    """
+    from holdem_env import HoldemEnv
+    from poker_agent import RandomAgent
+    
+    print("⏱️ Benchmark de experience replay")
+    rng = np.random.default_rng(seed)
+    n = 50000
+    data = (rng.random((n, 20), dtype=np.float32), rng.integers(0, 3, n), rng.standard_normal(n).astype(np.float32),
+            rng.random((n, 20), dtype=np.float32), rng.random(n) < 0.3)
+    for name, memory in (("Uniforme", ExperienceReplay(n)), ("Priorizado", PrioritizedExperienceReplay(n))):
+        memory.push_batch(*data)
+        start = time.perf_counter()
+        for _ in range(2000):
+            batch = memory.sample(64)
+            if len(batch) > 5:
+                memory.update_priorities(batch[6], rng.standard_normal(64))
+        print(f"   {name:10}: {2000 / (time.perf_counter() - start):8,.0f} muestras(64)/s")
+    
+    results = {}
+    for name, prioritized in (("Uniforme", False), ("Priorizado", True)):
+        random.seed(seed)
+        np.random.seed(seed)
+        torch.manual_seed(seed)
+        agent = NeuralPokerAgent(hidden_sizes=[128, 64], learning_rate=0.001, epsilon=1.0,
+                                 epsilon_decay=0.998, batch_size=64, memory_size=20000,
+                                 prioritized_replay=prioritized)
+        env = HoldemEnv(n_players=2, seed=seed)
+        opponent = RandomAgent(weights=[0.2, 0.5, 0.3])
+        rewards = []
+        reached = None
+        start = time.perf_counter()
+        for hand in range(1, n_hands + 1):
+            # La transición del agente se cierra cuando vuelve a actuar o al acabar la mano
+            obs, _ = env.reset()
+            pending = None
+            done = False
+            while not done:
+                player = env.current_player
+                if player == 0:
+                    if pending:
+                        agent.update(pending[0], pending[1], 0, obs, False)
+                    action = agent.action(obs)
+                    pending = (obs, action)
+                else:
+                    action = opponent.action(obs)
+                obs, hand_rewards, done, _ = env.step(player, action)
+            if pending:
+                agent.update(pending[0], pending[1], hand_rewards[0], None, True)
+            rewards.append(hand_rewards[0])
+            if reached is None and hand >= window and np.mean(rewards[-window:]) >= threshold:
+                reached = hand
+        results[name] = reached
+        print(f"   {name:10}: convergencia en {reached or f'>{n_hands}'} manos | "
+              f"media final {np.mean(rewards[-window:]):.2f} | {time.perf_counter() - start:.1f}s")
+    return results
+
 if __name__ == "__main__":
     test_neural_agent()
\ No newline at end of file
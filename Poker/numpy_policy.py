@@ -0,0 +1,105 @@
+# numpy_policy.py
+"""
+Inferencia de PokerDQN sólo con NumPy.
+
+frozen_policy.export_numpy guarda las capas ya fusionadas (Linear + BatchNorm,
+sin Dropout) en un .npz junto al checkpoint:
+    poker_holdem_dqn_final.pth -> poker_holdem_dqn_final.npz
+
+Los artefactos llevan la huella del .pth (is_current): si el checkpoint cambia
+sin volver a exportar, se ignoran en vez de jugar con la red anterior.
+
+Este módulo no importa torch: la GUI puede cargar los bots neurales sin
+esperar al framework. El resultado equivale a PokerDQN en modo eval().
+
+Uso:
+    policy = NumpyPolicy("poker_holdem_dqn_final.npz")
+    action = policy.action(obs)
+"""
+import hashlib
+import os
+import random
+import zipfile
+
+import numpy as np
+
+NUMPY_SUFFIX = ".npz"
+# Entrada de los artefactos con la huella del checkpoint del que salieron
+DIGEST_KEY = "checkpoint_sha256"
+
+
+def numpy_path(checkpoint_path: str) -> str:
+    """Ruta de los pesos NumPy correspondientes a un checkpoint .pth"""
+    return os.path.splitext(checkpoint_path)[0] + NUMPY_SUFFIX
+
+
+def checkpoint_digest(checkpoint_path: str) -> str:
+    """Huella (sha256) del contenido de un checkpoint; se guarda en los artefactos exportados"""
+    with open(checkpoint_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def artifact_digest(artifact_path: str):
+    """Huella del checkpoint guardada en un .npz o .jit.pt exportado (None si no tiene)"""
+    try:
+        with zipfile.ZipFile(artifact_path) as archive:  # .npz y TorchScript son zip
+            for name in archive.namelist():
+                if name == DIGEST_KEY + ".npy":
+                    with np.load(artifact_path) as data:
+                        return str(data[DIGEST_KEY])
+                if name.endswith("/extra/" + DIGEST_KEY):
+                    return archive.read(name).decode("ascii")
+    except (OSError, zipfile.BadZipFile, ValueError):
+        pass
+    return None
+
+
+def is_current(artifact_path: str, checkpoint_path: str) -> bool:
+    """True si el artefacto exportado existe y se generó a partir de este checkpoint"""
+    if not os.path.exists(artifact_path):
+        return False
+    return (not os.path.exists(checkpoint_path)
+            or artifact_digest(artifact_path) == checkpoint_digest(checkpoint_path))
+
+
+def load_weights(path: str):
+    """[(W (entrada, salida), b)] de cada capa; todas menos la última van seguidas de ReLU"""
+    with np.load(path) as data:
+        n_layers = sum(name.startswith("W") for name in data.files)
+        return [(np.ascontiguousarray(data[f"W{i}"], dtype=np.float32),
+                 np.ascontiguousarray(data[f"b{i}"], dtype=np.float32))
+                for i in range(n_layers)]
+
+
+class NumpyPolicy:
+    """Política greedy con la interfaz de FrozenPolicy, evaluada con NumPy"""
+
+    def __init__(self, path: str, encoder=None, epsilon: float = 0.0):
+        self.layers = load_weights(path)
+        self.epsilon = epsilon
+        self._encoder = encoder
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            from obs_encoder import ObsEncoder
+            self._encoder = ObsEncoder()
+        return self._encoder
+
+    def q_values(self, states: np.ndarray) -> np.ndarray:
+        """Q-values para un batch (N, input_size) float32"""
+        x = np.atleast_2d(states)
+        for W, b in self.layers[:-1]:
+            x = x @ W
+            x += b
+            np.maximum(x, 0.0, out=x)
+        W, b = self.layers[-1]
+        return x @ W + b
+
+    def action_from_vector(self, vector: np.ndarray) -> int:
+        return int(self.q_values(vector).argmax())
+
+    def action(self, state) -> int:
+        if random.random() < self.epsilon:
+            return random.choice([0, 1, 2])
+        return self.action_from_vector(self.encoder(state))
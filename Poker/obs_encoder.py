@@ -0,0 +1,324 @@
+# obs_encoder.py
+"""
+Codificador rápido de observaciones al vector de 20 características de
+NeuralPokerAgent.obs_to_vector_enhanced.
+
+- Cada carta (rank, palo) se traduce con una tabla precalculada a sus dos
+  características, sin listas intermedias ni búsquedas de palo.
+- encode_obs escribe directamente en un buffer float32 del llamador (o en una
+  fila de una matriz de batch); encode_batch codifica muchas observaciones de
+  una vez en una matriz (N, 20).
+- Los casos raros (Kuhn, observaciones incompletas, valores no finitos) pasan
+  por obs_to_vector_reference, la implementación original, de modo que el
+  resultado es idéntico bit a bit en todos los casos.
+
+Uso:
+    buf = np.zeros(20, dtype=np.float32)
+    encode_obs(obs, buf)                 # sin asignar memoria
+    states = encode_batch(observaciones) # (N, 20) float32
+"""
+import time
+from array import array
+
+import numpy as np
+
+OBS_SIZE = 20
+SUITS = ('Corazones', 'Diamantes', 'Trebol', 'Copas')
+STAGE_MAP = {'preflop': 0.0, 'flop': 0.33, 'turn': 0.66, 'river': 1.0}
+
+# (rank, palo) -> (rank normalizado, palo normalizado)
+CARD_FEATURES = {(rank, suit): ((rank - 2) / 12.0, i / 3.0)
+                 for rank in range(2, 15) for i, suit in enumerate(SUITS)}
+
+
+def obs_to_vector_reference(obs):
+    """
+    Implementación original de obs_to_vector_enhanced (referencia y ruta lenta)
+    """
+    try:
+        if obs is None:
+            return np.zeros(20, dtype=np.float32)
+
+        vector = []
+
+        # Si obs es un diccionario (HoldemEnv)
+        if isinstance(obs, dict):
+            # Cartas en mano (hole cards) - 4 elementos
+            if 'hole' in obs and obs['hole']:
+                for card in obs['hole'][:2]:
+                    if isinstance(card, tuple) and len(card) == 2:
+                        rank, suit = card
+                        # Normalizar rank de manera más efectiva
+                        vector.append((rank - 2) / 12.0)  # 0-1 para ranks 2-14
+                        # Suit como valor normalizado
+                        suit_val = ['Corazones', 'Diamantes', 'Trebol', 'Copas'].index(suit) if suit in ['Corazones', 'Diamantes', 'Trebol', 'Copas'] else 0
+                        vector.append(suit_val / 3.0)
+                    else:
+                        vector.extend([0, 0])
+            else:
+                vector.extend([0, 0, 0, 0])  # 2 cartas x 2 elementos
+
+            # Cartas comunitarias (board) - 10 elementos máximo
+            if 'board' in obs and obs['board']:
+                board_cards = list(obs['board'])[:5]  # Máximo 5 cartas
+                for card in board_cards:
+                    if isinstance(card, tuple) and len(card) == 2:
+                        rank, suit = card
+                        vector.append((rank - 2) / 12.0)
+                        suit_val = ['Corazones', 'Diamantes', 'Trebol', 'Copas'].index(suit) if suit in ['Corazones', 'Diamantes', 'Trebol', 'Copas'] else 0
+                        vector.append(suit_val / 3.0)
+                    else:
+                        vector.extend([0, 0])
+
+                # Completar hasta 5 cartas
+                cards_to_add = 5 - len(board_cards)
+                vector.extend([0, 0] * cards_to_add)
+            else:
+                vector.extend([0] * 10)  # 5 cartas x 2 elementos
+
+            # Información del pot - 1 elemento (mejor normalización)
+            pot = obs.get('pot', 0)
+            vector.append(min(pot / 500.0, 2.0))  # Permitir valores hasta 2x
+
+            # Apuesta propia - 1 elemento
+            own_bet = obs.get('own_bet', 0)
+            vector.append(min(own_bet / 50.0, 2.0))
+
+            # Apuestas de oponentes - 3 elementos
+            opp_bets = obs.get('opp_bets', [])
+            for i in range(3):
+                if i < len(opp_bets):
+                    vector.append(min(opp_bets[i] / 50.0, 2.0))
+                else:
+                    vector.append(0)
+
+            # Stage del juego - 1 elemento
+            stage = obs.get('stage', 'preflop')
+            stage_map = {'preflop': 0.0, 'flop': 0.33, 'turn': 0.66, 'river': 1.0}
+            vector.append(stage_map.get(stage, 0.0))
+
+        # Si obs es una tupla (KuhnEnv)
+        elif isinstance(obs, tuple) and len(obs) == 2:
+            card, history = obs
+            # Carta normalizada
+            vector.append((card - 1) / 2.0)  # Kuhn: 1-3 -> 0-1
+
+            # Historia de acciones (últimas 10)
+            for i in range(10):
+                if i < len(history):
+                    vector.append(float(history[i]))
+                else:
+                    vector.append(0.0)
+
+            # Completar hasta 20
+            while len(vector) < 20:
+                vector.append(0.0)
+
+        else:
+            # Fallback: usar obs_to_vector original
+            try:
+                from poker_agent import obs_to_vector
+                original_vector = obs_to_vector(obs)
+                # Asegurar que sea del tamaño correcto
+                if len(original_vector) >= 20:
+                    return original_vector[:20].astype(np.float32)
+                else:
+                    padded = np.zeros(20, dtype=np.float32)
+                    padded[:len(original_vector)] = original_vector
+                    return padded
+            except:
+                return np.zeros(20, dtype=np.float32)
+
+        # Asegurar tamaño fijo de exactamente 20
+        if len(vector) > 20:
+            vector = vector[:20]
+        elif len(vector) < 20:
+            vector.extend([0.0] * (20 - len(vector)))
+
+        # Convertir a numpy array con tipo correcto
+        result = np.array(vector, dtype=np.float32)
+
+        # Verificar que no hay NaN o infinitos
+        if np.any(np.isnan(result)) or np.any(np.isinf(result)):
+            print(f"⚠️ Vector contiene NaN o infinitos, usando vector cero")
+            return np.zeros(20, dtype=np.float32)
+
+        return result
+
+    except Exception as e:
+        print(f"⚠️ Error en obs_to_vector_enhanced: {e}")
+        return np.zeros(20, dtype=np.float32)
+
+
+_FEATURES_GET = CARD_FEATURES.get
+_ZEROS = memoryview(array('f', bytes(4 * OBS_SIZE)))
+
+
+def _card(card):
+    """Características de una carta que no está en la tabla (palo desconocido -> 0)"""
+    if isinstance(card, tuple) and len(card) == 2:
+        rank, suit = card
+        return (rank - 2) / 12.0, SUITS.index(suit) / 3.0 if suit in SUITS else 0.0
+    return 0.0, 0.0
+
+
+def _write(obs, out, k):
+    """
+    Escribe el vector de `obs` en la memoryview float32 `out` a partir de `k`.
+    Devuelve False si la observación necesita la ruta de referencia.
+    """
+    if type(obs) is not dict:
+        return False
+    features = _FEATURES_GET
+    hole = obs.get('hole')
+    if hole:
+        if len(hole) < 2:
+            return False  # la referencia desplaza el resto del vector
+        out[k], out[k + 1] = features(hole[0]) or _card(hole[0])
+        out[k + 2], out[k + 3] = features(hole[1]) or _card(hole[1])
+    else:
+        out[k:k + 4] = _ZEROS[:4]
+
+    board = obs.get('board')
+    j = k + 4
+    if board:
+        for card in board[:5]:
+            out[j], out[j + 1] = features(card) or _card(card)
+            j += 2
+    if j < k + 14:
+        out[j:k + 14] = _ZEROS[:k + 14 - j]
+
+    pot = obs.get('pot', 0)
+    own_bet = obs.get('own_bet', 0)
+    opp_bets = obs.get('opp_bets', ())
+    n_opp = len(opp_bets)
+    check = pot + own_bet
+    out[k + 14] = min(pot / 500.0, 2.0)
+    out[k + 15] = min(own_bet / 50.0, 2.0)
+    for i in range(3):
+        if i < n_opp:
+            x = opp_bets[i]
+            check += x
+            out[k + 16 + i] = min(x / 50.0, 2.0)
+        else:
+            out[k + 16 + i] = 0.0
+    if check - check != 0:
+        return False  # NaN o infinito: la referencia devuelve el vector cero
+    out[k + 19] = STAGE_MAP.get(obs.get('stage', 'preflop'), 0.0)
+    return True
+
+
+def encode_obs(obs, out=None):
+    """
+    Vector de 20 características de `obs`, idéntico a obs_to_vector_enhanced.
+
+    Args:
+        obs: observación de HoldemEnv (dict), KuhnEnv (tupla) u otra
+        out: buffer float32 C-contiguo de 20 posiciones; si es None se crea uno nuevo
+    """
+    if out is None:
+        out = np.empty(OBS_SIZE, dtype=np.float32)
+    try:
+        if _write(obs, memoryview(out), 0):
+            return out
+    except Exception:
+        pass
+    out[:] = obs_to_vector_reference(obs)
+    return out
+
+
+def encode_batch(observations, out=None):
+    """
+    Codifica una secuencia de observaciones en una matriz (N, 20) float32.
+    `out` puede ser una matriz preasignada con al menos N filas.
+    """
+    n = len(observations)
+    if out is None:
+        out = np.empty((n, OBS_SIZE), dtype=np.float32)
+    elif not out.flags.c_contiguous:
+        raise ValueError("encode_batch necesita una matriz C-contigua")
+    flat = memoryview(out.reshape(-1))
+    for i, obs in enumerate(observations):
+        try:
+            if _write(obs, flat, i * OBS_SIZE):
+                continue
+        except Exception:
+            pass
+        out[i] = obs_to_vector_reference(obs)
+    return out[:n]
+
+
+class ObsEncoder:
+    """Encoder con buffer propio reutilizable (la salida se sobrescribe en cada llamada)"""
+
+    def __init__(self):
+        self.buf = np.zeros(OBS_SIZE, dtype=np.float32)
+        self._view = memoryview(self.buf)
+
+    def __call__(self, obs):
+        try:
+            if _write(obs, self._view, 0):
+                return self.buf
+        except Exception:
+            pass
+        self.buf[:] = obs_to_vector_reference(obs)
+        return self.buf
+
+
+def test_obs_encoder(n_hands=2000, bench=50000):
+    """Comparación bit a bit con la referencia en partidas reales y casos límite + benchmark"""
+    from holdem_env import HoldemEnv
+    from kuhn_env import KuhnEnv
+
+    rng = np.random.default_rng(0)
+    observations = []
+    for n_players in (2, 3, 4, 6):
+        env = HoldemEnv(n_players, seed=n_players)
+        for _ in range(n_hands // 4):
+            obs, _ = env.reset()
+            done = False
+            while not done:
+                observations.append(obs)
+                obs, _, done, _ = env.step(env.current_player, int(rng.choice(3, p=[0.05, 0.6, 0.35])))
+    kuhn = KuhnEnv(seed=0)
+    observations.append(kuhn.reset()[0])
+    observations += [
+        None, {}, (3, [1, 0]), [1, 2, 3],
+        {'hole': [(14, 'Copas')], 'board': [], 'pot': 4},
+        {'hole': ((10, 'Picas'), 'x'), 'board': ((2, 'Trebol'),) * 7, 'pot': 1e9, 'own_bet': -3},
+        {'hole': ((5, 'Copas'), (6, 'Copas')), 'pot': float('nan')},
+        {'hole': ((5, 'Copas'), (6, 'Copas')), 'opp_bets': (1, float('inf'))},
+        {'hole': ((5, 'Copas'), (6, 'Copas')), 'opp_bets': (1, 2, 3, 4, 5), 'stage': 'showdown'},
+    ]
+
+    expected = np.stack([obs_to_vector_reference(o) for o in observations])
+    encoder = ObsEncoder()
+    for i, obs in enumerate(observations):
+        assert encode_obs(obs).tobytes() == expected[i].tobytes(), obs
+        assert encoder(obs).tobytes() == expected[i].tobytes(), obs
+    batch = np.full((len(observations) + 3, OBS_SIZE), -1.0, dtype=np.float32)
+    assert encode_batch(observations, batch).tobytes() == expected.tobytes()
+    assert encode_batch(observations).tobytes() == expected.tobytes()
+    print(f"✅ Encoder idéntico bit a bit en {len(observations)} observaciones")
+
+    sample = [o for o in observations if isinstance(o, dict)][:1000]
+    reps = bench // len(sample)
+    timings = {}
+    for name, fn in (("referencia", obs_to_vector_reference), ("encode_obs", encode_obs),
+                     ("ObsEncoder", encoder)):
+        start = time.perf_counter()
+        for _ in range(reps):
+            for obs in sample:
+                fn(obs)
+        timings[name] = (time.perf_counter() - start) / (reps * len(sample)) * 1e6
+    states = np.empty((len(sample), OBS_SIZE), dtype=np.float32)
+    start = time.perf_counter()
+    for _ in range(reps):
+        encode_batch(sample, states)
+    timings["encode_batch"] = (time.perf_counter() - start) / (reps * len(sample)) * 1e6
+    for name, us in timings.items():
+        print(f"   {name:12}: {us:6.2f} µs/obs ({timings['referencia'] / us:.1f}x)")
+
+
+if __name__ == "__main__":
+    test_obs_encoder()
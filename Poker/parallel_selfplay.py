@@ -0,0 +1,204 @@
+# parallel_selfplay.py
+"""
+Entrenamiento actor/learner para el agente DQN de Hold'em.
+
+- K procesos actores juegan manos de HoldemEnv en self-play con una copia
+  local de PokerDQN; los pesos se publican en una red en memoria compartida
+  (torch.multiprocessing) y cada actor se resincroniza cuando cambia la versión.
+- Las transiciones van a SharedReplay, un buffer circular de tensores en
+  memoria compartida que todos los procesos ven.
+- El proceso principal es el learner: sólo ejecuta _train_step del
+  NeuralPokerAgent muestreando de ese buffer.
+
+Uso:
+    python train_neural_poker.py holdem --actors 8
+"""
+import random
+import time
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from holdem_env import HoldemEnv
+from neural_agent import PokerDQN
+from obs_encoder import encode_obs
+
+
+class SharedReplay:
+    """
+    Buffer circular de experiencias en memoria compartida. Misma interfaz de
+    muestreo que ExperienceReplay, más push_batch para los actores.
+    """
+
+    def __init__(self, capacity, state_size=20, ctx=None):
+        ctx = ctx or mp.get_context("spawn")
+        self.capacity = capacity
+        self.states = torch.zeros((capacity, state_size), dtype=torch.float32).share_memory_()
+        self.next_states = torch.zeros((capacity, state_size), dtype=torch.float32).share_memory_()
+        self.actions = torch.zeros(capacity, dtype=torch.long).share_memory_()
+        self.rewards = torch.zeros(capacity, dtype=torch.float32).share_memory_()
+        self.dones = torch.zeros(capacity, dtype=torch.bool).share_memory_()
+        self.pos = ctx.Value("l", 0, lock=False)
+        self.size = ctx.Value("l", 0, lock=False)
+        self.lock = ctx.Lock()
+
+    def push_batch(self, states, actions, rewards, next_states, dones):
+        """Agregar k experiencias de una vez (arrays NumPy)"""
+        k = len(actions)
+        if k == 0:
+            return
+        with self.lock:
+            idx = torch.from_numpy((self.pos.value + np.arange(k)) % self.capacity)
+            self.states[idx] = torch.from_numpy(np.asarray(states, dtype=np.float32))
+            self.actions[idx] = torch.from_numpy(np.asarray(actions, dtype=np.int64))
+            self.rewards[idx] = torch.from_numpy(np.asarray(rewards, dtype=np.float32))
+            self.next_states[idx] = torch.from_numpy(np.asarray(next_states, dtype=np.float32))
+            self.dones[idx] = torch.from_numpy(np.asarray(dones, dtype=bool))
+            self.pos.value = (self.pos.value + k) % self.capacity
+            self.size.value = min(self.size.value + k, self.capacity)
+
+    def push(self, state, action, reward, next_state, done):
+        self.push_batch([state], [action], [reward], [next_state], [done])
+
+    def sample(self, batch_size):
+        """Muestrear batch aleatorio de experiencias"""
+        with self.lock:
+            idx = torch.randint(0, self.size.value, (min(batch_size, self.size.value),))
+            return (self.states[idx], self.actions[idx], self.rewards[idx],
+                    self.next_states[idx], self.dones[idx])
+
+    def __len__(self):
+        return self.size.value
+
+
+def actor_epsilon(actor_id, n_actors, base=0.4, alpha=7.0):
+    """Exploración fija por actor (estilo Ape-X): de `base` a base**(1+alpha)"""
+    if n_actors == 1:
+        return base
+    return base ** (1 + alpha * actor_id / (n_actors - 1))
+
+
+def _actor_loop(actor_id, n_actors, shared_net, version, weights_lock, replay, stop,
+                counts, n_players, hidden_sizes, push_every, seed):
+    """Proceso actor: self-play en HoldemEnv con todos los asientos controlados por la red"""
+    torch.set_num_threads(1)
+    random.seed(seed + actor_id)
+    np.random.seed(seed + actor_id)
+
+    net = PokerDQN(20, hidden_sizes, 3)
+    net.eval()
+    local_version = -1
+    epsilon = actor_epsilon(actor_id, n_actors)
+    env = HoldemEnv(n_players=n_players, seed=seed + actor_id)
+    zeros = np.zeros(20, dtype=np.float32)
+    buffer = []
+
+    while not stop.is_set():
+        if version.value != local_version:
+            with weights_lock:
+                net.load_state_dict(shared_net.state_dict())
+                local_version = version.value
+
+        obs, _ = env.reset()
+        pending = {}  # asiento -> (estado, acción) pendiente de cerrar
+        done = False
+        while not done:
+            player = env.current_player
+            state = encode_obs(obs)
+            if random.random() < epsilon:
+                action = random.choice([0, 1, 2])
+            else:
+                with torch.no_grad():
+                    action = net(torch.from_numpy(state)).argmax().item()
+            if player in pending:
+                prev_state, prev_action = pending[player]
+                buffer.append((prev_state, prev_action, 0.0, state, False))
+            pending[player] = (state, action)
+            obs, rewards, done, info = env.step(player, action)
+
+        for player, (prev_state, prev_action) in pending.items():
+            buffer.append((prev_state, prev_action, float(rewards[player]), zeros, True))
+
+        if len(buffer) >= push_every:
+            replay.push_batch(*[np.array(col) for col in zip(*buffer)])
+            counts[actor_id] += len(buffer)
+            buffer = []
+
+
+def train_parallel(agent, n_actors=4, n_steps=10000, n_players=4, hidden_sizes=(512, 256, 128, 64),
+                   replay_size=200000, sync_every=100, push_every=64, print_freq=500, seed=0):
+    """
+    Learner: entrena `agent` con las transiciones de `n_actors` procesos actores.
+
+    Returns:
+        transiciones/segundo de cada actor
+    """
+    ctx = mp.get_context("spawn")
+    hidden_sizes = list(hidden_sizes)
+
+    # Pesos publicados para los actores (memoria compartida)
+    shared_net = PokerDQN(20, hidden_sizes, 3)
+    shared_net.load_state_dict(agent.q_network.state_dict())
+    shared_net.share_memory()
+    version = ctx.Value("l", 0)
+    weights_lock = ctx.Lock()
+    stop = ctx.Event()
+    counts = ctx.Array("l", n_actors)
+
+    replay = SharedReplay(replay_size, 20, ctx)
+    agent.memory = replay
+
+    actors = [ctx.Process(target=_actor_loop,
+                          args=(i, n_actors, shared_net, version, weights_lock, replay, stop,
+                                counts, n_players, hidden_sizes, push_every, seed),
+                          daemon=True)
+              for i in range(n_actors)]
+    for p in actors:
+        p.start()
+    print(f"🚀 {n_actors} actores lanzados (epsilon {actor_epsilon(0, n_actors):.3f}"
+          f"..{actor_epsilon(n_actors - 1, n_actors):.4f})")
+
+    start = time.time()
+    try:
+        # Esperar a tener experiencias suficientes antes de entrenar
+        # (si un actor muere, no llegarán: fallar en vez de esperar para siempre)
+        while len(replay) < agent.batch_size * 10:
+            dead = [(i, p.exitcode) for i, p in enumerate(actors) if not p.is_alive()]
+            if dead:
+                raise RuntimeError("Actores terminados durante el calentamiento (actor, exitcode): "
+                                   + ", ".join(map(str, dead)))
+            time.sleep(0.05)
+        learn_start = time.time()
+
+        for step in range(1, n_steps + 1):
+            agent._train_step()
+            agent.steps += 1
+            if agent.steps % agent.target_update_freq == 0:
+                agent.target_network.load_state_dict(agent.q_network.state_dict())
+            if step % sync_every == 0:
+                with weights_lock:
+                    shared_net.load_state_dict(agent.q_network.state_dict())
+                    version.value += 1
+
+            if step % print_freq == 0:
+                elapsed = time.time() - start
+                rates = " ".join(f"{c / elapsed:.0f}" for c in counts[:])
+                avg_loss = np.mean(agent.losses[-print_freq:]) if agent.losses else 0
+                print(f"📈 Paso {step:6d} | Pérdida: {avg_loss:.4f} | Replay: {len(replay)} | "
+                      f"Learner: {step / (time.time() - learn_start):.0f} pasos/s | "
+                      f"Transiciones/s por actor: {rates}")
+    finally:
+        stop.set()
+        for p in actors:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+
+    elapsed = time.time() - start
+    rates = [c / elapsed for c in counts[:]]
+    print(f"✅ Entrenamiento paralelo completado en {elapsed:.1f}s")
+    for i, rate in enumerate(rates):
+        print(f"   🤖 Actor {i}: {rate:.0f} transiciones/s (epsilon {actor_epsilon(i, n_actors):.3f})")
+    print(f"   ⚡ Total: {sum(rates):.0f} transiciones/s")
+    return rates
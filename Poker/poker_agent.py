@@ -1,6 +1,18 @@
 import random
+import time
 import numpy as np
 
+from hand_evaluator import SUITS
+from preflop_equity import hand_class
+
+# Clave entera de infoset: clase de mano x textura del board x fase x nivel de apuesta
+N_HOLE_CLASSES = 170  # 169 clases preflop + 1 para "sin cartas"
+N_TEXTURES = 18
+N_STAGES = 4
+N_BET_LEVELS = 4
+N_INFOSETS = N_HOLE_CLASSES * N_TEXTURES * N_STAGES * N_BET_LEVELS
+STAGE_INDEX = {'preflop': 0, 'flop': 1, 'turn': 2, 'river': 3}
+
 def obs_to_vector(obs):
     """
     Convierte observación del entorno a vector numérico para procesamiento por IA
@@ -105,11 +117,82 @@ def obs_to_vector(obs):
         return np.zeros(10)
 
 
+def _card_bits(card):
+    """(bit del rango, contador del palo) de una carta (rank, palo)"""
+    rank, suit = card
+    return 1 << rank, 1 << (3 * (SUITS.index(suit) if suit in SUITS else 0))
+
+
+_CARD_BITS = {(r, s): _card_bits((r, s)) for r in range(2, 15) for s in SUITS}
+_CARDS = list(_CARD_BITS)
+_HOLE_CLASS = {(a, b): hand_class([a, b]) for a in _CARDS for b in _CARDS if a != b}
+
+
+def _connected_table():
+    """Máscara de rangos -> hay 3 rangos distintos en una ventana de 5 (el As cuenta también como 1)"""
+    masks = np.arange(1 << 15)
+    masks = masks | ((masks >> 14) & 1) << 1
+    popcount = np.array([bin(w).count('1') for w in range(32)])
+    windows = np.stack([popcount[(masks >> low) & 31] for low in range(1, 11)])
+    return (windows >= 3).any(axis=0).astype(np.uint8).tobytes()
+
+
+_CONNECTED = _connected_table()
+
+
+def _hole_class(hole):
+    """Clase preflop 0..168 de las cartas propias, N_HOLE_CLASSES-1 si no hay"""
+    try:
+        return _HOLE_CLASS[hole]
+    except (KeyError, TypeError):
+        try:
+            return hand_class(hole) if hole and len(hole) >= 2 else N_HOLE_CLASSES - 1
+        except Exception:
+            return N_HOLE_CLASSES - 1
+
+
+def board_texture(board):
+    """
+    Bucket 0..17 de textura del board: palos (sin proyecto, 3 de un palo, 4 o más),
+    emparejado (no, pareja, más) y conectado (3 rangos en una ventana de 5)
+    """
+    if not board:
+        return 0
+    mask = suit_key = 0
+    for card in board:
+        rank_bit, suit_bit = _CARD_BITS.get(card) or _card_bits(card)
+        mask |= rank_bit
+        suit_key += suit_bit
+    max_suit = max(suit_key & 7, (suit_key >> 3) & 7, (suit_key >> 6) & 7, suit_key >> 9)
+    flush = 0 if max_suit < 3 else (1 if max_suit == 3 else 2)
+    paired = min(len(board) - bin(mask).count('1'), 2)
+    return (flush * 3 + paired) * 2 + _CONNECTED[mask]
+
+
+def infoset_key(obs):
+    """
+    Clave entera 0..N_INFOSETS-1 de una observación de HoldemEnv:
+    clase de la mano (169), textura del board, fase y fichas por igualar (0..3+)
+    """
+    if not isinstance(obs, dict):
+        obs = vars(obs) if hasattr(obs, '__dict__') else {}
+    
+    hole_cls = _hole_class(obs.get('hole'))
+    texture = board_texture(obs.get('board') or ())
+    stage = STAGE_INDEX.get(obs.get('stage'), 0)
+    opp_bets = obs.get('opp_bets') or (0,)
+    to_call = max(max(opp_bets) - obs.get('own_bet', 0), 0)
+    bet_level = min(int(to_call), N_BET_LEVELS - 1)
+    
+    return ((hole_cls * N_TEXTURES + texture) * N_STAGES + stage) * N_BET_LEVELS + bet_level
+
+
 class PolicyAgent:
     """Agente que aprende una política basada en experiencia"""
     
     def __init__(self):
-        self.policy = {}
+        # Acción por infoset (ver infoset_key); -1 = infoset sin visitar
+        self.policy = np.full(N_INFOSETS, -1, dtype=np.int8)
         self.learning_rate = 0.1
         self.exploration_rate = 0.15
         self.experience = []
@@ -118,23 +201,20 @@ class PolicyAgent:
         """Selecciona acción basada en política aprendida"""
         try:
             # Convertir estado a clave
-            if hasattr(state, '__dict__'):
-                key = str(sorted(state.__dict__.items()))
-            else:
-                key = str(state)
+            key = infoset_key(state)
             
             # Exploración vs explotación
             if random.random() < self.exploration_rate:
                 return random.choice([0, 1, 2])
             
             # Usar política aprendida
-            if key not in self.policy:
+            if self.policy[key] < 0:
                 # Política inicial inteligente
                 # 0=fold, 1=call, 2=bet
                 # Favorece call sobre bet, bet sobre fold
                 self.policy[key] = random.choices([0, 1, 2], weights=[0.2, 0.5, 0.3])[0]
             
-            return self.policy[key]
+            return int(self.policy[key])
             
         except Exception as e:
             print(f"⚠️ Error en PolicyAgent.action: {e}")
@@ -143,10 +223,7 @@ class PolicyAgent:
     def update(self, state, action, reward=0, next_state=None):
         """Actualiza política basada en experiencia"""
         try:
-            if hasattr(state, '__dict__'):
-                key = str(sorted(state.__dict__.items()))
-            else:
-                key = str(state)
+            key = infoset_key(state)
             
             # Almacenar experiencia
             self.experience.append((key, action, reward))
@@ -178,12 +255,36 @@ class PolicyAgent:
         wins = sum(1 for _, _, reward in self.experience if reward > 0)
         return wins / len(self.experience)
 
+    def save(self, filepath="policy_agent.bin"):
+        """Guarda la tabla de política como binario int8 de N_INFOSETS bytes"""
+        try:
+            self.policy.tofile(filepath)
+            print(f"✅ Política guardada en: {filepath}")
+            return True
+        except Exception as e:
+            print(f"⚠️ Error guardando política: {e}")
+            return False
+
+    def load(self, filepath="policy_agent.bin"):
+        """Carga una tabla guardada con save()"""
+        try:
+            table = np.fromfile(filepath, dtype=np.int8)
+            if table.size != N_INFOSETS:
+                raise ValueError(f"tamaño {table.size}, se esperaban {N_INFOSETS} infosets")
+            self.policy = table
+            print(f"✅ Política cargada desde: {filepath} ({int((table >= 0).sum())} infosets visitados)")
+            return True
+        except Exception as e:
+            print(f"⚠️ Error cargando política: {e}")
+            return False
+
 
 class HeuristicAgent:
     """Agente que usa heurísticas de poker básicas"""
     
-    def __init__(self, aggression=0.3):
+    def __init__(self, aggression=0.3, use_equity=False):
         self.aggression = aggression  # Factor de agresividad (0-1)
+        self.use_equity = use_equity  # Ajustar decisiones preflop con la tabla de equidad
         self.hands_played = 0
         self.wins = 0
         
@@ -205,8 +306,21 @@ class HeuristicAgent:
                     current_aggression -= 0.1
                 current_aggression = max(0.1, min(0.8, current_aggression))
             
+            # Fuerza relativa de la mano preflop (1.0 = equidad justa contra n oponentes)
+            fold_rate = 0.15
+            if self.use_equity and isinstance(state, dict) and state.get('hole') and state.get('stage') == 'preflop':
+                from preflop_equity import preflop_equity
+                n_opp = len(state.get('opp_bets', ())) or 1
+                strength = preflop_equity(state['hole'], n_opp) * (n_opp + 1)
+                if strength < 0.8:
+                    fold_rate = 0.4
+                    current_aggression = max(0.1, current_aggression - 0.2)
+                elif strength > 1.3:
+                    fold_rate = 0.02
+                    current_aggression = min(0.8, current_aggression + 0.3)
+            
             # Decisiones ponderadas
-            if rand < 0.15:  # 15% fold
+            if rand < fold_rate:  # 15% fold por defecto
                 return 0
             elif rand < 0.85 - current_aggression:  # Variable call
                 return 1
@@ -340,6 +454,41 @@ def test_agents():
     vector = obs_to_vector(test_obs)
     print(f"Vector resultado: {vector[:10]}... (tamaño: {len(vector)})")
     
+    # Test infoset_key: claves acotadas, tabla de tamaño fijo y guardado binario
+    print("\n🔑 Test infoset_key:")
+    from holdem_env import HoldemEnv
+    import os
+    import tempfile
+    env = HoldemEnv(n_players=4, seed=0)
+    agent = PolicyAgent()
+    observations = []
+    for _ in range(500):
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            observations.append(obs)
+            assert 0 <= infoset_key(obs) < N_INFOSETS
+            player = env.current_player
+            action = agent.action(obs)
+            obs, rewards, done, _ = env.step(player, action)
+            agent.update(observations[-1], action, rewards[player])
+    start = time.perf_counter()
+    for obs in observations:
+        infoset_key(obs)
+    key_us = (time.perf_counter() - start) / len(observations) * 1e6
+    start = time.perf_counter()
+    for obs in observations:
+        str(obs)
+    str_us = (time.perf_counter() - start) / len(observations) * 1e6
+    print(f"   {len(observations)} observaciones -> {len(set(map(infoset_key, observations)))} infosets "
+          f"(str: {len(set(map(str, observations)))} claves)")
+    print(f"   Clave: {key_us:.1f} µs (str: {str_us:.1f} µs) | Tabla: {agent.policy.nbytes // 1024} KB")
+    
+    path = os.path.join(tempfile.mkdtemp(), "policy_agent.bin")
+    agent.save(path)
+    loaded = PolicyAgent()
+    assert loaded.load(path) and np.array_equal(loaded.policy, agent.policy)
+    
     print("✅ Tests completados")
 
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# preflop_equity.py
+"""
+Tabla precalculada de equidad preflop.
+
+Sólo hay 169 manos iniciales estratégicamente distintas (13 parejas, 78
+suited y 78 offsuit) y de 1 a 8 oponentes, así que cualquier decisión
+preflop puede resolverse con una consulta O(1) en lugar de simular.
+
+La tabla se construye una vez (python preflop_equity.py [muestras] [procesos])
+con el motor de equidad vectorizado y un pool de procesos, y se guarda como
+binario float32 de forma (169, 8) que se abre con np.memmap.
+"""
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Sequence
+
+import numpy as np
+
+from hand_evaluator import card_to_int
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.bin")
+N_CLASSES = 169
+MAX_OPPONENTS = 8
+RANK_CHARS = "23456789TJQKA"
+
+_table = None
+
+
+def hand_class(hole: Sequence) -> int:
+    """
+    Índice 0..168 de la mano inicial en una rejilla 13x13:
+    pareja en la diagonal, suited con fila=rank alto, offsuit con fila=rank bajo.
+    """
+    a, b = [c if isinstance(c, (int, np.integer)) else card_to_int(c) for c in hole[:2]]
+    ra, rb = a >> 2, b >> 2
+    hi, lo = max(ra, rb), min(ra, rb)
+    if (a & 3) == (b & 3):
+        return hi * 13 + lo
+    return lo * 13 + hi
+
+
+def class_name(idx: int) -> str:
+    """Nombre estándar de la clase, p.ej. 'AKs', 'T9o', '77'"""
+    row, col = divmod(idx, 13)
+    if row == col:
+        return RANK_CHARS[row] * 2
+    if row > col:
+        return RANK_CHARS[row] + RANK_CHARS[col] + "s"
+    return RANK_CHARS[col] + RANK_CHARS[row] + "o"
+
+
+def _representative(idx: int):
+    """Dos cartas concretas (índices 0..51) que pertenecen a la clase"""
+    row, col = divmod(idx, 13)
+    if row > col:  # suited
+        return [row * 4, col * 4]
+    return [row * 4, col * 4 + 1]
+
+
+def _compute_entry(args):
+    idx, n_opponents, samples = args
+    from equity import monte_carlo_equity
+    result = monte_carlo_equity(_representative(idx), [], n_opponents,
+                                time_budget=float("inf"), ci_target=0.0,
+                                batch_size=5000, max_samples=samples,
+                                rng=np.random.default_rng(idx * MAX_OPPONENTS + n_opponents))
+    return idx, n_opponents, result["equity"]
+
+
+def build_table(samples: int = 200000, processes: int = None, path: str = TABLE_PATH):
+    """Calcula la tabla completa (169 x 8) y la escribe en `path`"""
+    tasks = [(idx, n, samples) for idx in range(N_CLASSES) for n in range(1, MAX_OPPONENTS + 1)]
+    table = np.zeros((N_CLASSES, MAX_OPPONENTS), dtype=np.float32)
+
+    print(f"🧮 Calculando {len(tasks)} entradas con {samples} muestras cada una...")
+    start = time.time()
+    with Pool(processes) as pool:
+        for done, (idx, n, eq) in enumerate(pool.imap_unordered(_compute_entry, tasks, chunksize=8), 1):
+            table[idx, n - 1] = eq
+            if done % 169 == 0:
+                print(f"   {done}/{len(tasks)} ({time.time() - start:.0f}s)")
+
+    mm = np.memmap(path, dtype=np.float32, mode="w+", shape=table.shape)
+    mm[:] = table
+    mm.flush()
+    del mm
+    print(f"✅ Tabla guardada en {path} ({os.path.getsize(path)} bytes, {time.time() - start:.0f}s)")
+    return table
+
+
+def load_table(path: str = TABLE_PATH) -> np.ndarray:
+    """Abre la tabla en modo sólo lectura con np.memmap (se carga una vez)"""
+    global _table
+    if _table is None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Tabla preflop no encontrada en {path}. Ejecuta: python preflop_equity.py")
+        _table = np.memmap(path, dtype=np.float32, mode="r", shape=(N_CLASSES, MAX_OPPONENTS))
+    return _table
+
+
+def preflop_equity(hole: Sequence, n_opponents: int = 1) -> float:
+    """Equidad preflop de `hole` contra `n_opponents` manos aleatorias (1..8), en O(1)"""
+    n = min(max(int(n_opponents), 1), MAX_OPPONENTS)
+    return float(load_table()[hand_class(hole), n - 1])
+
+
+if __name__ == "__main__":
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    n_procs = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    tabla = build_table(n_samples, n_procs)
+    for name_idx in (hand_class([(14, "Corazones"), (14, "Copas")]),
+                     hand_class([(14, "Corazones"), (13, "Corazones")]),
+                     hand_class([(7, "Corazones"), (2, "Copas")])):
+        print(f"   {class_name(name_idx):4} vs 1: {tabla[name_idx, 0]:.3f} | vs 8: {tabla[name_idx, 7]:.3f}")
@@ -12,14 +12,17 @@ import numpy as np
 
 # Importar módulos del proyecto
 from holdem_env import HoldemEnv
+from holdem_vec_env import HoldemVecEnv
 from kuhn_env import KuhnEnv
+from kuhn_cfr import agent_policy_table, exploitability
 from neural_agent import NeuralPokerAgent, PokerNeuralTrainer
 from poker_agent import HeuristicAgent, RandomAgent, ConservativeAgent, AggressiveAgent
 
 
-def entrenar_neural_holdem(n_episodios=2000, n_jugadores=4, guardar_cada=200):
+def entrenar_neural_holdem(n_episodios=2000, n_jugadores=4, guardar_cada=200, oponente_equity=False):
     """
     Entrenamiento del agente neural en Texas Hold'em
+    (oponente_equity: el bot heurístico usa la tabla de equidad preflop)
     """
     print("🎰" + "="*60 + "🎰")
     print("    ENTRENAMIENTO NEURAL - TEXAS HOLD'EM")
@@ -43,7 +46,7 @@ def entrenar_neural_holdem(n_episodios=2000, n_jugadores=4, guardar_cada=200):
     
     # Crear oponentes variados
     oponentes = [
-        HeuristicAgent(aggression=0.3),
+        HeuristicAgent(aggression=0.3, use_equity=oponente_equity),
         RandomAgent(weights=[0.2, 0.5, 0.3]),
         ConservativeAgent()
     ]
@@ -80,7 +83,7 @@ def entrenar_neural_holdem(n_episodios=2000, n_jugadores=4, guardar_cada=200):
             agent.save_model(f"poker_holdem_dqn_ep{episodio}.pth")
     
     # Guardar modelo final
-    agent.save_model("poker_holdem_dqn_final.pth")
+    agent.save_model("poker_holdem_dqn_final.pth", frozen=True)
     
     # Estadísticas finales
     tiempo_total = time.time() - start_time
@@ -91,6 +94,82 @@ def entrenar_neural_holdem(n_episodios=2000, n_jugadores=4, guardar_cada=200):
     return agent, historia_recompensas
 
 
+def entrenar_neural_holdem_vectorizado(n_pasos=2000, n_mesas=256, n_jugadores=4):
+    """
+    Entrenamiento por self-play en muchas mesas a la vez (HoldemVecEnv):
+    una sola pasada de la red por paso para todas las mesas
+    """
+    print("🎰" + "="*60 + "🎰")
+    print("    ENTRENAMIENTO NEURAL VECTORIZADO - TEXAS HOLD'EM")
+    print("🎰" + "="*60 + "🎰")
+    
+    env = HoldemVecEnv(n_envs=n_mesas, n_players=n_jugadores)
+    print(f"🎮 Entorno vectorizado: {n_mesas} mesas de {n_jugadores} jugadores")
+    
+    agent = NeuralPokerAgent(
+        input_size=20,
+        hidden_sizes=[512, 256, 128, 64],
+        learning_rate=0.0005,
+        epsilon=0.9,
+        epsilon_decay=0.999,
+        epsilon_min=0.05,
+        batch_size=256,
+        memory_size=200000
+    )
+    
+    if agent.load_model("poker_holdem_dqn.pth"):
+        print("📂 Modelo previo cargado, continuando entrenamiento...")
+    else:
+        print("🆕 Iniciando entrenamiento desde cero...")
+    
+    trainer = PokerNeuralTrainer(env, agent)
+    start_time = time.time()
+    historia_recompensas = trainer.train_vectorized(n_steps=n_pasos)
+    
+    agent.save_model("poker_holdem_dqn_final.pth", frozen=True)
+    
+    tiempo_total = time.time() - start_time
+    agent.print_stats()
+    print(f"\n⏱️ Tiempo total de entrenamiento: {tiempo_total:.1f} segundos")
+    print(f"⚡ Manos por segundo: {len(historia_recompensas)/tiempo_total:.0f}")
+    
+    return agent, historia_recompensas
+
+
+def entrenar_neural_holdem_paralelo(n_actores=4, n_pasos=20000, n_jugadores=4):
+    """
+    Entrenamiento actor/learner: n_actores procesos juegan HoldemEnv en
+    self-play y este proceso entrena la red con sus transiciones
+    """
+    from parallel_selfplay import train_parallel
+    
+    print("🎰" + "="*60 + "🎰")
+    print(f"    ENTRENAMIENTO NEURAL PARALELO - {n_actores} ACTORES")
+    print("🎰" + "="*60 + "🎰")
+    
+    agent = NeuralPokerAgent(
+        input_size=20,
+        hidden_sizes=[512, 256, 128, 64],
+        learning_rate=0.0005,
+        epsilon=0.0,  # la exploración la hace cada actor
+        batch_size=128,
+        memory_size=1  # se sustituye por el replay compartido
+    )
+    
+    if agent.load_model("poker_holdem_dqn.pth"):
+        print("📂 Modelo previo cargado, continuando entrenamiento...")
+    else:
+        print("🆕 Iniciando entrenamiento desde cero...")
+    
+    start_time = time.time()
+    train_parallel(agent, n_actors=n_actores, n_steps=n_pasos, n_players=n_jugadores,
+                   hidden_sizes=[512, 256, 128, 64])
+    
+    agent.save_model("poker_holdem_dqn_final.pth", frozen=True)
+    print(f"\n⏱️ Tiempo total de entrenamiento: {time.time() - start_time:.1f} segundos")
+    return agent
+
+
 def entrenar_neural_kuhn(n_episodios=5000):
     """
     Entrenamiento rápido en Kuhn Poker (más simple)
@@ -163,6 +242,10 @@ def entrenar_neural_kuhn(n_episodios=5000):
     tiempo_total = time.time() - start_time
     print(f"\n⏱️ Entrenamiento Kuhn completado en {tiempo_total:.1f}s")
     
+    # Calidad exacta frente al equilibrio (0 = estrategia de Nash)
+    expl = exploitability(agent_policy_table(agent))
+    print(f"🎯 Explotabilidad exacta: {expl:.4f} fichas/mano (aleatorio: 0.4583)")
+    
     return agent, historia_recompensas
 
 
@@ -313,14 +396,20 @@ def main():
             test_neural_agent()
         
         elif opcion == "4":
-            # Evaluar modelo existente
-            agente = NeuralPokerAgent()
-            if agente.load_model("poker_holdem_dqn_final.pth"):
-                evaluar_agente(agente, n_partidas=100, env_type="holdem")
-            elif agente.load_model("poker_kuhn_dqn.pth"):
-                evaluar_agente(agente, n_partidas=200, env_type="kuhn")
+            # Evaluar modelo existente (artefacto congelado si está exportado;
+            # el agente completo sólo se construye para cargar un .pth)
+            from numpy_policy import is_current
+            if is_current("poker_holdem_dqn_final.jit.pt", "poker_holdem_dqn_final.pth"):
+                from frozen_policy import FrozenPolicy
+                evaluar_agente(FrozenPolicy("poker_holdem_dqn_final.jit.pt"), n_partidas=100, env_type="holdem")
             else:
-                print("❌ No se encontró modelo entrenado")
+                agente = NeuralPokerAgent()
+                if agente.load_model("poker_holdem_dqn_final.pth"):
+                    evaluar_agente(agente, n_partidas=100, env_type="holdem")
+                elif agente.load_model("poker_kuhn_dqn.pth"):
+                    evaluar_agente(agente, n_partidas=200, env_type="kuhn")
+                else:
+                    print("❌ No se encontró modelo entrenado")
         
         else:
             print("❌ Opción inválida")
@@ -402,15 +491,34 @@ def entrenamiento_comparativo():
 
 
 if __name__ == "__main__":
+    # --actors K: entrenamiento actor/learner con K procesos (sólo holdem)
+    n_actores = 0
+    if "--actors" in sys.argv:
+        i = sys.argv.index("--actors")
+        n_actores = int(sys.argv[i + 1])
+        del sys.argv[i:i + 2]
+    # --equity: el oponente heurístico usa la tabla de equidad preflop (sólo holdem)
+    oponente_equity = "--equity" in sys.argv
+    if oponente_equity:
+        sys.argv.remove("--equity")
+    
+    if n_actores > 0 and sys.argv[1:2] != ["holdem"]:
+        print("❌ --actors sólo está disponible con el modo holdem")
+        sys.exit(1)
+    
     # Verificar si se ejecuta directamente
     if len(sys.argv) > 1:
-        if sys.argv[1] == "compare":
+        if sys.argv[1] == "holdem" and n_actores > 0:
+            entrenar_neural_holdem_paralelo(n_actores)
+        elif sys.argv[1] == "compare":
             entrenamiento_comparativo()
         elif sys.argv[1] == "kuhn":
             entrenar_neural_kuhn()
         elif sys.argv[1] == "holdem":
-            entrenar_neural_holdem()
+            entrenar_neural_holdem(oponente_equity=oponente_equity)
+        elif sys.argv[1] == "holdem-vec":
+            entrenar_neural_holdem_vectorizado()
         else:
-            print("Opciones: python train_neural_poker.py [compare|kuhn|holdem]")
+            print("Opciones: python train_neural_poker.py [compare|kuhn|holdem|holdem-vec] [--actors K] [--equity]")
     else:
         main()
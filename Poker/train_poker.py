@@ -1,6 +1,5 @@
 from holdem_env import HoldemEnv
 from poker_agent import PolicyAgent, HeuristicAgent, RandomAgent
-from neural_agent import NeuralPokerAgent
 import random
 
 def entrenar_auto_juego(n_manos=1000, usar_neural=False):
@@ -9,6 +8,7 @@ def entrenar_auto_juego(n_manos=1000, usar_neural=False):
     # Elegir tipo de agente
     if usar_neural:
         print("🧠 Usando NeuralPokerAgent (Red Neuronal Profunda)")
+        from neural_agent import NeuralPokerAgent  # torch sólo si se entrena la red
         agente_entrenable = NeuralPokerAgent(input_size=20, hidden_sizes=[256, 128, 64])
         # Intentar cargar modelo previo
         agente_entrenable.load_model("poker_holdem_dqn.pth")
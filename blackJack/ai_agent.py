@@ -1,9 +1,11 @@
 # ai_agent.py
+import hashlib
 import numpy as np
-from tensorflow.keras.models import load_model
 import os
 
 MODEL_PATH = "policy_blackjack.h5"
+# Las rutas relativas de modelos se resuelven respecto a esta carpeta, no al cwd
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def procesar_estado_para_red(state):
     # state: (player_sum, dealer_card, usable_ace)
@@ -13,11 +15,103 @@ def procesar_estado_para_red(state):
     usable = 1.0 if state[2] else 0.0
     return np.array([player_sum, dealer_card, usable], dtype=np.float32)
 
+def procesar_estados_para_red(states):
+    # Versión por lotes: states (N, 3) -> (N, 3) normalizado
+    states = np.asarray(states, dtype=np.float32).reshape(-1, 3)
+    return np.stack([
+        (states[:, 0] - 4.0) / (21.0 - 4.0),
+        (states[:, 1] - 1.0) / (10.0 - 1.0),
+        (states[:, 2] != 0).astype(np.float32),
+    ], axis=1)
+
+def pesos_dense(model):
+    """[(W, b, activación)] de las capas Dense del modelo, para evaluarlo con NumPy"""
+    capas = []
+    for layer in model.layers:
+        pesos = layer.get_weights()
+        if len(pesos) == 2:
+            activacion = layer.get_config().get("activation", "linear")
+            if activacion not in ("relu", "linear"):
+                raise ValueError(f"Activación no soportada en NumPy: {activacion}")
+            capas.append((pesos[0].astype(np.float32), pesos[1].astype(np.float32), activacion))
+    return capas
+
+def ruta_modelo(model_path):
+    """Ruta absoluta del modelo (las relativas, dentro de blackJack/)"""
+    return model_path if os.path.isabs(model_path) else os.path.join(MODEL_DIR, model_path)
+
+def ruta_pesos(model_path):
+    """Pesos NumPy exportados junto al modelo: policy_blackjack.h5 -> policy_blackjack.npz"""
+    return os.path.splitext(ruta_modelo(model_path))[0] + ".npz"
+
+def huella_modelo(model_path):
+    """sha256 del fichero del modelo: los pesos exportados sólo valen para ese contenido"""
+    with open(model_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def guardar_pesos(capas, path, huella):
+    np.savez(path, huella=np.array(huella),
+             **{f"{k}{i}": v for i, (W, b, act) in enumerate(capas)
+                for k, v in (("W", W), ("b", b), ("act", np.array(act)))})
+
+def cargar_pesos(path, huella=None):
+    """Capas guardadas por guardar_pesos; None si no corresponden al modelo con esa huella"""
+    with np.load(path) as data:
+        if huella is not None and ("huella" not in data.files or str(data["huella"]) != huella):
+            return None
+        n_capas = sum(name.startswith("W") for name in data.files)
+        return [(data[f"W{i}"], data[f"b{i}"], str(data[f"act{i}"])) for i in range(n_capas)]
+
+def softmax(logits):
+    exps = np.exp(logits - np.max(logits, axis=-1, keepdims=True))
+    return exps / np.sum(exps, axis=-1, keepdims=True)
+
 class AIAgent:
     def __init__(self, model_path=MODEL_PATH):
+        model_path = ruta_modelo(model_path)
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Modelo no encontrado en {model_path}. Entrena y guarda el modelo primero.")
-        self.model = load_model(model_path)
+        # La red es un MLP pequeño: se evalúa con NumPy, sin la sobrecarga de predict().
+        # Si sus pesos ya están exportados (y al día) no hace falta importar TensorFlow
+        self.model = None
+        pesos = ruta_pesos(model_path)
+        huella = huella_modelo(model_path)
+        self.capas = cargar_pesos(pesos, huella) if os.path.exists(pesos) else None
+        if self.capas is None:
+            from tensorflow.keras.models import load_model
+            self.model = load_model(model_path)
+            self.capas = pesos_dense(self.model)
+            try:
+                guardar_pesos(self.capas, pesos, huella)
+            except OSError as e:
+                print(f"⚠️ No se pudieron exportar los pesos NumPy: {e}")
+        # Tabla completa (suma 0..31, dealer 0..10, As usable) de probabilidades y acción greedy
+        sumas, dealers, ases = np.meshgrid(np.arange(32), np.arange(11), np.arange(2), indexing="ij")
+        estados = np.stack([sumas.ravel(), dealers.ravel(), ases.ravel()], axis=1)
+        self.probs = softmax(self.logits(estados).astype(np.float64)).reshape(32, 11, 2, -1)
+        self.policy = self.probs.argmax(axis=-1).astype(np.int8)
+
+    def logits(self, states):
+        """Logits (N, n_acciones) de la red para los estados (N, 3), evaluada con NumPy"""
+        x = procesar_estados_para_red(states)
+        for W, b, activacion in self.capas:
+            x = x @ W + b
+            if activacion == "relu":
+                np.maximum(x, 0.0, out=x)
+        return x
+
+    def _indices(self, states):
+        states = np.asarray(states, dtype=np.int64).reshape(-1, 3)
+        dealer = np.where(states[:, 1] == 11, 1, states[:, 1])  # As como 11 en GameUI
+        return np.minimum(states[:, 0], 31), dealer, (states[:, 2] != 0).astype(np.int64)
+
+    def actions(self, states, greedy=True):
+        """Acciones (N,) para una lista/array de estados (player_sum, dealer_card, usable_ace)"""
+        idx = self._indices(states)
+        if greedy:
+            return self.policy[idx].astype(np.int64)
+        probs = self.probs[idx]
+        return (np.random.random(len(probs)) > probs[:, 0]).astype(np.int64)
 
     def action(self, state, greedy=True):
         """
@@ -26,11 +120,41 @@ class AIAgent:
         greedy False -> samplea según las probabilidades.
         Retorna: 0 = stick (plantarse), 1 = hit (pedir carta)
         """
-        s = procesar_estado_para_red(state).reshape(1, -1)
-        logits = self.model.predict(s, verbose=0)[0]
-        exps = np.exp(logits - np.max(logits))
-        probs = exps / np.sum(exps)
+        player_sum, dealer_card, usable = state
+        idx = (min(player_sum, 31), 1 if dealer_card == 11 else dealer_card, int(bool(usable)))
         if greedy:
-            return int(np.argmax(probs))
+            return int(self.policy[idx])
         else:
-            return int(np.random.choice(len(probs), p=probs))
+            return int(np.random.choice(self.probs.shape[-1], p=self.probs[idx]))
+
+def test_ai_agent(model_path=MODEL_PATH, n=10000):
+    """La ruta NumPy y la tabla coinciden con model.predict; tiempos por decisión"""
+    import time
+
+    from tensorflow.keras.models import load_model
+
+    agent = AIAgent(model_path)
+    if agent.model is None:
+        agent.model = load_model(ruta_modelo(model_path))
+    estados = [(s, d, a) for s in range(4, 22) for d in range(1, 11) for a in (0, 1)]
+    esperado = agent.model.predict(procesar_estados_para_red(estados), verbose=0)
+    assert np.allclose(agent.logits(estados), esperado, atol=1e-4)
+    assert (agent.actions(estados) == esperado.argmax(axis=1)).all()
+    assert all(agent.action(e) == a for e, a in zip(estados, esperado.argmax(axis=1)))
+
+    start = time.perf_counter()
+    for _ in range(20):
+        agent.model.predict(procesar_estado_para_red(estados[0]).reshape(1, -1), verbose=0)
+    t_predict = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for i in range(n):
+        agent.action(estados[i % len(estados)])
+    t_tabla = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    agent.actions(np.array(estados * 100))
+    t_lote = (time.perf_counter() - start) / (len(estados) * 100)
+    print(f"✅ predict(): {t_predict * 1e3:.2f} ms | tabla: {t_tabla * 1e6:.2f} µs | "
+          f"lote: {t_lote * 1e9:.0f} ns por estado")
+
+if __name__ == "__main__":
+    test_ai_agent()
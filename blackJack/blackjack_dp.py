@@ -0,0 +1,521 @@
+# blackjack_dp.py
+"""
+Estrategia óptima de blackjack por programación dinámica.
+
+Reglas de blackjack_env / BlackjackGame: el dealer se planta con 17 (también
+blando), el As vale 1 u 11, pagos 1:1 y sólo pedir (1) o plantarse (0).
+
+El valor esperado de cada acción se calcula de forma exacta recorriendo
+todas las cartas que pueden salir del shoe, con memoización sobre
+(total del jugador, mano blanda, carta visible del dealer, composición del shoe).
+La composición es una tupla con el número de cartas de cada valor 1..10
+(el 10 incluye J, Q y K) y se actualiza con cada carta extraída.
+
+La tabla resultante tiene la forma (32, 11, 2, 2) = (suma del jugador,
+carta del dealer 1..10, As usable, acción) con el VE de plantarse y de pedir,
+y se guarda en estrategia_blackjack.npy para consultarla sin recalcular.
+
+Uso:
+    python blackjack_dp.py              # calcula y guarda la tabla (4 mazos)
+    python blackjack_dp.py retirada     # efectos de retirada (estrategia según el shoe)
+    python blackjack_dp.py test         # comprobaciones
+    agente = OptimalAgent()
+    accion = agente.action((16, 10, False))   # -> 1 (pedir)
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "estrategia_blackjack.npy")
+REMOVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "efectos_retirada.npy")
+N_DECKS = 4  # BlackjackGame.reset_game(multiplicador=4)
+TABLE_SHAPE = (32, 11, 2, 2)
+DEALER_OUTCOMES = 6  # 17, 18, 19, 20, 21, se pasa
+CARD_VALUE = {'A': 1, 'J': 10, 'Q': 10, 'K': 10, **{str(v): v for v in range(2, 11)}}
+
+
+def shoe_composition(n_decks=N_DECKS):
+    """Cartas de cada valor 1..10 en un shoe completo de `n_decks` mazos"""
+    return (4 * n_decks,) * 9 + (16 * n_decks,)
+
+
+def remove_cards(comp, values):
+    """Composición sin las cartas de valores `values` (1..10)"""
+    comp = list(comp)
+    for v in values:
+        comp[v - 1] -= 1
+    return tuple(comp)
+
+
+def add_card(total, soft, value):
+    """Suma una carta a una mano (total, blanda) contando el As como 11 si cabe"""
+    total += value
+    if value == 1 and total + 10 <= 21:
+        return total + 10, True
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+
+def hand_state(values):
+    """(total, blanda) de una mano dada por sus valores 1..10"""
+    total, soft = 0, False
+    for v in values:
+        total, soft = add_card(total, soft, v)
+    return total, soft
+
+
+class BlackjackDP:
+    """
+    Motor de valor esperado exacto con memoización por composición del shoe.
+    """
+
+    def __init__(self, n_decks=N_DECKS):
+        self.n_decks = n_decks
+        self.comp = shoe_composition(n_decks)
+        self._dealer_memo = {}
+        self._player_memo = {}
+
+    def clear(self):
+        self._dealer_memo.clear()
+        self._player_memo.clear()
+
+    def dealer_distribution(self, total, soft, comp, n=None):
+        """Probabilidades de que el dealer termine en 17..21 o se pase, desde (total, blanda)"""
+        key = (total, soft, comp)
+        result = self._dealer_memo.get(key)
+        if result is not None:
+            return result
+        if n is None:
+            n = sum(comp)
+        if total >= 17:
+            result = [0.0] * DEALER_OUTCOMES
+            result[total - 17 if total <= 21 else 5] = 1.0
+        else:
+            result = [0.0] * DEALER_OUTCOMES
+            for i in range(10):
+                count = comp[i]
+                if count:
+                    p = count / n
+                    new_total, new_soft = add_card(total, soft, i + 1)
+                    sub = self.dealer_distribution(new_total, new_soft,
+                                                   comp[:i] + (count - 1,) + comp[i + 1:], n - 1)
+                    for k in range(DEALER_OUTCOMES):
+                        result[k] += p * sub[k]
+        result = tuple(result)
+        self._dealer_memo[key] = result
+        return result
+
+    def ev_stand(self, total, upcard, comp, n=None):
+        """VE de plantarse con `total` frente a la carta visible `upcard` (1..10)"""
+        if total > 21:
+            return -1.0
+        up_total, up_soft = add_card(0, False, upcard)
+        dist = self.dealer_distribution(up_total, up_soft, comp, n)
+        ev = dist[5]
+        for k in range(5):
+            dealer = 17 + k
+            ev += dist[k] * ((total > dealer) - (total < dealer))
+        return ev
+
+    def evaluate(self, total, soft, upcard, comp, n=None):
+        """(VE óptimo, VE plantarse, VE pedir) con la composición `comp` del shoe"""
+        key = (total, soft, upcard, comp)
+        result = self._player_memo.get(key)
+        if result is not None:
+            return result
+        if n is None:
+            n = sum(comp)
+        stand = self.ev_stand(total, upcard, comp, n)
+        hit = 0.0
+        for i in range(10):
+            count = comp[i]
+            if count:
+                new_total, new_soft = add_card(total, soft, i + 1)
+                if new_total > 21:
+                    hit -= count / n
+                else:
+                    hit += count / n * self.evaluate(new_total, new_soft, upcard,
+                                                     comp[:i] + (count - 1,) + comp[i + 1:], n - 1)[0]
+        result = (max(stand, hit), stand, hit)
+        self._player_memo[key] = result
+        return result
+
+    def policy_ev(self, policy, total, soft, upcard, comp, n=None, memo=None):
+        """VE de seguir la tabla de acciones `policy` (32, 11, 2) desde (total, blanda)"""
+        memo = {} if memo is None else memo
+        key = (total, soft, comp)
+        if key in memo:
+            return memo[key]
+        if n is None:
+            n = sum(comp)
+        if total > 21:
+            return -1.0
+        if policy[total, upcard, int(soft)] == 0:
+            ev = self.ev_stand(total, upcard, comp, n)
+        else:
+            ev = 0.0
+            for i in range(10):
+                count = comp[i]
+                if count:
+                    new_total, new_soft = add_card(total, soft, i + 1)
+                    ev += count / n * self.policy_ev(policy, new_total, new_soft, upcard,
+                                                     comp[:i] + (count - 1,) + comp[i + 1:], n - 1, memo)
+        memo[key] = ev
+        return ev
+
+    def upcard_table(self, upcard, comp=None):
+        """
+        VE (32, 2, 2) de todas las manos frente a `upcard`, con el shoe `comp`
+        (por defecto, el shoe completo sin la carta del dealer)
+        """
+        comp = remove_cards(self.comp, [upcard]) if comp is None else comp
+        table = np.full((32, 2, 2), -1.0, dtype=np.float32)
+        for soft in (False, True):
+            for total in range(12 if soft else 4, 22):
+                _, stand, hit = self.evaluate(total, soft, upcard, comp)
+                table[total, int(soft)] = (stand, hit)
+        return table
+
+    def strategy_table(self, verbose=False):
+        """Tabla (32, 11, 2, 2) de VE (plantarse, pedir) por estado (suma, dealer, As usable)"""
+        table = np.zeros(TABLE_SHAPE, dtype=np.float32)
+        for upcard in range(1, 11):
+            start = time.perf_counter()
+            table[:, upcard] = self.upcard_table(upcard)
+            if verbose:
+                print(f"   Dealer {upcard:2}: {len(self._dealer_memo):8,} estados del dealer en "
+                      f"{time.perf_counter() - start:.1f}s")
+            self.clear()  # la memoria de cada carta del dealer no se reutiliza con las demás
+        return table
+
+    def removal_table(self, verbose=False):
+        """
+        Efecto de retirada (32, 11, 2, 2, 10): cambio del VE (plantarse, pedir) de
+        cada estado al quitar del shoe una carta de valor 1..10, además de la del dealer
+        """
+        table = np.zeros(TABLE_SHAPE + (10,), dtype=np.float32)
+        for upcard in range(1, 11):
+            start = time.perf_counter()
+            comp = remove_cards(self.comp, [upcard])
+            base = self.upcard_table(upcard, comp)
+            self.clear()
+            for value in range(1, 11):
+                table[:, upcard, :, :, value - 1] = self.upcard_table(upcard, remove_cards(comp, [value])) - base
+                self.clear()
+            if verbose:
+                print(f"   Dealer {upcard:2}: efectos de retirada en {time.perf_counter() - start:.1f}s")
+        return table
+
+    def initial_states(self):
+        """Probabilidad de cada reparto inicial (suma, dealer, As usable) desde el shoe completo"""
+        comp, n = self.comp, sum(self.comp)
+        probs = np.zeros((32, 11, 2))
+        for a in range(1, 11):
+            pa = comp[a - 1] / n
+            c1 = remove_cards(comp, [a])
+            for b in range(1, 11):
+                pb = c1[b - 1] / (n - 1)
+                c2 = remove_cards(c1, [b])
+                total, soft = hand_state([a, b])
+                for up in range(1, 11):
+                    probs[total, up, int(soft)] += pa * pb * c2[up - 1] / (n - 2)
+        return probs
+
+    def score_policy(self, policy, table=None):
+        """
+        Compara una política (32, 11, 2) con la óptima.
+
+        Returns:
+            dict con 'ev' de la política y 'optimal' (por mano, desde el reparto
+            inicial), 'loss' = optimal - ev y 'agreement' = fracción de
+            probabilidad inicial en la que eligen la misma acción
+        """
+        policy = np.asarray(policy)
+        table = load_table(self.n_decks) if table is None else table
+        probs = self.initial_states()
+        optimal = float((probs * table.max(axis=3)).sum())
+        ev = 0.0
+        for upcard in range(1, 11):
+            comp = remove_cards(self.comp, [upcard])
+            memo = {}
+            for total, soft in zip(*np.nonzero(probs[:, upcard])):
+                ev += probs[total, upcard, soft] * self.policy_ev(policy, int(total), bool(soft), upcard, comp,
+                                                                  memo=memo)
+            self.clear()
+        agreement = float((probs * (policy == table.argmax(axis=3))).sum())
+        return {"ev": ev, "optimal": optimal, "loss": optimal - ev, "agreement": agreement}
+
+
+def build_table(n_decks=N_DECKS, path=TABLE_PATH, verbose=True):
+    """Calcula la tabla de estrategia óptima y la guarda en `path`"""
+    start = time.perf_counter()
+    table = BlackjackDP(n_decks).strategy_table(verbose)
+    np.save(path, table)
+    if verbose:
+        print(f"✅ Tabla óptima ({n_decks} mazos) guardada en {path} ({time.perf_counter() - start:.1f}s)")
+    return table
+
+
+def build_removal_table(n_decks=N_DECKS, path=REMOVAL_PATH, verbose=True):
+    """Calcula los efectos de retirada (10 tablas más que build_table) y los guarda en `path`"""
+    start = time.perf_counter()
+    table = BlackjackDP(n_decks).removal_table(verbose)
+    np.save(path, table)
+    if verbose:
+        print(f"✅ Efectos de retirada ({n_decks} mazos) guardados en {path} ({time.perf_counter() - start:.1f}s)")
+    return table
+
+
+_tables = {}
+_removal_tables = {}
+
+
+def load_table(n_decks=N_DECKS, path=TABLE_PATH):
+    """Tabla (32, 11, 2, 2) de VE; la de N_DECKS se lee de disco (o se calcula y guarda una vez)"""
+    if n_decks not in _tables:
+        if n_decks != N_DECKS:
+            _tables[n_decks] = BlackjackDP(n_decks).strategy_table()
+        elif os.path.exists(path):
+            _tables[n_decks] = np.load(path)
+        else:
+            _tables[n_decks] = build_table(n_decks, path)
+    return _tables[n_decks]
+
+
+def load_removal_table(n_decks=N_DECKS, path=REMOVAL_PATH):
+    """Efectos de retirada (32, 11, 2, 2, 10); como load_table, sólo la de N_DECKS va a disco"""
+    if n_decks not in _removal_tables:
+        if n_decks != N_DECKS:
+            _removal_tables[n_decks] = BlackjackDP(n_decks).removal_table()
+        elif os.path.exists(path):
+            _removal_tables[n_decks] = np.load(path)
+        else:
+            _removal_tables[n_decks] = build_removal_table(n_decks, path)
+    return _removal_tables[n_decks]
+
+
+class OptimalAgent:
+    """
+    Agente con la interfaz de AIAgent.action que responde con una consulta a la
+    tabla óptima. Acepta la carta del dealer como 1..10 o con el As como 11.
+    """
+
+    def __init__(self, n_decks=N_DECKS):
+        self.ev = load_table(n_decks)
+        self.policy = self.ev.argmax(axis=3).astype(np.int8)
+
+    def action(self, state, greedy=True):
+        player_sum, dealer_card, usable_ace = state
+        dealer_card = 1 if dealer_card == 11 else dealer_card
+        return int(self.policy[min(player_sum, 31), dealer_card, int(bool(usable_ace))])
+
+    def actions(self, states, greedy=True):
+        """Versión por lotes de action, como AIAgent.actions"""
+        states = np.asarray(states, dtype=np.int64).reshape(-1, 3)
+        dealer = np.where(states[:, 1] == 11, 1, states[:, 1])
+        return self.policy[np.minimum(states[:, 0], 31), dealer, (states[:, 2] != 0).astype(np.int64)].astype(np.int64)
+
+    def action_for_cards(self, player_values, dealer_value):
+        """Acción para una mano dada por sus valores 1..10 (calcula bien si el As es usable)"""
+        total, soft = hand_state(player_values)
+        return self.action((total, dealer_value, soft))
+
+
+def policy_table(action_fn):
+    """Tabla (32, 11, 2) de acciones a partir de action_fn((suma, dealer 1..10, As usable)) -> 0/1"""
+    policy = np.zeros(TABLE_SHAPE[:3], dtype=np.int8)
+    for total in range(4, 22):
+        for upcard in range(1, 11):
+            for soft in (False, True):
+                policy[total, upcard, int(soft)] = action_fn((total, upcard, soft))
+    return policy
+
+
+class ShoeTracker:
+    """
+    Cartas que quedan en el shoe de cada valor 1..10. BlackjackGame la actualiza
+    en O(1) con cada carta repartida; `version` cambia con cada carta y con cada
+    reset, para que las cachés sepan cuándo recalcular.
+    """
+
+    def __init__(self, n_decks=N_DECKS):
+        self.version = 0
+        self.reset(n_decks)
+
+    def reset(self, n_decks=None):
+        self.n_decks = n_decks or self.n_decks
+        self.full = shoe_composition(self.n_decks)
+        self.counts = list(self.full)
+        self.remaining = sum(self.full)
+        self.version += 1
+
+    def remove(self, value):
+        self.counts[value - 1] -= 1
+        self.remaining -= 1
+        self.version += 1
+
+    def remove_card(self, carta):
+        self.remove(CARD_VALUE[carta[0]])
+
+    @property
+    def composition(self):
+        return tuple(self.counts)
+
+
+class CompositionEV:
+    """
+    VE (plantarse, pedir) según las cartas que quedan en el shoe.
+
+    Parte de la tabla óptima (shoe completo menos la carta del dealer) y suma
+    los efectos de retirada de las cartas que ya han salido. Cada entrada se
+    recalcula sólo cuando se consulta con una versión del shoe distinta de la
+    última (10 multiplicaciones); entre cartas, las consultas son una lectura
+    de diccionario, así que se puede llamar en cada frame.
+    """
+
+    def __init__(self, shoe, n_decks=None):
+        self.shoe = shoe
+        self.n_decks = n_decks or shoe.n_decks
+        self.base = load_table(self.n_decks)
+        self.removal = load_removal_table(self.n_decks)
+        self._removed_version = None
+        self._removed = None
+        self._cache = {}
+
+    def removed(self):
+        """Cartas de cada valor que han salido del shoe (array (10,))"""
+        if self._removed_version != self.shoe.version:
+            self._removed = np.subtract(self.shoe.full, self.shoe.counts, dtype=np.float32)
+            self._removed_version = self.shoe.version
+        return self._removed
+
+    def ev(self, total, upcard, soft, hidden=()):
+        """
+        (VE plantarse, VE pedir) para la mano (total, blanda) frente a `upcard` 1..10.
+        `hidden` son los valores de cartas repartidas que el jugador no ve (la
+        carta tapada del dealer): cuentan como si siguieran en el shoe.
+        """
+        key = (min(total, 31), upcard, int(bool(soft)), tuple(hidden))
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == self.shoe.version:
+            return entry[1]
+        delta = self.removed().copy()
+        delta[upcard - 1] -= 1  # la tabla base ya no cuenta la carta del dealer
+        for value in hidden:
+            delta[value - 1] -= 1
+        ev = self.base[key[:3]] + self.removal[key[:3]] @ delta
+        self._cache[key] = (self.shoe.version, ev)
+        return ev
+
+    def action(self, state, greedy=True, hidden=()):
+        player_sum, dealer_card, usable_ace = state
+        stand, hit = self.ev(player_sum, 1 if dealer_card == 11 else dealer_card, usable_ace, hidden)
+        return int(hit > stand)
+
+    def action_for_cards(self, player_values, dealer_value, hidden=()):
+        total, soft = hand_state(player_values)
+        return self.action((total, dealer_value, soft), hidden=hidden)
+
+
+def print_score(name, policy):
+    """Imprime el VE exacto de `policy` (32, 11, 2) frente a la estrategia óptima"""
+    score = BlackjackDP().score_policy(policy)
+    print(f"📊 {name}: VE {score['ev']:+.4f} por mano vs óptimo {score['optimal']:+.4f} "
+          f"(pérdida {score['loss']:.4f}, coincidencia {score['agreement']:.1%})")
+    return score
+
+
+def print_strategy(table):
+    """Tabla de estrategia básica en texto: P = pedir, S = plantarse"""
+    policy = table.argmax(axis=3)
+    header = "      " + " ".join(f"{up:>2}" for up in range(2, 11)) + "  A"
+    for soft, name in ((0, "Duras"), (1, "Blandas")):
+        print(f"   {name}:\n   {header}")
+        for total in range(12 if soft else 5, 22):
+            row = " ".join(" P" if policy[total, up, soft] else " S" for up in list(range(2, 11)) + [1])
+            print(f"   {total:4}  {row}")
+
+
+def test_blackjack_dp():
+    """Comprobaciones contra la estrategia básica conocida y contra simulación"""
+    import random
+
+    table = load_table()
+    agent = OptimalAgent()
+    # Estrategia básica (dealer se planta con 17 blando, sin doblar ni separar)
+    assert agent.action((16, 10, False)) == 1
+    assert agent.action((12, 4, False)) == 0 and agent.action((12, 2, False)) == 1
+    assert agent.action((17, 10, False)) == 0
+    assert agent.action((18, 9, True)) == 1 and agent.action((18, 8, True)) == 0
+    assert agent.action((11, 1, False)) == 1 and agent.action((13, 11, False)) == 1
+    print_strategy(table)
+
+    # El VE exacto de "pedir hasta 17" coincide con una simulación en un mazo
+    dp = BlackjackDP(n_decks=1)
+    comp = remove_cards(dp.comp, [10, 6, 5])
+    hit_to_17 = (np.arange(32)[:, None, None] < 17).repeat(11, axis=1).repeat(2, axis=2).astype(np.int8)
+    exact = dp.policy_ev(hit_to_17, 11, False, 10, comp)
+    _, stand, hit = dp.evaluate(11, False, 10, comp)
+    rng = random.Random(0)
+    deck = [v for v, c in enumerate(comp, start=1) for _ in range(c)]
+    n = 100000
+    rewards = []
+    for _ in range(n):
+        cards = iter(rng.sample(deck, 15))
+        player, soft = 11, False
+        while player < 17:
+            player, soft = add_card(player, soft, next(cards))
+        dealer, dsoft = add_card(0, False, 10)
+        while dealer < 17:
+            dealer, dsoft = add_card(dealer, dsoft, next(cards))
+        rewards.append(-1 if player > 21 else (1 if dealer > 21 or player > dealer else (0 if player == dealer else -1)))
+    simulated, sigma = np.mean(rewards), np.std(rewards) / np.sqrt(n)
+    assert abs(simulated - exact) < 4 * sigma
+    assert hit >= exact and hit > stand
+    print(f"✅ 11 vs 10 (1 mazo): pedir hasta 17 exacto {exact:+.4f}, simulado {simulated:+.4f} ± {sigma:.4f}; "
+          f"óptimo: plantarse {stand:+.3f}, pedir {hit:+.3f}")
+
+    assert (policy_table(agent.action)[4:22, 1:] == agent.policy[4:22, 1:]).all()
+    score = print_score("Pedir hasta 17", hit_to_17)
+    assert score['loss'] > 0
+
+    # Estrategia según el shoe: efectos de retirada frente al VE exacto
+    shoe = ShoeTracker()
+    advisor = CompositionEV(shoe)
+    exact_dp = BlackjackDP()
+    for player, upcard, seen in (([10, 6], 10, [2, 3, 4, 5, 6, 2, 3, 4, 5, 6, 2, 3]),
+                                 ([10, 2], 4, [10, 10, 10, 10, 9, 8]),
+                                 ([9, 6], 7, [])):
+        shoe.reset()
+        for value in player + [upcard] + seen:
+            shoe.remove(value)
+        total, soft = hand_state(player)
+        approx = advisor.ev(total, upcard, soft)
+        exact = exact_dp.evaluate(total, soft, upcard, shoe.composition)[1:]
+        exact_dp.clear()
+        print(f"   {total} vs {upcard} tras {len(seen)} cartas: plantarse {approx[0]:+.4f} (exacto {exact[0]:+.4f}), "
+              f"pedir {approx[1]:+.4f} (exacto {exact[1]:+.4f})")
+        assert np.abs(approx - np.array(exact)).max() < 0.01
+        assert (approx[1] > approx[0]) == (exact[1] > exact[0])
+    # Sin cartas pequeñas en el shoe, 16 contra 10 pasa a plantarse
+    shoe.reset()
+    for value in [10, 6, 10] + [2, 3, 4, 5, 6] * 3:
+        shoe.remove(value)
+    assert advisor.action((16, 10, False)) == 0 and agent.action((16, 10, False)) == 1
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        advisor.action_for_cards([10, 6], 10, hidden=[7])
+    print(f"✅ Consejo según el shoe: {(time.perf_counter() - start) * 100:.1f} µs por consulta (frame)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        test_blackjack_dp()
+    elif len(sys.argv) > 1 and sys.argv[1] == "retirada":
+        build_removal_table(int(sys.argv[2]) if len(sys.argv) > 2 else N_DECKS)
+    else:
+        build_table(int(sys.argv[1]) if len(sys.argv) > 1 else N_DECKS)
@@ -1,8 +1,17 @@
 # blackjack_game.py
 import random
 import os
+import sys
 import pygame
 
+from blackjack_dp import ShoeTracker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_atlas import BACK, load_atlas
+
+# Fracción del shoe que se reparte antes de volver a barajar (como VectorBlackjack)
+PENETRACION = 0.75
+
 class BlackjackGame:
     def __init__(self, ruta_cartas="E:\Sistemas\CardBlack\CardBlack\cards"):
         # Palos y valores estándar
@@ -12,9 +21,14 @@ class BlackjackGame:
         # Ruta a la carpeta de imágenes
         self.ruta_cartas = ruta_cartas
 
-        # Cache de imágenes y reverso
-        self.imagenes_cache = {}
-        self.reverso_img = self.cargar_reverso()
+        # Cache de imágenes y reverso, precargadas desde el atlas (ver card_atlas.py)
+        atlas = load_atlas(100, 145, ruta_cartas)
+        self.imagenes_cache = {tuple(nombre.split("_")): img
+                               for nombre, img in atlas.items() if nombre != BACK}
+        self.reverso_img = atlas[BACK] if BACK in atlas else self.cargar_reverso()
+
+        # Cartas restantes por valor, para la estrategia según el shoe
+        self.shoe = ShoeTracker()
 
         # Inicializar baraja
         self.reset_game()
@@ -25,7 +39,7 @@ class BlackjackGame:
             ruta = os.path.join(self.ruta_cartas, "Reverso.png")
             imagen = pygame.image.load(ruta)
             return pygame.transform.scale(imagen, (100, 145))
-        except pygame.error:
+        except (pygame.error, FileNotFoundError):
             # Si falla, crea una superficie en blanco como fallback
             superficie = pygame.Surface((100, 145))
             superficie.fill((40, 120, 200)) # Un color azul para el reverso
@@ -35,10 +49,23 @@ class BlackjackGame:
         """Crea y mezcla la baraja."""
         self.baraja = [(v, p) for p in self.PALOS for v in self.VALORES] * multiplicador
         random.shuffle(self.baraja)
+        # Cartas que deben quedar en el shoe para jugar otra ronda sin barajar
+        self.corte = int(len(self.baraja) * (1 - PENETRACION))
+        self.multiplicador = multiplicador
+        self.shoe.reset(multiplicador)
         self.dealer_cards = []
         self.player_cards = []
         self.game_over = False
 
+    def nueva_ronda(self):
+        """Limpia las manos y sigue con el mismo shoe; sólo baraja al pasar el corte."""
+        if len(self.baraja) < self.corte:
+            self.reset_game(self.multiplicador)
+        else:
+            self.dealer_cards = []
+            self.player_cards = []
+            self.game_over = False
+
     def _formatear_nombre(self, carta):
         """Convierte ('A', 'Corazones') → 'A_Corazones.png'"""
         valor, palo = carta
@@ -60,6 +87,7 @@ class BlackjackGame:
     def repartir_carta(self):
         """Reparte una carta con su imagen."""
         carta = self.baraja.pop()
+        self.shoe.remove_card(carta)
         if carta not in self.imagenes_cache:
             self.imagenes_cache[carta] = self.cargar_imagen(carta)
         return carta, self.imagenes_cache[carta]
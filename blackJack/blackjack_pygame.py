@@ -3,8 +3,11 @@ import pygame
 import sys
 import time
 import math
+import threading
 from blackjack_game import BlackjackGame
 from ai_agent import AIAgent
+from blackjack_dp import CARD_VALUE, CompositionEV, OptimalAgent, policy_table
+from blackjack_vec import simulate
 
 # ---------- Config Mejorado ----------
 FPS = 60
@@ -217,6 +220,8 @@ class CasinoUIManager:
         self.fonts = get_scaled_fonts(screen.get_width())
         self.hovered_button = -1
         self.effects = VisualEffects()
+        # Superficies ya renderizadas de cada carta: (carta, ancho, alto, oculta) -> Surface
+        self.card_cache = {}
         
     def update_fonts(self):
         self.fonts = get_scaled_fonts(self.screen.get_width())
@@ -263,22 +268,41 @@ class CasinoUIManager:
         return txt.get_rect(x=x, y=y)
 
     def draw_card(self, x, y, carta=None, hidden=False):
-        """Dibuja carta con efectos mejorados"""
+        """Dibuja carta con efectos mejorados (un solo blit de la superficie cacheada)"""
+        hidden = carta is None or hidden
+        key = (None if hidden else carta, self.layout.card_width, self.layout.card_height, hidden)
+        surf = self.card_cache.get(key)
+        if surf is None:
+            surf = self.render_card(carta, hidden)
+            # El texto de respaldo no se cachea: la imagen puede estar disponible más tarde
+            if hidden or self.card_image(carta) is not None:
+                self.card_cache[key] = surf
+        self.screen.blit(surf, (x, y))
+
+    def card_image(self, carta):
+        """Imagen de la carta cargada por el juego, o None"""
+        if hasattr(GameUI.instance, 'juego'):
+            return GameUI.instance.juego.imagenes_cache.get(carta)
+        return None
+
+    def render_card(self, carta, hidden):
+        """Renderiza una vez la carta (con su sombra) en una superficie propia"""
+        width, height = self.layout.card_width, self.layout.card_height
+        surf = pygame.Surface((width + 5, height + 5), pygame.SRCALPHA)
+
         # Sombra de la carta
-        self.effects.draw_card_shadow(self.screen, x, y, 
-                                    self.layout.card_width, self.layout.card_height)
-        
-        if carta is None or hidden:
+        self.effects.draw_card_shadow(surf, 0, 0, width, height)
+        card_rect = pygame.Rect(0, 0, width, height)
+
+        if hidden:
             # Reverso de carta con patrón elegante
-            card_rect = pygame.Rect(x, y, self.layout.card_width, self.layout.card_height)
-            
             # Fondo del reverso
             back_color1 = (120, 30, 30)
             back_color2 = (80, 20, 20)
-            self.effects.draw_gradient_rect(self.screen, back_color1, back_color2, card_rect)
+            self.effects.draw_gradient_rect(surf, back_color1, back_color2, card_rect)
             
             # Borde dorado
-            pygame.draw.rect(self.screen, GOLD_COLOR, card_rect, 3, border_radius=12)
+            pygame.draw.rect(surf, GOLD_COLOR, card_rect, 3, border_radius=12)
             
             # Patrón decorativo
             center_x, center_y = card_rect.center
@@ -286,54 +310,52 @@ class CasinoUIManager:
                 for j in range(4):
                     dot_x = center_x - 20 + i * 20
                     dot_y = center_y - 30 + j * 20
-                    pygame.draw.circle(self.screen, GOLD_COLOR, (dot_x, dot_y), 3)
-        else:
-            # Carta visible
-            card_rect = pygame.Rect(x, y, self.layout.card_width, self.layout.card_height)
-            
-            # Fondo blanco con gradiente sutil
-            white_light = (255, 255, 255)
-            white_shadow = (245, 245, 245)
-            self.effects.draw_gradient_rect(self.screen, white_light, white_shadow, card_rect)
-            
-            # Borde
-            pygame.draw.rect(self.screen, (200, 200, 200), card_rect, 2, border_radius=12)
-            
-            # Obtener imagen de cache si existe
-            if hasattr(GameUI.instance, 'juego'):
-                imagen = GameUI.instance.juego.imagenes_cache.get(carta)
-                if imagen:
-                    img = pygame.transform.scale(imagen, 
-                                               (self.layout.card_width-4, self.layout.card_height-4))
-                    self.screen.blit(img, (x+2, y+2))
-                    return
-            
-            # Fallback: dibujar carta con texto
-            valor, palo = carta
-            texto = self.carta_a_texto_elegante(carta)
-            
-            # Color del palo
-            color_carta = (220, 20, 20) if palo in ['Corazones', 'Diamantes'] else (20, 20, 20)
-            
-            # Texto principal (centro)
-            font = self.fonts['card']
-            txt = font.render(texto, True, color_carta)
-            text_x = x + (self.layout.card_width - txt.get_width()) // 2
-            text_y = y + (self.layout.card_height - txt.get_height()) // 2
-            self.screen.blit(txt, (text_x, text_y))
-            
-            # Valores en las esquinas
-            small_font = self.fonts['small']
-            corner_txt = small_font.render(texto, True, color_carta)
-            
-            # Esquina superior izquierda
-            self.screen.blit(corner_txt, (x + 8, y + 8))
-            
-            # Esquina inferior derecha (rotado)
-            rotated = pygame.transform.rotate(corner_txt, 180)
-            rot_x = x + self.layout.card_width - rotated.get_width() - 8
-            rot_y = y + self.layout.card_height - rotated.get_height() - 8
-            self.screen.blit(rotated, (rot_x, rot_y))
+                    pygame.draw.circle(surf, GOLD_COLOR, (dot_x, dot_y), 3)
+            return surf
+
+        # Carta visible
+        # Fondo blanco con gradiente sutil
+        white_light = (255, 255, 255)
+        white_shadow = (245, 245, 245)
+        self.effects.draw_gradient_rect(surf, white_light, white_shadow, card_rect)
+        
+        # Borde
+        pygame.draw.rect(surf, (200, 200, 200), card_rect, 2, border_radius=12)
+        
+        # Obtener imagen de cache si existe
+        imagen = self.card_image(carta)
+        if imagen is not None:
+            img = pygame.transform.scale(imagen, (width - 4, height - 4))
+            surf.blit(img, (2, 2))
+            return surf
+        
+        # Fallback: dibujar carta con texto
+        valor, palo = carta
+        texto = self.carta_a_texto_elegante(carta)
+        
+        # Color del palo
+        color_carta = (220, 20, 20) if palo in ['Corazones', 'Diamantes'] else (20, 20, 20)
+        
+        # Texto principal (centro)
+        font = self.fonts['card']
+        txt = font.render(texto, True, color_carta)
+        text_x = (width - txt.get_width()) // 2
+        text_y = (height - txt.get_height()) // 2
+        surf.blit(txt, (text_x, text_y))
+        
+        # Valores en las esquinas
+        small_font = self.fonts['small']
+        corner_txt = small_font.render(texto, True, color_carta)
+        
+        # Esquina superior izquierda
+        surf.blit(corner_txt, (8, 8))
+        
+        # Esquina inferior derecha (rotado)
+        rotated = pygame.transform.rotate(corner_txt, 180)
+        rot_x = width - rotated.get_width() - 8
+        rot_y = height - rotated.get_height() - 8
+        surf.blit(rotated, (rot_x, rot_y))
+        return surf
 
     def draw_elegant_button(self, rect, texto, button_type='primary', enabled=True, hovered=False):
         """Dibuja botón con estilo casino elegante"""
@@ -446,17 +468,42 @@ class GameUI:
             ("🚪 Salir", self.quit_game, 'primary')
         ]
         
-        # Cargar agente IA
+        # Cargar agentes IA en segundo plano: la ventana aparece ya y, mientras
+        # tanto, la IA juega con la estrategia básica de ia_play
         self.agent = None
+        self.optimal = None
+        self.advisor = None
+        self.ai_loading = True
+        self.ai_evaluating = False
+        threading.Thread(target=self.load_agents, daemon=True).start()
+
+    def load_agents(self):
+        """Carga el agente IA y la estrategia óptima (hilo en segundo plano)"""
+        agent = None
         try:
-            self.agent = AIAgent(MODEL_PATH)
+            agent = AIAgent(MODEL_PATH)
             print("🤖 Agente IA cargado exitosamente")
         except Exception as e:
             print(f"❌ Error cargando agente: {e}")
 
+        # Estrategia óptima exacta (tabla precalculada por blackjack_dp) y su
+        # versión según las cartas que quedan en el shoe, para el consejo
+        try:
+            self.optimal = OptimalAgent()
+            self.advisor = CompositionEV(self.juego.shoe)
+            if agent is None:
+                agent = self.optimal
+                print("📐 Usando la estrategia óptima como agente IA")
+        except Exception as e:
+            print(f"⚠️ Error cargando estrategia óptima: {e}")
+
+        self.agent = agent
+        self.ai_loading = False
+
     def handle_resize(self, new_size):
         """Maneja el redimensionamiento de ventana"""
         self.layout = CasinoLayout(new_size[0], new_size[1])
+        # El nuevo CasinoUIManager empieza con la cache de cartas vacía
         self.ui_manager = CasinoUIManager(self.screen, self.layout)
         self.ui_manager.update_fonts()
 
@@ -491,45 +538,37 @@ class GameUI:
         self.show_ai_recommendation = not self.show_ai_recommendation
         
     def evaluate_ai(self):
+        if self.ai_evaluating:
+            return
         if self.agent is not None:
-            wins = ties = losses = 0
-            rounds = 100
-            for _ in range(rounds):
-                self.juego.reset_game()
-                jugador = []
-                dealer = []
-                for _ in range(2):
-                    c, _ = self.juego.repartir_carta()
-                    jugador.append(c)
-                for _ in range(2):
-                    c, _ = self.juego.repartir_carta()
-                    dealer.append(c)
-                ia_hand = jugador.copy()
-                while self.juego.calcular_mano(ia_hand) < 17:
-                    c, _ = self.juego.repartir_carta()
-                    ia_hand.append(c)
-                while self.juego.calcular_mano(dealer) < 17:
-                    c, _ = self.juego.repartir_carta()
-                    dealer.append(c)
-                if self.juego.calcular_mano(ia_hand) > 21:
-                    losses += 1
-                elif self.juego.calcular_mano(dealer) > 21 or self.juego.calcular_mano(ia_hand) > self.juego.calcular_mano(dealer):
-                    wins += 1
-                elif self.juego.calcular_mano(ia_hand) == self.juego.calcular_mano(dealer):
-                    ties += 1
-                else:
-                    losses += 1
-            self.mensaje = f"📈 IA evaluada: {wins}W-{ties}T-{losses}L de {rounds} partidas"
+            # La simulación tarda más de un segundo: en segundo plano, sin congelar la ventana
+            self.ai_evaluating = True
+            self.mensaje = "⏳ Evaluando IA..."
+            threading.Thread(target=self.run_evaluation, args=(self.agent,), daemon=True).start()
         else:
             self.mensaje = "❌ No hay modelo IA disponible"
+
+    def run_evaluation(self, agent):
+        """Juega la tabla de decisiones del agente en 1M de manos (hilo en segundo plano)"""
+        try:
+            policy = getattr(agent, 'policy', None)
+            if policy is None:
+                policy = policy_table(agent.action)
+            stats = simulate(policy, n_hands=1_000_000)
+            self.mensaje = (f"📈 IA evaluada: {stats['win']:.1%}V-{stats['push']:.1%}E-{stats['loss']:.1%}D, "
+                            f"VE {stats['ev']:+.3f} ± {1.96 * stats['stderr']:.3f} en {stats['hands']:,} manos")
+        except Exception as e:
+            self.mensaje = f"⚠️ Error evaluando IA: {e}"
+        finally:
+            self.ai_evaluating = False
             
     def quit_game(self):
         pygame.quit()
         sys.exit()
 
     def start_new_round(self, mode):
-        """Inicia nueva ronda"""
-        self.juego.reset_game()
+        """Inicia nueva ronda con el mismo shoe, para que el consejo vea las cartas ya jugadas"""
+        self.juego.nueva_ronda()
         self.jugador.clear()
         self.dealer.clear()
         self.ia.clear()
@@ -655,6 +694,19 @@ class GameUI:
         """Obtiene recomendación de la IA"""
         if self.agent is None or self.game_over or not self.jugador:
             return None
+        if self.advisor is not None and self.dealer:
+            # Tabla según el shoe; la carta tapada del dealer cuenta como no vista
+            return self.advisor.action_for_cards(
+                [CARD_VALUE[c[0]] for c in self.jugador],
+                CARD_VALUE[self.dealer[0][0]],
+                hidden=[CARD_VALUE[c[0]] for c in self.dealer[1:]]
+            )
+        if self.optimal is not None:
+            # Consulta directa a la tabla, con el As usable calculado sobre las cartas reales
+            return self.optimal.action_for_cards(
+                [CARD_VALUE[c[0]] for c in self.jugador],
+                CARD_VALUE[self.dealer[0][0]] if self.dealer else 10
+            )
         estado = (
             self.juego.calcular_mano(self.jugador),
             self.juego.valor_carta(self.dealer[0]) if self.dealer else 10,
@@ -915,7 +967,17 @@ class GameUI:
             button_index += 1
         
         # Información adicional en el panel
-        if self.agent:
+        if self.ai_loading:
+            info_y = self.layout.control_panel.bottom - 100
+            self.ui_manager.draw_text(
+                "⏳ Cargando IA...", 
+                self.layout.control_panel.centerx, 
+                info_y, 
+                'small', 
+                TEXT_GOLD, 
+                center=True
+            )
+        elif self.agent:
             info_y = self.layout.control_panel.bottom - 100
             self.ui_manager.draw_text(
                 "🤖 IA Disponible", 
@@ -1018,6 +1080,15 @@ def main_loop():
         pygame.display.flip()
         reloj.tick(FPS)
 
+        # startup_benchmark.py: avisa del primer frame y de la IA lista, y termina
+        if "--benchmark-startup" in sys.argv:
+            if frame_count == 1:
+                print("BENCH primer_frame", flush=True)
+            if not ui.ai_loading:
+                print("BENCH ia_lista", flush=True)
+                pygame.quit()
+                sys.exit()
+
 # ---------- Punto de entrada ----------
 if __name__ == "__main__":
     print("🎰 Iniciando Casino Blackjack Premium...")
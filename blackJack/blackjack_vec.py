@@ -0,0 +1,268 @@
+# blackjack_vec.py
+"""
+Simulador de blackjack vectorizado con NumPy.
+
+Se juegan en paralelo `n_shoes` shoes ya barajados (array (n_shoes, 52 * mazos)
+con los valores 1..10 de las cartas); en cada ronda cada shoe reparte una mano
+y un puntero por shoe indica la siguiente carta. Totales y As usable del
+jugador y del dealer son arrays, y las decisiones salen de tablas de
+estrategia: (32, 11, 2) para el jugador, como OptimalAgent.policy, y (32, 2)
+para el dealer. Los shoes que pasan de la penetración se vuelven a barajar.
+
+Uso:
+    from blackjack_dp import OptimalAgent
+    stats = simulate(OptimalAgent().policy, n_hands=10_000_000)
+    print(stats["ev"], stats["ci95"])
+"""
+import sys
+import time
+
+import numpy as np
+
+from blackjack_dp import N_DECKS, TABLE_SHAPE, shoe_composition
+
+MAX_CARDS_PER_ROUND = 24  # 2 + 2 cartas iniciales y, como mucho, 10 + 10 pedidas
+
+# El dealer pide con menos de 17 y se planta con cualquier 17 (también blando)
+DEALER_STANDS_17 = (np.arange(32) < 17)[:, None].repeat(2, axis=1).astype(np.int8)
+
+# "Pedir hasta 17", la estrategia de la antigua evaluación de GameUI
+HIT_UNTIL_17 = (np.arange(32) < 17)[:, None, None].repeat(11, axis=1).repeat(2, axis=2).astype(np.int8)
+
+
+def shoe_cards(n_decks=N_DECKS):
+    """Valores 1..10 de todas las cartas de un shoe, sin barajar"""
+    return np.repeat(np.arange(1, 11, dtype=np.int8), shoe_composition(n_decks))
+
+
+def add_cards(total, soft, values):
+    """Versión vectorizada de blackjack_dp.add_card: devuelve (total, blanda) nuevos"""
+    total = total + values
+    ace = (values == 1) & (total <= 11)
+    total = total + 10 * ace
+    soft = soft | ace
+    bust_soft = soft & (total > 21)
+    return total - 10 * bust_soft, soft & ~bust_soft
+
+
+class VectorBlackjack:
+    """
+    `n_shoes` shoes barajados jugados a la vez; cada ronda reparte una mano por shoe.
+    """
+
+    def __init__(self, n_shoes=200_000, n_decks=N_DECKS, penetration=0.75, seed=None):
+        self.n_shoes = n_shoes
+        self.n_decks = n_decks
+        self.rng = np.random.default_rng(seed)
+        self.cards = shoe_cards(n_decks)
+        # Se baraja antes de una ronda que pueda quedarse sin cartas
+        self.reshuffle_at = min(int(len(self.cards) * penetration), len(self.cards) - MAX_CARDS_PER_ROUND)
+        self.shoes = np.empty((n_shoes, len(self.cards)), dtype=np.int8)
+        self.pos = np.empty(n_shoes, dtype=np.int64)
+        self._rows = np.arange(n_shoes)
+        self.shuffle(self._rows)
+
+    def shuffle(self, rows):
+        self.shoes[rows] = self.rng.permuted(np.broadcast_to(self.cards, (len(rows), len(self.cards))), axis=1)
+        self.pos[rows] = 0
+
+    def deal(self, rows=None):
+        """Siguiente carta de cada shoe (o de los shoes `rows`)"""
+        if rows is None:
+            values = self.shoes[self._rows, self.pos]
+            self.pos += 1
+        else:
+            values = self.shoes[rows, self.pos[rows]]
+            self.pos[rows] += 1
+        return values
+
+    def play_round(self, policy, dealer_policy=DEALER_STANDS_17):
+        """Una mano por shoe; devuelve las recompensas (n_shoes,) en {-1, 0, 1}"""
+        used = np.flatnonzero(self.pos > self.reshuffle_at)
+        if len(used):
+            self.shuffle(used)
+
+        zeros = np.zeros(self.n_shoes, dtype=np.int8)
+        no_ace = np.zeros(self.n_shoes, dtype=bool)
+        # Mismo orden que GameUI.start_new_round: dos al jugador, dos al dealer
+        player, p_soft = add_cards(zeros, no_ace, self.deal())
+        player, p_soft = add_cards(player, p_soft, self.deal())
+        upcard = self.deal()
+        hole = self.deal()
+
+        # Turno del jugador: sólo las manos que siguen pidiendo
+        active = np.flatnonzero(policy[player, upcard, p_soft.view(np.int8)] == 1)
+        while len(active):
+            total, soft = add_cards(player[active], p_soft[active], self.deal(active))
+            player[active], p_soft[active] = total, soft
+            alive = total <= 21
+            active = active[alive]
+            active = active[policy[total[alive], upcard[active], soft[alive].view(np.int8)] == 1]
+
+        # Turno del dealer (juega siempre, como resolve_round)
+        return outcome(player, self.play_dealer(upcard, hole, dealer_policy))
+
+    def play_dealer(self, upcard, hole, dealer_policy=DEALER_STANDS_17, rows=None):
+        """Total final del dealer en los shoes `rows` (todos si None) a partir de sus dos cartas"""
+        rows = self._rows if rows is None else rows
+        dealer, d_soft = add_cards(np.zeros(len(rows), dtype=np.int8), np.zeros(len(rows), dtype=bool), upcard)
+        dealer, d_soft = add_cards(dealer, d_soft, hole)
+        active = np.flatnonzero(dealer_policy[dealer, d_soft.view(np.int8)] == 1)
+        while len(active):
+            total, soft = add_cards(dealer[active], d_soft[active], self.deal(rows[active]))
+            dealer[active], d_soft[active] = total, soft
+            active = active[dealer_policy[np.minimum(total, 31), soft.view(np.int8)] == 1]
+        return dealer
+
+
+def outcome(player, dealer):
+    """Recompensas en {-1, 0, 1} de manos ya terminadas"""
+    reward = np.sign(player - dealer).astype(np.int8)
+    reward[dealer > 21] = 1
+    reward[player > 21] = -1
+    return reward
+
+
+class VectorBlackjackEnv:
+    """
+    `n_envs` partidas paso a paso sobre los shoes de VectorBlackjack, con la
+    observación de Blackjack-v1: (suma del jugador, carta del dealer 1..10, As usable).
+
+    step(actions) recibe 0 (plantarse) o 1 (pedir) por partida. Las partidas
+    que terminan se vuelven a repartir en el mismo paso: en esas filas la
+    observación devuelta ya es la de la mano nueva.
+    """
+
+    def __init__(self, n_envs=4096, n_decks=N_DECKS, penetration=0.75, seed=None,
+                 dealer_policy=DEALER_STANDS_17):
+        self.n_envs = n_envs
+        self.sim = VectorBlackjack(n_envs, n_decks, penetration, seed)
+        self.dealer_policy = dealer_policy
+        self.player = np.zeros(n_envs, dtype=np.int8)
+        self.soft = np.zeros(n_envs, dtype=bool)
+        self.upcard = np.zeros(n_envs, dtype=np.int8)
+        self.hole = np.zeros(n_envs, dtype=np.int8)
+
+    def obs(self):
+        return np.stack([self.player, self.upcard, self.soft], axis=1).astype(np.int64)
+
+    def _deal(self, rows):
+        used = rows[self.sim.pos[rows] > self.sim.reshuffle_at]
+        if len(used):
+            self.sim.shuffle(used)
+        zeros = np.zeros(len(rows), dtype=np.int8)
+        player, soft = add_cards(zeros, zeros.astype(bool), self.sim.deal(rows))
+        self.player[rows], self.soft[rows] = add_cards(player, soft, self.sim.deal(rows))
+        self.upcard[rows] = self.sim.deal(rows)
+        self.hole[rows] = self.sim.deal(rows)
+
+    def reset(self):
+        self._deal(np.arange(self.n_envs))
+        return self.obs()
+
+    def step(self, actions):
+        """(observaciones (N, 3), recompensas (N,) float32, terminadas (N,) bool)"""
+        actions = np.asarray(actions)
+        reward = np.zeros(self.n_envs, dtype=np.float32)
+        done = np.zeros(self.n_envs, dtype=bool)
+
+        hit = np.flatnonzero(actions == 1)
+        if len(hit):
+            self.player[hit], self.soft[hit] = add_cards(self.player[hit], self.soft[hit], self.sim.deal(hit))
+            bust = hit[self.player[hit] > 21]
+            reward[bust] = -1.0
+            done[bust] = True
+
+        stand = np.flatnonzero(actions != 1)
+        if len(stand):
+            dealer = self.sim.play_dealer(self.upcard[stand], self.hole[stand], self.dealer_policy, stand)
+            reward[stand] = outcome(self.player[stand], dealer)
+            done[stand] = True
+
+        finished = np.flatnonzero(done)
+        if len(finished):
+            self._deal(finished)
+        return self.obs(), reward, done
+
+
+def simulate(policy, n_hands=10_000_000, n_shoes=200_000, n_decks=N_DECKS, penetration=0.75,
+             dealer_policy=DEALER_STANDS_17, seed=None):
+    """
+    Juega `n_hands` manos con la tabla `policy` (32, 11, 2) (0 plantarse, 1 pedir).
+
+    Returns:
+        dict con 'hands', 'ev' (media por mano), 'stderr', 'ci95' (intervalo del
+        95% del VE), tasas 'win'/'push'/'loss', 'seconds' y 'hands_per_sec'
+    """
+    policy = np.asarray(getattr(policy, "policy", policy), dtype=np.int8)
+    assert policy.shape == TABLE_SHAPE[:3], f"Tabla de estrategia con forma {policy.shape}"
+    start = time.perf_counter()
+    sim = VectorBlackjack(min(n_shoes, n_hands), n_decks, penetration, seed)
+    counts = np.zeros(3, dtype=np.int64)  # derrotas, empates, victorias
+    hands = 0
+    while hands < n_hands:
+        reward = sim.play_round(policy, dealer_policy)[:n_hands - hands]
+        counts += np.bincount(reward + 1, minlength=3)
+        hands += len(reward)
+    elapsed = time.perf_counter() - start
+
+    loss, push, win = counts / hands
+    ev = win - loss
+    stderr = np.sqrt(max(win + loss - ev * ev, 0.0) / hands)
+    return {"hands": hands, "ev": ev, "stderr": stderr, "ci95": (ev - 1.96 * stderr, ev + 1.96 * stderr),
+            "win": win, "push": push, "loss": loss, "seconds": elapsed, "hands_per_sec": hands / elapsed}
+
+
+def format_stats(stats):
+    return (f"VE {stats['ev']:+.4f} ± {1.96 * stats['stderr']:.4f} | {stats['win']:.2%} V, "
+            f"{stats['push']:.2%} E, {stats['loss']:.2%} D en {stats['hands']:,} manos")
+
+
+def test_blackjack_vec(n_hands=10_000_000):
+    """Coincidencia con el VE exacto de blackjack_dp y velocidad"""
+    import random
+    from blackjack_dp import BlackjackDP, OptimalAgent, add_card, hand_state
+
+    # Las reglas vectorizadas coinciden con add_card
+    rng = random.Random(0)
+    for _ in range(200):
+        hand = [rng.randint(1, 10) for _ in range(rng.randint(1, 6))]
+        total, soft = np.int8(0), np.bool_(False)
+        for v in hand:
+            total, soft = add_cards(total, soft, np.int8(v))
+        assert (int(total), bool(soft)) == hand_state(hand), hand
+        assert hand_state(hand) == add_card(*hand_state(hand[:-1]), hand[-1])
+
+    # Un shoe nuevo por mano: el VE simulado coincide con el exacto desde el reparto inicial
+    dp = BlackjackDP()
+    for name, policy in (("óptima", OptimalAgent().policy), ("pedir hasta 17", HIT_UNTIL_17)):
+        exact = dp.score_policy(policy)["ev"]
+        stats = simulate(policy, 400_000, penetration=0.0, seed=1)
+        print(f"   {name}: exacto {exact:+.4f}, simulado {format_stats(stats)}")
+        assert abs(stats["ev"] - exact) < 4 * stats["stderr"] + 0.003  # la tabla exacta no quita las cartas del jugador
+
+    # Paso a paso, la política óptima da el mismo VE que play_round
+    env = VectorBlackjackEnv(10_000, seed=2)
+    agent = OptimalAgent()
+    obs = env.reset()
+    rewards = []
+    while sum(len(r) for r in rewards) < 400_000:
+        obs, reward, done = env.step(agent.actions(obs))
+        rewards.append(reward[done])
+    rewards = np.concatenate(rewards)
+    exact = dp.score_policy(agent.policy)["ev"]
+    print(f"   VectorBlackjackEnv: VE {rewards.mean():+.4f} ± {1.96 * rewards.std() / np.sqrt(len(rewards)):.4f} "
+          f"(exacto {exact:+.4f})")
+    assert abs(rewards.mean() - exact) < 4 * rewards.std() / np.sqrt(len(rewards)) + 0.003
+
+    stats = simulate(OptimalAgent(), n_hands, seed=0)
+    print(f"✅ Estrategia óptima: {format_stats(stats)} | {stats['seconds']:.1f}s "
+          f"({stats['hands_per_sec'] / 1e6:.2f}M manos/s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        test_blackjack_vec()
+    else:
+        from blackjack_dp import OptimalAgent
+        print(format_stats(simulate(OptimalAgent(), int(float(sys.argv[1])) if len(sys.argv) > 1 else 10_000_000)))
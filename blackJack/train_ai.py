@@ -1,10 +1,13 @@
 #train_ai.py
-import gymnasium as gym
 import numpy as np
 import random
 import pickle
+import sys
+import time
 from collections import defaultdict
 
+Q_SHAPE = (32, 11, 2, 2)  # (suma del jugador, carta del dealer, As usable, acción)
+
 # --- Esta función reemplaza el lambda ---
 def default_action_value():
     return np.zeros(2)  # 0: stick, 1: hit
@@ -52,8 +55,93 @@ def train(agent, env, episodes=100000):
     with open("modelo_blackjack.pkl", "wb") as f:
         pickle.dump(dict(agent.Q), f)
 
+    # VE exacto de la política aprendida frente a la estrategia óptima
+    try:
+        from blackjack_dp import policy_table, print_score
+        print_score("Q-learning", policy_table(lambda s: int(np.argmax(agent.Q[s])) if s in agent.Q else 0))
+    except Exception as e:
+        print(f"⚠️ Error evaluando la política: {e}")
+
+# --- Entrenamiento vectorizado ---
+def train_vectorized(episodes=20_000_000, n_envs=4096, learning_rate=0.02, discount_factor=1.0,
+                     exploration_rate=1.0, epsilon_min=0.01, epsilon_decay=0.999995, seed=None):
+    """
+    Q-learning tabular con `n_envs` partidas en paralelo (blackjack_vec.VectorBlackjackEnv).
+
+    Q es un array float32 (32, 11, 2, 2) indexado por (suma, dealer, As usable, acción).
+    Las diferencias TD de cada paso se acumulan con np.add.at y se promedian
+    cuando varias partidas pasan por el mismo par estado-acción. Epsilon decae
+    por transición, como en BlackjackAI.learn. Sin descuento por defecto: con
+    gamma < 1 pedir carta sale penalizado frente a plantarse.
+    Devuelve (Q, visitados), con visitados (32, 11, 2) = estados en los que se actuó.
+    """
+    from blackjack_vec import VectorBlackjackEnv
+
+    rng = np.random.default_rng(seed)
+    env = VectorBlackjackEnv(n_envs, seed=seed)
+    Q = np.zeros(Q_SHAPE, dtype=np.float32)
+    Q_flat = Q.reshape(-1)
+    visited = np.zeros(Q_SHAPE[:3], dtype=bool)
+    td_sum = np.zeros(Q.size, dtype=np.float32)
+    td_count = np.zeros(Q.size, dtype=np.float32)
+
+    obs = env.reset()
+    finished = transitions = 0
+    next_report = 0
+    start = time.perf_counter()
+    while finished < episodes:
+        s, d, u = obs.T
+        epsilon = max(epsilon_min, exploration_rate * epsilon_decay ** transitions)
+        explore = rng.random(n_envs) < epsilon
+        actions = np.where(explore, rng.integers(0, 2, n_envs), Q[s, d, u].argmax(axis=1))
+        visited[s, d, u] = True
+
+        next_obs, reward, done = env.step(actions)
+        ns, nd, nu = next_obs.T
+        # En las partidas terminadas next_obs ya es la mano nueva: no hay valor futuro
+        target = reward + discount_factor * Q[ns, nd, nu].max(axis=1) * ~done
+        idx = np.ravel_multi_index((s, d, u, actions), Q_SHAPE)
+        td_sum.fill(0.0)
+        td_count.fill(0.0)
+        np.add.at(td_sum, idx, target - Q_flat[idx])
+        np.add.at(td_count, idx, 1.0)
+        Q_flat += learning_rate * td_sum / np.maximum(td_count, 1.0)
+
+        obs = next_obs
+        transitions += n_envs
+        finished += int(done.sum())
+        if finished >= next_report:
+            elapsed = time.perf_counter() - start
+            print(f"Episode {finished}, epsilon={epsilon:.4f} ({finished / max(elapsed, 1e-9):,.0f} episodios/s)")
+            next_report += max(episodes // 10, 1)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {finished:,} episodios en {elapsed:.1f}s ({finished / elapsed:,.0f} episodios/s)")
+    return Q, visited
+
+def q_to_dict(Q, visited):
+    """Q en el formato de modelo_blackjack.pkl: {(suma, dealer, As usable): array([Q plantarse, Q pedir])}"""
+    return {(int(s), int(d), int(u)): Q[s, d, u].astype(np.float64) for s, d, u in zip(*np.nonzero(visited))}
+
+def save_q(Q, visited, pkl_path="modelo_blackjack.pkl", npy_path="modelo_blackjack.npy"):
+    with open(pkl_path, "wb") as f:
+        pickle.dump(q_to_dict(Q, visited), f)
+    np.save(npy_path, Q)
+    print(f"💾 Q guardada en {pkl_path} y {npy_path}")
+
 # --- Entrenamiento ---
 if __name__ == "__main__":
-    env = gym.make("Blackjack-v1", sab=True)  # sab=True para acciones estándar
-    ai = BlackjackAI()
-    train(ai, env, episodes=100000)
+    if "--vectorizado" in sys.argv:
+        args = [a for a in sys.argv[1:] if not a.startswith("--")]
+        Q, visited = train_vectorized(**({"episodes": int(float(args[0]))} if args else {}))
+        save_q(Q, visited)
+        try:
+            from blackjack_dp import print_score
+            print_score("Q-learning vectorizado", (Q.argmax(axis=3) * visited).astype(np.int8))
+        except Exception as e:
+            print(f"⚠️ Error evaluando la política: {e}")
+    else:
+        import gymnasium as gym
+        env = gym.make("Blackjack-v1", sab=True)  # sab=True para acciones estándar
+        ai = BlackjackAI()
+        train(ai, env, episodes=100000)
@@ -1,9 +1,10 @@
 # train_policy.py
-import gymnasium as gym
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, Model
 import os
+import sys
+import time
 
 # --- Hiperparámetros ---
 EPISODES = 80000       # Reduce si tu PC es lento (ej: 30000)
@@ -13,13 +14,28 @@ LR = 0.001
 MODEL_PATH = "policy_blackjack.h5"
 SEED = 42
 
+# Modo vectorizado (python train_policy.py --vectorizado): muchas partidas a la vez
+VECTORIZADO = "--vectorizado" in sys.argv
+EPISODES_VEC = 2_000_000
+N_ENVS = 4096          # partidas simultáneas (una sola pasada de la red por paso)
+BATCH_SIZE_VEC = 16384
+
+# Modo grafo (--grafo): reparto, muestreo, retornos y gradiente dentro de un tf.function
+GRAFO = "--grafo" in sys.argv
+BENCHMARK = "--benchmark" in sys.argv   # compara pasos/s de los tres modos y no guarda nada
+TEST = "--test" in sys.argv             # comprueba el modo grafo y no guarda nada
+MAX_PASOS_GRAFO = 10   # decisiones por mano desenrolladas en el grafo (después se planta)
+MAX_CARTAS_DEALER = 12
+
 np.random.seed(SEED)
 tf.random.set_seed(SEED)
 
 # --- Entorno ---
-env = gym.make("Blackjack-v1", sab=True)  # sab=True: acciones estándar (stick/hit)
+if not (VECTORIZADO or GRAFO or BENCHMARK or TEST):
+    import gymnasium as gym
+    env = gym.make("Blackjack-v1", sab=True)  # sab=True: acciones estándar (stick/hit)
 obs_space = 3   # (player_sum, dealer_card, usable_ace)
-n_actions = env.action_space.n  # 2 (stick=0, hit=1)
+n_actions = 2   # stick=0, hit=1
 
 # --- Preprocesado del estado ---
 def procesar_estado(state):
@@ -54,69 +70,329 @@ def discount_rewards(rewards, gamma):
     return (discounted - mean) / std
 
 # --- Entrenamiento (REINFORCE, actualizaciones por lotes) ---
-states_batch = []
-actions_batch = []
-rewards_batch = []
-episode = 0
-steps = 0
+def paso_gradiente(states_arr, actions_arr, returns_arr):
+    with tf.GradientTape() as tape:
+        logits = model(states_arr)                    # (N, n_actions)
+        logp = tf.nn.log_softmax(logits)
+        indices = tf.range(len(actions_arr))
+        chosen_logp = tf.gather_nd(logp, tf.stack([indices, actions_arr], axis=1))
+        loss = -tf.reduce_mean(chosen_logp * returns_arr)
 
-print("Iniciando entrenamiento REINFORCE...")
+    grads = tape.gradient(loss, model.trainable_variables)
+    optimizer.apply_gradients(zip(grads, model.trainable_variables))
 
-while episode < EPISODES:
-    state, _ = env.reset()
-    done = False
-    ep_states = []
-    ep_actions = []
-    ep_rewards = []
+def entrenar(episodios=EPISODES):
+    """Una partida de Blackjack-v1 cada vez, una pasada de la red por paso; devuelve los pasos"""
+    states_batch = []
+    actions_batch = []
+    rewards_batch = []
+    episode = 0
+    steps = 0
 
-    while not done:
-        s = procesar_estado(state)
-        logits = model(np.array([s]))[0]
-        action = sample_action(logits)
+    print("Iniciando entrenamiento REINFORCE...")
 
-        next_state, reward, terminated, truncated, _ = env.step(int(action))
-        done = terminated or truncated
+    while episode < episodios:
+        state, _ = env.reset()
+        done = False
+        ep_states = []
+        ep_actions = []
+        ep_rewards = []
 
-        ep_states.append(s)
-        ep_actions.append(action)
-        ep_rewards.append(reward)
+        while not done:
+            s = procesar_estado(state)
+            logits = model(np.array([s]))[0]
+            action = sample_action(logits)
 
-        state = next_state
-        steps += 1
+            next_state, reward, terminated, truncated, _ = env.step(int(action))
+            done = terminated or truncated
 
-    # episodio terminado -> calcular retornos descontados normalizados
-    discounted = discount_rewards(ep_rewards, GAMMA)
+            ep_states.append(s)
+            ep_actions.append(action)
+            ep_rewards.append(reward)
 
-    states_batch.extend(ep_states)
-    actions_batch.extend(ep_actions)
-    rewards_batch.extend(discounted)
+            state = next_state
+            steps += 1
 
-    episode += 1
+        # episodio terminado -> calcular retornos descontados normalizados
+        discounted = discount_rewards(ep_rewards, GAMMA)
 
-    # actualizar por lotes
-    if len(states_batch) >= BATCH_SIZE:
-        states_arr = np.vstack(states_batch)
-        actions_arr = np.array(actions_batch, dtype=np.int32)
-        returns_arr = np.array(rewards_batch, dtype=np.float32)
+        states_batch.extend(ep_states)
+        actions_batch.extend(ep_actions)
+        rewards_batch.extend(discounted)
 
-        with tf.GradientTape() as tape:
-            logits = model(states_arr)                    # (N, n_actions)
-            logp = tf.nn.log_softmax(logits)
-            indices = tf.range(len(actions_arr))
-            chosen_logp = tf.gather_nd(logp, tf.stack([indices, actions_arr], axis=1))
-            loss = -tf.reduce_mean(chosen_logp * returns_arr)
+        episode += 1
+
+        # actualizar por lotes
+        if len(states_batch) >= BATCH_SIZE:
+            paso_gradiente(np.vstack(states_batch),
+                           np.array(actions_batch, dtype=np.int32),
+                           np.array(rewards_batch, dtype=np.float32))
+
+            # limpiar batch
+            states_batch = []
+            actions_batch = []
+            rewards_batch = []
+
+        if episode % 5000 == 0:
+            print(f"Episodio {episode}/{episodios} - pasos totales {steps}")
+
+    return steps
+
+def entrenar_vectorizado(episodios=EPISODES_VEC, n_envs=N_ENVS):
+    """
+    REINFORCE con `n_envs` partidas simultáneas (blackjack_vec.VectorBlackjackEnv):
+    una sola pasada de la red por paso para todas, y retornos descontados de
+    cada partida terminada calculados con operaciones vectorizadas. En
+    blackjack sólo el último paso tiene recompensa, así que el retorno del paso
+    t de una partida de L pasos es R * GAMMA^(L-1-t). Los retornos se
+    normalizan por lote (no por partida: una partida de un solo paso quedaría
+    siempre con retorno 0).
+    """
+    from ai_agent import procesar_estados_para_red
+    from blackjack_vec import MAX_CARDS_PER_ROUND, VectorBlackjackEnv
+
+    env_vec = VectorBlackjackEnv(n_envs, seed=SEED)
+    rng = np.random.default_rng(SEED)
+    rows = np.arange(n_envs)
+    pasos_t = np.arange(MAX_CARDS_PER_ROUND)
+    ep_states = np.zeros((n_envs, MAX_CARDS_PER_ROUND, obs_space), dtype=np.float32)
+    ep_actions = np.zeros((n_envs, MAX_CARDS_PER_ROUND), dtype=np.int32)
+    ep_len = np.zeros(n_envs, dtype=np.int64)
+
+    states_batch, actions_batch, returns_batch = [], [], []
+    n_batch = 0
+    episode = steps = 0
+    next_report = 0
+    start = time.perf_counter()
+    obs = env_vec.reset()
+
+    print(f"Iniciando entrenamiento REINFORCE vectorizado ({n_envs} partidas en paralelo)...")
+    while episode < episodios:
+        s = procesar_estados_para_red(obs)
+        probs = tf.nn.softmax(model(s)).numpy()
+        actions = (rng.random(n_envs) < probs[:, 1]).astype(np.int32)
+        ep_states[rows, ep_len] = s
+        ep_actions[rows, ep_len] = actions
+        ep_len += 1
+
+        obs, reward, done = env_vec.step(actions)
+        steps += n_envs
+
+        fin = np.flatnonzero(done)
+        if len(fin):
+            L = ep_len[fin, None]
+            mask = pasos_t < L
+            returns = reward[fin, None] * GAMMA ** np.maximum(L - 1 - pasos_t, 0)
+            states_batch.append(ep_states[fin][mask])
+            actions_batch.append(ep_actions[fin][mask])
+            returns_batch.append(returns[mask].astype(np.float32))
+            n_batch += int(mask.sum())
+            ep_len[fin] = 0
+            episode += len(fin)
+
+        if n_batch >= BATCH_SIZE_VEC:
+            returns_arr = np.concatenate(returns_batch)
+            returns_arr = (returns_arr - returns_arr.mean()) / (returns_arr.std() + 1e-8)
+            paso_gradiente(np.concatenate(states_batch), np.concatenate(actions_batch), returns_arr)
+            states_batch, actions_batch, returns_batch = [], [], []
+            n_batch = 0
+
+        if episode >= next_report:
+            elapsed = time.perf_counter() - start
+            print(f"Episodio {episode}/{episodios} - pasos totales {steps} "
+                  f"({episode / max(elapsed, 1e-9):,.0f} episodios/s)")
+            next_report += max(episodios // 20, 1)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {episode:,} episodios en {elapsed:.1f}s ({episode / elapsed:,.0f} episodios/s)")
+    return steps
+
+# --- Modo grafo: toda la iteración dentro de TensorFlow ---
+def carta_aleatoria(n):
+    # Mazo infinito, como Blackjack-v1: 1..13 con las figuras valiendo 10
+    return tf.minimum(tf.random.uniform((n,), 1, 14, dtype=tf.int32), 10)
 
+def sumar_carta(total, soft, carta):
+    # Misma regla que blackjack_dp.add_card: el As cuenta 11 si cabe
+    total = total + carta
+    ace = (carta == 1) & (total <= 11)
+    total = total + 10 * tf.cast(ace, tf.int32)
+    soft = soft | ace
+    bust_soft = soft & (total > 21)
+    return total - 10 * tf.cast(bust_soft, tf.int32), soft & ~bust_soft
+
+def normalizar_estados(total, dealer, soft):
+    # procesar_estado en tensores
+    return tf.stack([(tf.cast(total, tf.float32) - 4.0) / (21.0 - 4.0),
+                     (tf.cast(dealer, tf.float32) - 1.0) / (10.0 - 1.0),
+                     tf.cast(soft, tf.float32)], axis=1)
+
+def crear_paso_grafo(n_envs=N_ENVS, jit_compile=True):
+    """
+    tf.function que juega `n_envs` manos completas y aplica un paso de REINFORCE.
+    Los bucles de jugador y dealer se desenrollan (MAX_PASOS_GRAFO y
+    MAX_CARTAS_DEALER) con tf.where sobre las manos activas, así que las formas
+    son fijas y XLA puede compilarlo. Devuelve (recompensa media, decisiones).
+    """
+    @tf.function(jit_compile=jit_compile)
+    def paso():
+        zeros = tf.zeros([n_envs], tf.int32)
+        no_ace = tf.zeros([n_envs], tf.bool)
+        player, soft = sumar_carta(zeros, no_ace, carta_aleatoria(n_envs))
+        player, soft = sumar_carta(player, soft, carta_aleatoria(n_envs))
+        dealer_card = carta_aleatoria(n_envs)
+
+        # Turno del jugador: acciones muestreadas de la política
+        activo = tf.ones([n_envs], tf.bool)
+        estados, acciones, vivos = [], [], []
+        for _ in range(MAX_PASOS_GRAFO):
+            x = normalizar_estados(player, dealer_card, soft)
+            accion = tf.cast(tf.random.categorical(model(x), 1)[:, 0], tf.int32)
+            estados.append(x)
+            acciones.append(accion)
+            vivos.append(activo)
+            pide = activo & (accion == 1)
+            nuevo, nuevo_soft = sumar_carta(player, soft, carta_aleatoria(n_envs))
+            player = tf.where(pide, nuevo, player)
+            soft = tf.where(pide, nuevo_soft, soft)
+            activo = pide & (player <= 21)
+
+        # Turno del dealer: carta tapada y pide con menos de 17
+        dealer, d_soft = sumar_carta(zeros, no_ace, dealer_card)
+        for _ in range(MAX_CARTAS_DEALER):
+            pide = dealer < 17
+            nuevo, nuevo_soft = sumar_carta(dealer, d_soft, carta_aleatoria(n_envs))
+            dealer = tf.where(pide, nuevo, dealer)
+            d_soft = tf.where(pide, nuevo_soft, d_soft)
+
+        recompensa = tf.cast(tf.sign(player - dealer), tf.float32)
+        recompensa = tf.where(dealer > 21, 1.0, recompensa)
+        recompensa = tf.where(player > 21, -1.0, recompensa)
+
+        # Retorno del paso t de una mano de L decisiones: R * GAMMA^(L-1-t), normalizado por lote
+        mascara = tf.cast(tf.stack(vivos), tf.float32)                      # (T, N)
+        longitud = tf.reduce_sum(mascara, axis=0)
+        t = tf.range(MAX_PASOS_GRAFO, dtype=tf.float32)[:, None]
+        retornos = recompensa[None, :] * tf.pow(GAMMA, tf.maximum(longitud[None, :] - 1.0 - t, 0.0))
+        n = tf.reduce_sum(mascara)
+        media = tf.reduce_sum(retornos * mascara) / n
+        std = tf.sqrt(tf.reduce_sum(tf.square(retornos - media) * mascara) / n) + 1e-8
+        ventajas = tf.reshape((retornos - media) / std * mascara, [-1])
+
+        X = tf.reshape(tf.stack(estados), [-1, obs_space])
+        A = tf.reshape(tf.stack(acciones), [-1])
+        with tf.GradientTape() as tape:
+            logp = tf.nn.log_softmax(model(X))
+            chosen_logp = tf.gather(logp, A, batch_dims=1)
+            loss = -tf.reduce_sum(chosen_logp * ventajas) / n
         grads = tape.gradient(loss, model.trainable_variables)
         optimizer.apply_gradients(zip(grads, model.trainable_variables))
+        return tf.reduce_mean(recompensa), n
+
+    return paso
+
+def paso_grafo_compilado(n_envs=N_ENVS):
+    """
+    crear_paso_grafo con XLA si el backend lo admite; si no, tf.function sin XLA.
+    La primera llamada traza y compila, y también entrena un lote: se devuelve
+    su resultado (recompensa media, decisiones) para contarlo como un paso más.
+    """
+    for jit_compile in (True, False):
+        paso = crear_paso_grafo(n_envs, jit_compile)
+        try:
+            primero = paso()
+            return paso, jit_compile, primero
+        except Exception as e:
+            print(f"⚠️ XLA no disponible ({e}); se usa tf.function sin XLA")
+    raise RuntimeError("No se pudo compilar el paso de entrenamiento")
+
+def entrenar_grafo(episodios=EPISODES_VEC, n_envs=N_ENVS):
+    """REINFORCE con el paso compilado: n_envs manos por llamada; devuelve las decisiones"""
+    start = time.perf_counter()
+    paso, xla, (_, n) = paso_grafo_compilado(n_envs)
+    print(f"Iniciando entrenamiento REINFORCE en grafo ({n_envs} manos por paso, XLA {'sí' if xla else 'no'})...")
+    # El lote de la compilación ya está entrenado: cuenta en episodios y en decisiones
+    episode, steps = n_envs, int(n)
+    for i in range(1, max(episodios // n_envs, 1)):
+        recompensa, n = paso()
+        episode += n_envs
+        steps += int(n)
+        if i % 50 == 0:
+            elapsed = time.perf_counter() - start
+            print(f"Episodio {episode}/{episodios} - recompensa media {float(recompensa):+.3f} "
+                  f"({episode / elapsed:,.0f} episodios/s)")
+    elapsed = time.perf_counter() - start
+    print(f"✅ {episode:,} episodios en {elapsed:.1f}s ({episode / elapsed:,.0f} episodios/s)")
+    return steps
+
+def benchmark_entrenamiento():
+    """
+    Decisiones de entrenamiento por segundo: bucle eager, vectorizado y grafo.
+    Cada modo entrena el modelo global; al terminar se restauran sus pesos.
+    """
+    pesos_iniciales = model.get_weights()
+    resultados = []
+    try:
+        global env
+        import gymnasium as gym
+        env = gym.make("Blackjack-v1", sab=True)
+        start = time.perf_counter()
+        steps = entrenar(500)
+        resultados.append(("Eager (1 partida)", steps / (time.perf_counter() - start)))
+    except ImportError:
+        print("⚠️ gymnasium no instalado: se omite el bucle eager")
+
+    start = time.perf_counter()
+    steps = entrenar_vectorizado(200_000)
+    resultados.append((f"Vectorizado ({N_ENVS} partidas)", steps / (time.perf_counter() - start)))
+
+    paso, xla, _ = paso_grafo_compilado()
+    start = time.perf_counter()
+    steps = sum(int(paso()[1]) for _ in range(50))
+    resultados.append((f"Grafo{' + XLA' if xla else ''} ({N_ENVS} manos)", steps / (time.perf_counter() - start)))
+    model.set_weights(pesos_iniciales)
+
+    base = resultados[0][1]
+    print("\n📊 Pasos de entrenamiento por segundo:")
+    for nombre, por_segundo in resultados:
+        print(f"   {nombre:28} {por_segundo:12,.0f}  (x{por_segundo / base:,.1f})")
+
+def test_entrenar_grafo(n_envs=256):
+    """El lote de la compilación cuenta en las decisiones devueltas por entrenar_grafo"""
+    pesos_iniciales = model.get_weights()
+    for lotes in (1, 3):
+        steps = entrenar_grafo(n_envs * lotes, n_envs)
+        # cada mano toma entre 1 y MAX_PASOS_GRAFO decisiones
+        assert n_envs * lotes <= steps <= MAX_PASOS_GRAFO * n_envs * lotes, steps
+    model.set_weights(pesos_iniciales)
+    print("✅ test_entrenar_grafo OK")
+
+if __name__ == "__main__":
+    if BENCHMARK:
+        benchmark_entrenamiento()
+        sys.exit(0)
+    if TEST:
+        test_entrenar_grafo()
+        sys.exit(0)
 
-        # limpiar batch
-        states_batch = []
-        actions_batch = []
-        rewards_batch = []
+    if VECTORIZADO:
+        args = [a for a in sys.argv[1:] if not a.startswith("--")]
+        entrenar_vectorizado(int(float(args[0])) if args else EPISODES_VEC)
+    elif GRAFO:
+        args = [a for a in sys.argv[1:] if not a.startswith("--")]
+        entrenar_grafo(int(float(args[0])) if args else EPISODES_VEC)
+    else:
+        entrenar()
 
-    if episode % 5000 == 0:
-        print(f"Episodio {episode}/{EPISODES} - pasos totales {steps}")
+    # Guardar modelo final
+    model.save(MODEL_PATH)
+    print("Entrenamiento completado. Modelo guardado en", MODEL_PATH)
 
-# Guardar modelo final
-model.save(MODEL_PATH)
-print("Entrenamiento completado. Modelo guardado en", MODEL_PATH)
+    # VE exacto de la política (greedy) frente a la estrategia óptima, con una sola pasada de la red
+    try:
+        from blackjack_dp import policy_table, print_score
+        estados = [(total, dealer, usable) for total in range(4, 22) for dealer in range(1, 11) for usable in (False, True)]
+        greedy = dict(zip(estados, np.argmax(model(np.vstack([procesar_estado(s) for s in estados])).numpy(), axis=1)))
+        print_score("REINFORCE", policy_table(lambda s: int(greedy[s])))
+    except Exception as e:
+        print(f"⚠️ Error evaluando la política: {e}")
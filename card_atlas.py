@@ -0,0 +1,158 @@
+# card_atlas.py
+"""
+Atlas de texturas de las cartas, compartido por Blackjack y Poker.
+
+Las imágenes de cards/ están a resolución completa (~750x1194, 18 MB en PNG):
+decodificarlas y escalarlas al abrir cada juego cuesta más de un segundo.
+build_atlas lo hace una sola vez por tamaño de carta y guarda todas las
+cartas en una única imagen RGBA sin comprimir más un índice JSON:
+
+    cards/atlas/atlas_85x130.rgba   píxeles en bruto (13 columnas x 5 filas)
+    cards/atlas/atlas_85x130.json   tamaño de la imagen y rect de cada carta
+
+load_atlas lee ese fichero de un golpe y devuelve {nombre: subsurface}, con
+los nombres de los PNG originales ("A_Corazones", "10_Trebol", "Reverso").
+Si el atlas no existe o alguna imagen es más nueva, se reconstruye.
+
+Uso:
+    python card_atlas.py                    # tamaños por defecto de ambos juegos
+    python card_atlas.py 85x130 100x145
+"""
+import json
+import os
+import sys
+import time
+
+import pygame
+
+CARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cards")
+ATLAS_SUBDIR = "atlas"
+PALOS = ["Corazones", "Diamantes", "Trebol", "Copas"]
+VALORES = ["A"] + [str(i) for i in range(2, 11)] + ["J", "Q", "K"]
+BACK = "Reverso"
+# Una fila por palo y el reverso en la última
+LAYOUT = [[f"{v}_{p}" for v in VALORES] for p in PALOS] + [[BACK]]
+# Tamaños que usan los juegos: Poker (CARD_SCALE 0.8 / 1.0 / 1.3) y Blackjack
+DEFAULT_SIZES = [(68, 104), (85, 130), (110, 169), (100, 145)]
+
+
+def resolve_card_dir(preferred=None):
+    """La carpeta configurada en el juego si existe; si no, cards/ del repo"""
+    if preferred and os.path.isdir(preferred):
+        return preferred
+    return CARD_DIR
+
+
+def atlas_paths(card_dir, card_w, card_h):
+    """(ruta de los píxeles, ruta del índice) del atlas de un tamaño"""
+    base = os.path.join(card_dir, ATLAS_SUBDIR, f"atlas_{card_w}x{card_h}")
+    return base + ".rgba", base + ".json"
+
+
+def _source_mtime(card_dir):
+    """Fecha de modificación más reciente de las imágenes originales"""
+    mtimes = [entry.stat().st_mtime for entry in os.scandir(card_dir)
+              if entry.is_file() and entry.name.lower().endswith(".png")]
+    return max(mtimes, default=0.0)
+
+
+def build_atlas(card_dir, card_w, card_h):
+    """Decodifica y escala todas las cartas una vez y guarda el atlas de ese tamaño"""
+    columns = max(len(row) for row in LAYOUT)
+    atlas = pygame.Surface((columns * card_w, len(LAYOUT) * card_h), pygame.SRCALPHA, 32)
+    rects = {}
+    for row, names in enumerate(LAYOUT):
+        for col, name in enumerate(names):
+            path = os.path.join(card_dir, name + ".png")
+            if not os.path.exists(path):
+                continue
+            try:
+                img = pygame.image.load(path)
+                if img.get_bitsize() < 24:
+                    img = img.convert(32, pygame.SRCALPHA)
+                rect = (col * card_w, row * card_h, card_w, card_h)
+                atlas.blit(pygame.transform.smoothscale(img, (card_w, card_h)), rect[:2])
+                rects[name] = rect
+            except pygame.error as e:
+                print(f"⚠️ Error cargando {path}: {e}")
+
+    pixels_path, index_path = atlas_paths(card_dir, card_w, card_h)
+    os.makedirs(os.path.dirname(pixels_path), exist_ok=True)
+    with open(pixels_path, "wb") as f:
+        f.write(pygame.image.tobytes(atlas, "RGBA"))
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump({"size": atlas.get_size(), "card": [card_w, card_h],
+                   "format": "RGBA", "cards": rects}, f, indent=1)
+    return atlas, rects
+
+
+def read_atlas(card_dir, card_w, card_h):
+    """(superficie, rects) del atlas guardado; None si falta o está desactualizado"""
+    pixels_path, index_path = atlas_paths(card_dir, card_w, card_h)
+    try:
+        if os.path.getmtime(index_path) < _source_mtime(card_dir):
+            return None
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        with open(pixels_path, "rb") as f:
+            data = f.read()
+        atlas = pygame.image.frombytes(data, tuple(index["size"]), index["format"])
+    except (OSError, ValueError, KeyError, pygame.error):
+        return None
+    return atlas, {name: tuple(rect) for name, rect in index["cards"].items()}
+
+
+def load_atlas(card_w, card_h, card_dir=None):
+    """{nombre: subsurface} con todas las cartas a card_w x card_h ({} si no hay imágenes)"""
+    card_dir = resolve_card_dir(card_dir)
+    loaded = read_atlas(card_dir, card_w, card_h)
+    if loaded is None:
+        try:
+            print(f"🃏 Construyendo atlas de cartas {card_w}x{card_h}...")
+            loaded = build_atlas(card_dir, card_w, card_h)
+        except (OSError, pygame.error) as e:
+            print(f"⚠️ Error construyendo atlas de cartas: {e}")
+            return {}
+    atlas, rects = loaded
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+    return {name: atlas.subsurface(rect) for name, rect in rects.items()}
+
+
+def test_card_atlas():
+    """Construye un atlas pequeño y comprueba que se lee igual que se escribió"""
+    import tempfile
+    card_dir = resolve_card_dir()
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("A_Corazones", BACK):
+            src = os.path.join(card_dir, name + ".png")
+            with open(src, "rb") as f_in, open(os.path.join(tmp, name + ".png"), "wb") as f_out:
+                f_out.write(f_in.read())
+        atlas, rects = build_atlas(tmp, 20, 30)
+        assert set(rects) == {"A_Corazones", BACK}
+        assert rects[BACK] == (0, 4 * 30, 20, 30)
+
+        cards = load_atlas(20, 30, tmp)
+        assert set(cards) == set(rects)
+        assert cards["A_Corazones"].get_size() == (20, 30)
+        for name, rect in rects.items():
+            expected = atlas.subsurface(rect)
+            for pos in ((0, 0), (10, 15), (19, 29)):
+                assert cards[name].get_at(pos) == expected.get_at(pos)
+    print("✅ test_card_atlas OK")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["test"]:
+        test_card_atlas()
+        sys.exit()
+    sizes = [tuple(int(n) for n in arg.split("x")) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    for w, h in sizes:
+        start = time.perf_counter()
+        _, rects = build_atlas(CARD_DIR, w, h)
+        built = time.perf_counter() - start
+        start = time.perf_counter()
+        cards = load_atlas(w, h)
+        loaded = time.perf_counter() - start
+        print(f"🃏 {w}x{h}: {len(rects)} cartas, construido en {built:.2f}s, "
+              f"cargado en {loaded * 1000:.1f}ms")
@@ -0,0 +1,89 @@
+# startup_benchmark.py
+"""
+Tiempo de arranque en frío de los juegos, como los lanza main_menu.
+
+Cada juego se ejecuta en un proceso nuevo con --benchmark-startup: el bucle
+principal imprime "BENCH primer_frame" al dibujar el primer frame y
+"BENCH ia_lista" cuando los agentes terminan de cargarse (y sale). Se mide
+el tiempo de reloj desde el lanzamiento hasta cada línea.
+
+Como referencia se mide también lo que cuesta importar cada framework, que
+antes se pagaba antes de abrir la ventana.
+
+Uso:
+    python startup_benchmark.py          # 3 ejecuciones por juego
+    python startup_benchmark.py 5
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GAMES = [
+    ("Blackjack", os.path.join(ROOT, "blackJack", "blackjack_pygame.py"), []),
+    ("Poker", os.path.join(ROOT, "Poker", "holdem_pygame_app.py"), []),
+    ("Poker --neural", os.path.join(ROOT, "Poker", "holdem_pygame_app.py"), ["--neural"]),
+]
+FRAMEWORKS = ["torch", "tensorflow"]
+
+
+def headless_env():
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    return env
+
+
+def measure_game(script, args, timeout=120):
+    """(segundos hasta el primer frame, segundos hasta la IA lista) de un arranque"""
+    times = {}
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-u", script, "--benchmark-startup", *args],
+                            cwd=os.path.dirname(script), env=headless_env(),
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            text=True, encoding="utf-8", errors="replace")
+    try:
+        for line in proc.stdout:
+            if line.startswith("BENCH "):
+                times[line.split()[1]] = time.perf_counter() - start
+                if "ia_lista" in times:
+                    break
+            if time.perf_counter() - start > timeout:
+                break
+    finally:
+        proc.kill()
+        proc.wait()
+    return times.get("primer_frame"), times.get("ia_lista")
+
+
+def measure_import(module):
+    """Segundos de `python -c "import module"` (None si no está instalado)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", f"import {module}"], capture_output=True)
+    return time.perf_counter() - start if result.returncode == 0 else None
+
+
+def fmt(seconds):
+    return "   -  " if seconds is None else f"{seconds:6.2f}s"
+
+
+def run(repeats=3):
+    python = measure_import("sys")
+    print(f"🐍 Intérprete vacío: {python:.2f}s")
+    for module in FRAMEWORKS:
+        seconds = measure_import(module)
+        print(f"📦 import {module:10}: " + ("no instalado" if seconds is None else f"{seconds:.2f}s"))
+
+    print(f"\n{'Juego':16} {'primer frame':>13} {'IA lista':>10}   (mediana de {repeats})")
+    for name, script, args in GAMES:
+        runs = [measure_game(script, args) for _ in range(repeats)]
+        frames = [f for f, _ in runs if f is not None]
+        ready = [r for _, r in runs if r is not None]
+        print(f"{name:16} {fmt(statistics.median(frames) if frames else None):>13} "
+              f"{fmt(statistics.median(ready) if ready else None):>10}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3)